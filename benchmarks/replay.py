@@ -0,0 +1,389 @@
+# Copyright 2018 Inap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import platform
+import sys
+from io import BytesIO
+from timeit import default_timer
+
+from twisted.internet import defer, task
+
+from benchmarks.load import CLIENTS, ClientOptions, Target, NETCONF_DELIMITER, summarize
+from benchmarks.run import write_report
+from fake_switches.recording import read_sessions
+from fake_switches.switch_factory import SwitchFactory
+from fake_switches.terminal import BufferingTerminalController
+
+KINDS = {"ssh": "cli", "telnet": "cli", "netconf": "netconf", "eapi": "eapi"}
+
+MAX_DIVERGENCES_PER_SESSION = 10
+SETTLE_INTERVAL = 0.01
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake-switches recorded sessions replayer",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("recording", type=str, help="File written by a SessionRecorder")
+    parser.add_argument("--speed", type=_speed, default=1.0,
+                        help="Replay speed, 1 keeps the recorded timing, 10 is ten times faster, "
+                             "max sends everything as soon as the previous answer is received")
+    parser.add_argument("--model", type=_switch_option, action="append", default=[],
+                        help="Replay the sessions of a switch in-process on a fresh switch, as SWITCH=MODEL, "
+                             "or MODEL alone for every switch not mapped otherwise")
+    parser.add_argument("--password", type=str, default="root", help="Privileged password of in-process switches")
+    parser.add_argument("--target", type=_switch_target, action="append", default=[],
+                        help="Replay the sessions of a switch against a running one, as SWITCH=URL with URL like "
+                             "in benchmarks.load, the protocol of the URL selects the sessions it replays")
+    parser.add_argument("--timeout", type=float, default=10, help="Seconds to wait for an answer")
+    parser.add_argument("--output", type=str, default="-", help="JSON report file")
+
+    args = parser.parse_args(argv)
+
+    with open(args.recording) as f:
+        sessions = read_sessions(f)
+
+    targets = {(switch, KINDS[target.protocol]): target for switch, target in args.target}
+    drivers = DriverFactory(dict(args.model), args.password, targets, ClientOptions(args.timeout, None, None))
+
+    def generate(reactor):
+        d = replay(reactor, sessions, drivers, args.speed)
+        d.addCallback(_write_report, args.output)
+        return d
+
+    task.react(generate)
+
+
+def replay(reactor, sessions, drivers, speed, log=sys.stderr):
+    results = []
+    runs = []
+    started = default_timer()
+    origin = min(s.started for s in sessions) if sessions else 0
+    for session in sessions:
+        driver = drivers.driver_for(reactor, session)
+        if driver is None:
+            results.append(_session_result(session, skipped=True))
+            continue
+
+        result = _session_result(session)
+        results.append(result)
+        runs.append(_replay_session(reactor, session, driver, started + (session.started - origin) / speed,
+                                    speed, result))
+
+    d = defer.gatherResults(runs, consumeErrors=True)
+    d.addCallback(lambda _: _report(results, speed, default_timer() - started, log))
+    return d
+
+
+class DriverFactory(object):
+    def __init__(self, models, password, targets, options):
+        self.models = models
+        self.password = password
+        self.targets = targets
+        self.options = options
+        self.switches = {}
+
+    def driver_for(self, reactor, session):
+        target = self.targets.get((session.switch_name, session.kind))
+        if target is not None:
+            return NETWORK_DRIVERS[session.kind](CLIENTS[target.protocol](reactor, target, self.options))
+
+        model = self.models.get(session.switch_name, self.models.get(None))
+        if model is not None:
+            return IN_PROCESS_DRIVERS[session.kind](reactor, self._switch(session.switch_name, model), self.options)
+
+        return None
+
+    def _switch(self, name, model):
+        if name not in self.switches:
+            self.switches[name] = SwitchFactory().get(model, name, password=self.password)
+        return self.switches[name]
+
+
+@defer.inlineCallbacks
+def _replay_session(reactor, session, driver, start_at, speed, result):
+    exchanges = session.exchanges()
+    try:
+        yield _sleep_until(reactor, start_at)
+        initial_output = yield driver.connect()
+        if initial_output is not None:
+            _compare(result, driver, None, exchanges[0][3], initial_output)
+
+        for t, event, data, expected in exchanges[1:]:
+            yield _sleep_until(reactor, start_at + (t - session.started) / speed)
+            started = default_timer()
+            actual = yield driver.send(event, data, expected)
+            result["latencies"].append(default_timer() - started)
+            _compare(result, driver, data, expected, actual)
+    except Exception as e:
+        result["error"] = "{}: {}".format(type(e).__name__, e)
+    finally:
+        driver.close()
+
+
+def _sleep_until(reactor, when):
+    return task.deferLater(reactor, max(0, when - default_timer()), lambda: None)
+
+
+def _compare(result, driver, data, expected, actual):
+    result["exchanges"] += 1
+    if not driver.same(expected, actual):
+        result["divergences"] += 1
+        if len(result["details"]) < MAX_DIVERGENCES_PER_SESSION:
+            result["details"].append({"input": data, "expected": expected, "actual": actual})
+
+
+def _session_result(session, skipped=False):
+    return {
+        "session": session.session_id,
+        "switch": session.switch_name,
+        "kind": session.kind,
+        "skipped": skipped,
+        "exchanges": 0,
+        "divergences": 0,
+        "details": [],
+        "latencies": []
+    }
+
+
+def _report(results, speed, duration, log):
+    for result in results:
+        result["latency"] = summarize(result.pop("latencies"))
+        if log and (result["divergences"] or "error" in result):
+            log.write("session {session} of {switch} ({kind}): {divergences} divergences{error}\n"
+                      .format(error=", " + result["error"] if "error" in result else "", **result))
+
+    replayed = [r for r in results if not r["skipped"]]
+    if log:
+        log.write("{} sessions replayed, {} skipped, {} exchanges, {} divergences, {} errors in {:.2f}s\n".format(
+            len(replayed), len(results) - len(replayed), sum(r["exchanges"] for r in replayed),
+            sum(r["divergences"] for r in replayed), len([r for r in replayed if "error" in r]), duration))
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "speed": "max" if speed == float("inf") else speed,
+        "seconds": duration,
+        "sessions": results
+    }
+
+
+def _write_report(report, output):
+    write_report(report, output)
+    if any(r["divergences"] or "error" in r for r in report["sessions"]):
+        raise SystemExit(1)
+
+
+def _speed(value):
+    if value == "max":
+        return float("inf")
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("The speed must be positive")
+    return speed
+
+
+def _switch_option(value):
+    switch, _, setting = value.rpartition("=")
+    return switch or None, setting
+
+
+def _switch_target(value):
+    switch, _, url = value.partition("=")
+    if not url:
+        raise argparse.ArgumentTypeError("Expected SWITCH=URL")
+    return switch, Target(url)
+
+
+class _InProcessDriver(object):
+    def __init__(self, reactor, switch_core, options):
+        self.reactor = reactor
+        self.switch_core = switch_core
+        self.options = options
+
+    def close(self):
+        pass
+
+    def same(self, expected, actual):
+        return expected == actual
+
+    def _settle(self, expected, read):
+        settled = defer.Deferred()
+        deadline = default_timer() + self.options.timeout
+
+        def poll(actual):
+            if actual == expected or not expected.startswith(actual) or default_timer() >= deadline:
+                settled.callback(actual)
+            else:
+                self.reactor.callLater(SETTLE_INTERVAL, lambda: poll(actual + read()))
+
+        poll(read())
+        return settled
+
+
+class InProcessCliDriver(_InProcessDriver):
+    def connect(self):
+        self.terminal_controller = BufferingTerminalController()
+        self.shell_session = self.switch_core.launch("replay", self.terminal_controller)
+        return defer.succeed(self.terminal_controller.pop())
+
+    def send(self, event, data, expected):
+        if event == "key":
+            if self.terminal_controller.any_key_handler is not None:
+                callback, params = self.terminal_controller.any_key_handler
+                callback(*(params + (data,)))
+        else:
+            self.shell_session.receive(data)
+        return self._settle(expected, self.terminal_controller.pop)
+
+
+class InProcessNetconfDriver(_InProcessDriver):
+    def connect(self):
+        self.transport = _Transport()
+        self.protocol = self.switch_core.get_netconf_protocol()
+        self.protocol.makeConnection(self.transport)
+        self.protocol.dataReceived(("<hello/>" + NETCONF_DELIMITER).encode())
+        self.transport.pop()
+        return defer.succeed(None)
+
+    def send(self, event, data, expected):
+        self.protocol.dataReceived((data + NETCONF_DELIMITER).encode())
+        return defer.succeed(_without_delimiter(self.transport.pop()))
+
+
+class InProcessEapiDriver(_InProcessDriver):
+    def connect(self):
+        self.eapi = self.switch_core.get_http_resource().getStaticEntity(b"command-api")
+        return defer.succeed(None)
+
+    def send(self, event, data, expected):
+        request = _Request(data.encode())
+        self.eapi.render_POST(request)
+        return request.finished.addCallback(lambda _: b"".join(request.written).decode())
+
+
+class _NetworkDriver(object):
+    def __init__(self, client):
+        self.client = client
+
+    def connect(self):
+        return self.client.connect().addCallback(lambda _: None)
+
+    def close(self):
+        self.client.close()
+
+    def same(self, expected, actual):
+        return expected == actual
+
+
+class NetworkCliDriver(_NetworkDriver):
+    def send(self, event, data, expected):
+        if event == "in":
+            data += self.client.linesep
+
+        received = [""]
+        tail = expected.rsplit("\n", 1)[-1] or expected
+
+        def matches(buffer):
+            received[0] = _without_echo(buffer) if event == "in" else buffer.replace("\r", "")
+            return len(buffer) if received[0] is not None and received[0].endswith(tail) else None
+
+        if not expected:
+            self.client.write(data.encode())
+            return defer.succeed("")
+
+        def timed_out(failure):
+            failure.trap(defer.TimeoutError)
+            return received[0] or ""
+
+        return self.client.send(data.encode(), matches).addCallbacks(lambda _: received[0], timed_out)
+
+
+class NetworkNetconfDriver(_NetworkDriver):
+    def send(self, event, data, expected):
+        d = self.client.send((data + NETCONF_DELIMITER).encode(), self.client.end_of_message)
+        return d.addCallback(_without_delimiter)
+
+    def same(self, expected, actual):
+        return expected.strip() == actual.strip()
+
+
+class NetworkEapiDriver(_NetworkDriver):
+    def send(self, event, data, expected):
+        return self.client.post(data.encode()).addCallback(lambda body: body.decode())
+
+
+def _without_echo(buffer):
+    text = buffer.replace("\r", "")
+    echo_end = text.find("\n")
+    return text[echo_end + 1:] if echo_end >= 0 else None
+
+
+def _without_delimiter(reply):
+    if isinstance(reply, bytes):
+        reply = reply.decode()
+    return reply.strip().rsplit(NETCONF_DELIMITER, 1)[0]
+
+
+class _Transport(object):
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    def loseConnection(self):
+        pass
+
+    def pop(self):
+        written, self.written = self.written, []
+        return b"".join(written)
+
+
+class _Request(object):
+    def __init__(self, body):
+        self.content = BytesIO(body)
+        self.written = []
+        self.startedWriting = False
+        self.finished = defer.Deferred()
+
+    def write(self, data):
+        self.startedWriting = True
+        self.written.append(data)
+
+    def setResponseCode(self, code):
+        pass
+
+    def notifyFinish(self):
+        return defer.Deferred()
+
+    def finish(self):
+        self.finished.callback(None)
+
+
+IN_PROCESS_DRIVERS = {
+    "cli": InProcessCliDriver,
+    "netconf": InProcessNetconfDriver,
+    "eapi": InProcessEapiDriver
+}
+
+NETWORK_DRIVERS = {
+    "cli": NetworkCliDriver,
+    "netconf": NetworkNetconfDriver,
+    "eapi": NetworkEapiDriver
+}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Copyright 2018 Inap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+from timeit import default_timer
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from benchmarks.workloads import workloads, VENDORS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake-switches command throughput benchmarks",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--ports", type=int, nargs="+", default=[24], help="Number of ports, one run per value")
+    parser.add_argument("--vlans", type=int, nargs="+", default=[100], help="Number of vlans, one run per value")
+    parser.add_argument("--operations", type=int, default=100, help="Operations per workload")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per workload, the fastest one is kept")
+    parser.add_argument("--vendor", action="append", choices=[v.name for v in VENDORS],
+                        help="Only benchmark this model, can be repeated")
+    parser.add_argument("--output", type=str, default="-", help="JSON report file")
+
+    args = parser.parse_args(argv)
+
+    report = run(args.ports, args.vlans, args.operations, args.repeat, args.vendor)
+    write_report(report, args.output)
+
+
+def run(ports_sizes, vlans_sizes, operations, repeat, vendors=None, log=sys.stderr):
+    results = []
+    for ports, vlans in itertools.product(ports_sizes, vlans_sizes):
+        for workload in workloads(ports, vlans, operations, vendors):
+            if workload.memory:
+                if tracemalloc is None:
+                    continue
+                result = measure_memory(workload, repeat)
+                line = "{bytes_per_item:>12.1f} bytes each\n"
+            else:
+                result = measure(workload, repeat)
+                line = "{commands_per_second:>12.1f} commands/s\n"
+
+            result.update(ports=ports, vlans=vlans)
+            results.append(result)
+            if log:
+                log.write(("{vendor:<18} {workload:<34} {ports:>5} ports {vlans:>5} vlans " + line).format(**result))
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "operations": operations,
+        "repeat": repeat,
+        "results": results
+    }
+
+
+def write_report(report, output):
+    if output == "-":
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+    else:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+def measure(workload, repeat):
+    timings = []
+    commands = 0
+    for _ in range(repeat):
+        commands, execute = workload.run()
+        start = default_timer()
+        execute()
+        timings.append(default_timer() - start)
+
+    best = min(timings)
+    return {
+        "vendor": workload.vendor,
+        "workload": workload.name,
+        "commands": commands,
+        "seconds": best,
+        "timings": timings,
+        "commands_per_second": commands / best if best else float("inf")
+    }
+
+
+def measure_memory(workload, repeat):
+    sizes = []
+    items = 0
+    for _ in range(repeat):
+        items, allocate = workload.run()
+        tracemalloc.start()
+        try:
+            kept = allocate()
+            sizes.append(tracemalloc.get_traced_memory()[0])
+        finally:
+            tracemalloc.stop()
+        del kept
+
+    smallest = min(sizes)
+    return {
+        "vendor": workload.vendor,
+        "workload": workload.name,
+        "items": items,
+        "bytes": smallest,
+        "sizes": sizes,
+        "bytes_per_item": smallest / float(items) if items else 0
+    }
+
+
+if __name__ == "__main__":
+    main()
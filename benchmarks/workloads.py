@@ -0,0 +1,390 @@
+# Copyright 2018 Inap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from io import BytesIO
+
+from twisted.internet.task import Cooperator
+
+from fake_switches.switch_configuration import Port
+from fake_switches.switch_factory import SwitchFactory
+
+FIRST_VLAN = 2
+FIRST_BENCHMARK_VLAN = 3000
+FIRST_MEMORY_PORT = 1000
+EDIT_CONFIG_INTERFACES = 500
+
+
+class Workload(object):
+    def __init__(self, vendor, name, run, memory=False):
+        self.vendor = vendor
+        self.name = name
+        self.run = run
+        self.memory = memory
+
+
+class CliVendor(object):
+    model = None
+    configure = "configure terminal"
+    show_running_config = "show running-config"
+    show_vlan = "show vlan"
+
+    def port_name(self, index):
+        raise NotImplementedError()
+
+    def login(self):
+        return ["enable", "root"]
+
+    def interface(self, port):
+        return ["interface {}".format(port)]
+
+    def configure_interface(self, index):
+        return ["description benchmark {}".format(index)]
+
+    def create_vlan(self, vlan):
+        return ["vlan {}".format(vlan), "exit"]
+
+    def delete_vlan(self, vlan):
+        return ["no vlan {}".format(vlan)]
+
+    def trunk_vlans(self, port, vlans):
+        return self.interface(port) + \
+            ["switchport mode trunk"] + \
+            ["switchport trunk allowed vlan add {}".format(v) for v in vlans] + \
+            ["switchport trunk allowed vlan remove {}".format(v) for v in vlans] + \
+            ["exit"]
+
+    def workloads(self, ports, vlans, operations):
+        return [
+            Workload(self.name, "interface_config", self._cli(ports, vlans, self._interface_config(ports))),
+            Workload(self.name, "show_running_config", self._cli(ports, vlans, [self.show_running_config] * operations)),
+            Workload(self.name, "show_vlan", self._cli(ports, vlans, [self.show_vlan] * operations)),
+            Workload(self.name, "vlan_create_delete", self._cli(ports, vlans, self._vlan_create_delete(operations))),
+            Workload(self.name, "trunk_add_remove", self._cli(ports, vlans, self._trunk_add_remove(vlans, operations))),
+            Workload(self.name, "bytes_per_port", ports_memory(self.model, self.port_name, ports), memory=True),
+        ]
+
+    @property
+    def name(self):
+        return self.model
+
+    def _interface_config(self, ports):
+        commands = [self.configure]
+        for index in range(1, ports + 1):
+            commands += self.interface(self.port_name(index)) + self.configure_interface(index) + ["exit"]
+        return commands + ["exit"]
+
+    def _vlan_create_delete(self, operations):
+        vlans = range(FIRST_BENCHMARK_VLAN, FIRST_BENCHMARK_VLAN + operations)
+        commands = [self.configure]
+        for vlan in vlans:
+            commands += self.create_vlan(vlan)
+        for vlan in vlans:
+            commands += self.delete_vlan(vlan)
+        return commands + ["exit"]
+
+    def _trunk_add_remove(self, vlans, operations):
+        trunk_vlans = [FIRST_VLAN + (i % max(vlans, 1)) for i in range(operations)]
+        return [self.configure] + self.trunk_vlans(self.port_name(1), trunk_vlans) + ["exit"]
+
+    def _cli(self, ports, vlans, commands):
+        def run():
+            session = build_switch(self.model, [Port(self.port_name(i)) for i in range(1, ports + 1)], vlans).open_session()
+            session.execute(self.login())
+            return len(commands), lambda: execute(session, commands)
+        return run
+
+
+class Cisco(CliVendor):
+    model = "cisco_generic"
+
+    def port_name(self, index):
+        return "FastEthernet0/{}".format(index)
+
+
+class Brocade(CliVendor):
+    model = "brocade_generic"
+    show_running_config = "show running-config vlan"
+    show_vlan = "show vlan brief"
+
+    def port_name(self, index):
+        return "ethernet 1/{}".format(index)
+
+    def configure_interface(self, index):
+        return ["port-name benchmark-{}".format(index)]
+
+    def trunk_vlans(self, port, vlans):
+        commands = []
+        for vlan in vlans:
+            commands += ["vlan {}".format(vlan), "tagged {}".format(port), "exit"]
+        for vlan in vlans:
+            commands += ["vlan {}".format(vlan), "no tagged {}".format(port), "exit"]
+        return commands
+
+
+class Dell(CliVendor):
+    model = "dell_generic"
+    configure = "configure"
+
+    def port_name(self, index):
+        return "ethernet 1/g{}".format(index)
+
+    def create_vlan(self, vlan):
+        return ["vlan database", "vlan {}".format(vlan), "exit"]
+
+    def delete_vlan(self, vlan):
+        return ["vlan database", "no vlan {}".format(vlan), "exit"]
+
+
+class Dell10G(Dell):
+    model = "dell10g_generic"
+
+    def port_name(self, index):
+        return "tengigabitethernet 0/0/{}".format(index)
+
+    def create_vlan(self, vlan):
+        return ["vlan {}".format(vlan), "exit"]
+
+    def delete_vlan(self, vlan):
+        return ["no vlan {}".format(vlan)]
+
+
+class Arista(CliVendor):
+    model = "arista_generic"
+    show_running_config = "show running-config all"
+
+    def port_name(self, index):
+        return "Ethernet{}".format(index)
+
+    def login(self):
+        return ["enable"]
+
+    def configure_interface(self, index):
+        return ["load-interval {}".format(5 + index % 295)]
+
+    def workloads(self, ports, vlans, operations):
+        return super(Arista, self).workloads(ports, vlans, operations) + [
+            Workload(self.name, "eapi_show_vlan_json", self._eapi(ports, vlans, ["show vlan"], operations)),
+            Workload(self.name, "eapi_show_interfaces_json", self._eapi(ports, vlans, ["show interfaces"], operations)),
+        ]
+
+    def _eapi(self, ports, vlans, commands, operations):
+        def run():
+            core = build_switch(self.model, [Port(self.port_name(i)) for i in range(1, ports + 1)], vlans)
+            eapi = core.get_http_resource().children[b"command-api"]
+            eapi.cooperate = Cooperator(scheduler=lambda work: work()).cooperate
+            body = json.dumps({"jsonrpc": "2.0", "method": "runCmds", "id": 1,
+                               "params": {"version": 1, "cmds": ["enable"] + commands, "format": "json"}}).encode()
+
+            def post_all():
+                for _ in range(operations):
+                    request = _EapiRequest(body)
+                    eapi.render_POST(request)
+                    request.check()
+            return operations * (len(commands) + 1), post_all
+        return run
+
+
+class Juniper(object):
+    model = "juniper_generic"
+    name = model
+
+    def port_name(self, index):
+        return "ge-0/{}/{}".format(index // 100, index % 100)
+
+    def workloads(self, ports, vlans, operations):
+        return [
+            Workload(self.name, "netconf_edit_config_commit", self._netconf(ports, vlans, operations)),
+            Workload(self.name, "netconf_edit_config_{}_interfaces".format(EDIT_CONFIG_INTERFACES),
+                     self._netconf_bulk_edit(vlans, operations)),
+            Workload(self.name, "netconf_get_config", self._netconf_get_config(ports, vlans, operations)),
+            Workload(self.name, "bytes_per_port", ports_memory(self.model, self.port_name, ports), memory=True),
+        ]
+
+    def _netconf(self, ports, vlans, operations):
+        def run():
+            core = build_switch(self.model, [Port(self.port_name(i)) for i in range(1, ports + 1)], vlans,
+                                named_vlans=True)
+            protocol = core.get_netconf_protocol()
+            transport = _NetconfTransport()
+            protocol.makeConnection(transport)
+            protocol.dataReceived(_netconf_frame(b"<hello/>"))
+
+            messages = []
+            for i in range(operations):
+                messages.append(_netconf_rpc(i * 2, _EDIT_CONFIG.format(interfaces=_INTERFACE.format(
+                    port=self.port_name(1 + i % ports), description="benchmark {}".format(i)))))
+                messages.append(_netconf_rpc(i * 2 + 1, "<commit/>"))
+
+            def send_all():
+                for message in messages:
+                    protocol.dataReceived(message)
+                    transport.check()
+            return len(messages), send_all
+        return run
+
+    def _netconf_get_config(self, ports, vlans, operations):
+        def run():
+            core = build_switch(self.model, [Port(self.port_name(i)) for i in range(1, ports + 1)], vlans,
+                                named_vlans=True)
+            for port in core.switch_configuration.ports:
+                port.vendor_specific.update({"rstp-edge": True, "rstp-no-root-port": True, "lldp": True})
+            protocol = core.get_netconf_protocol()
+            transport = _NetconfTransport()
+            protocol.makeConnection(transport)
+            protocol.dataReceived(_netconf_frame(b"<hello/>"))
+
+            messages = [_netconf_rpc(i, _GET_CONFIG) for i in range(operations)]
+
+            def send_all():
+                for message in messages:
+                    protocol.dataReceived(message)
+                    transport.check()
+            return len(messages), send_all
+        return run
+
+    def _netconf_bulk_edit(self, vlans, operations):
+        def run():
+            core = build_switch(self.model, [Port(self.port_name(i)) for i in range(1, EDIT_CONFIG_INTERFACES + 1)], vlans,
+                                named_vlans=True)
+            protocol = core.get_netconf_protocol()
+            transport = _NetconfTransport()
+            protocol.makeConnection(transport)
+            protocol.dataReceived(_netconf_frame(b"<hello/>"))
+
+            messages = []
+            for i in range(operations):
+                interfaces = "".join(_INTERFACE.format(port=self.port_name(p), description="benchmark {} {}".format(i, p))
+                                     for p in range(1, EDIT_CONFIG_INTERFACES + 1))
+                messages.append(_netconf_rpc(i * 2, _EDIT_CONFIG.format(interfaces=interfaces)))
+                messages.append(_netconf_rpc(i * 2 + 1, "<commit/>"))
+
+            def send_all():
+                for message in messages:
+                    protocol.dataReceived(message)
+                    transport.check()
+            return len(messages), send_all
+        return run
+
+
+VENDORS = [Cisco(), Brocade(), Dell(), Dell10G(), Arista(), Juniper()]
+
+
+def workloads(ports, vlans, operations, vendors=None):
+    result = []
+    for vendor in VENDORS:
+        if vendors is None or vendor.name in vendors:
+            result += vendor.workloads(ports, vlans, operations)
+    return result
+
+
+def build_switch(model, ports, vlans, named_vlans=False):
+    core = SwitchFactory().get(model, "benchmark", password="root", ports=ports)
+    configuration = core.switch_configuration
+    for number in range(FIRST_VLAN, FIRST_VLAN + vlans):
+        if configuration.get_vlan(number) is None:
+            name = "VLAN{}".format(number) if named_vlans else None
+            configuration.add_vlan(configuration.new("Vlan", number, name))
+    return core
+
+
+def ports_memory(model, port_name, ports):
+    def run():
+        configuration = build_switch(model, None, 0).switch_configuration
+
+        def add_ports():
+            new_ports = [configuration.new("Port", port_name(i))
+                         for i in range(FIRST_MEMORY_PORT, FIRST_MEMORY_PORT + ports)]
+            for port in new_ports:
+                configuration.add_port(port)
+            return new_ports
+        return ports, add_ports
+    return run
+
+
+def execute(session, commands):
+    for command in commands:
+        session.send(command)
+        while session.terminal_controller.any_key_handler is not None:
+            session.press(" ")
+
+
+class _EapiRequest(object):
+    def __init__(self, body):
+        self.content = BytesIO(body)
+        self.written = []
+        self.startedWriting = False
+        self.finished = False
+
+    def write(self, data):
+        self.startedWriting = True
+        self.written.append(data)
+
+    def setResponseCode(self, code):
+        raise AssertionError("eAPI answered {}".format(code))
+
+    def notifyFinish(self):
+        from twisted.internet.defer import Deferred
+        return Deferred()
+
+    def finish(self):
+        self.finished = True
+
+    def check(self):
+        if not self.finished or b'"error"' in b"".join(self.written):
+            raise AssertionError("eAPI call failed: {!r}".format(b"".join(self.written)[:500]))
+
+
+class _NetconfTransport(object):
+    def __init__(self):
+        self.last = b""
+
+    def write(self, data):
+        self.last = data
+
+    def loseConnection(self):
+        pass
+
+    def check(self):
+        if b"rpc-error" in self.last:
+            raise AssertionError("NETCONF call failed: {!r}".format(self.last[:500]))
+
+
+_EDIT_CONFIG = """<edit-config>
+  <target><candidate/></target>
+  <config>
+    <configuration>
+      <interfaces>{interfaces}</interfaces>
+    </configuration>
+  </config>
+</edit-config>"""
+
+_GET_CONFIG = """<get-config>
+  <source><running/></source>
+</get-config>"""
+
+_INTERFACE = """
+        <interface>
+          <name>{port}</name>
+          <description>{description}</description>
+        </interface>"""
+
+
+def _netconf_rpc(message_id, operation):
+    return _netconf_frame('<rpc xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="{}">{}</rpc>'
+                          .format(message_id, operation).encode())
+
+
+def _netconf_frame(payload):
+    return payload + b"]]>]]>"
@@ -23,6 +23,7 @@ from fake_switches.arista.command_processor.default import DefaultCommandProcess
 from fake_switches.arista.command_processor.enabled import EnabledCommandProcessor
 from fake_switches.arista.command_processor.terminal_display import TerminalDisplay
 from fake_switches.arista.eapi import EAPI
+from fake_switches.command_processing.base_command_processor import ProcessorGraph
 from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
 from fake_switches.command_processing.shell_session import ShellSession
 from fake_switches.switch_configuration import Port
@@ -31,6 +32,16 @@ from fake_switches.terminal import LoggingTerminalController
 
 
 class AristaSwitchCore(SwitchCore):
+    processor_graph = ProcessorGraph(
+        DefaultCommandProcessor,
+        enabled=ProcessorGraph(
+            EnabledCommandProcessor,
+            config=ProcessorGraph(
+                ConfigCommandProcessor,
+                config_vlan=ProcessorGraph(ConfigVlanCommandProcessor),
+                config_interface=ProcessorGraph(ConfigInterfaceCommandProcessor))
+        )
+    )
 
     def __init__(self, switch_configuration):
         super(AristaSwitchCore, self).__init__(switch_configuration)
@@ -62,15 +73,7 @@ class AristaSwitchCore(SwitchCore):
         ]
 
     def processor_stack(self, display):
-        common = (display,)
-
-        return DefaultCommandProcessor(
-            *common, enabled=EnabledCommandProcessor(
-                *common, config=ConfigCommandProcessor(
-                    *common, config_vlan=ConfigVlanCommandProcessor(*common),
-                    config_interface=ConfigInterfaceCommandProcessor(*common))
-            )
-        )
+        return self.processor_graph(display)
 
     def get_netconf_protocol(self):
         return None
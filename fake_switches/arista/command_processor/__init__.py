@@ -23,6 +23,9 @@ class AristaBaseCommandProcessor(BaseCommandProcessor):
     def __init__(self, display):
         self.display = display
 
+    def build_sub_processor(self, processor_graph):
+        return processor_graph(self.display)
+
     def read_vlan_number(self, input):
         try:
             number = int(input)
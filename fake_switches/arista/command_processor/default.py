@@ -11,6 +11,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from copy import deepcopy
+from weakref import WeakKeyDictionary
+
 from netaddr import IPNetwork
 
 from fake_switches.arista.command_processor import vlan_display_name, AristaBaseCommandProcessor, InvalidVlanNumber, \
@@ -58,124 +61,62 @@ class DefaultCommandProcessor(AristaBaseCommandProcessor):
             vlans = list(filter(lambda e: e.number == number, self.switch_configuration.vlans))
             if len(vlans) == 0:
                 self.display.invalid_result(self, "VLAN {} not found in current VLAN database".format(args[0]),
-                                            json_data=_to_vlans_json([]))
+                                            json_data=_to_vlans_json(self.switch_configuration, []))
                 return
         else:
             vlans = self.switch_configuration.vlans
 
-        self.display.show_vlans(self, _to_vlans_json(vlans))
+        self.display.show_vlans(self, _to_vlans_json(self.switch_configuration, vlans))
 
     @with_valid_port_list
     def _show_interfaces(self, ports):
-        self.display.show_interface(self, _to_interface_json(ports))
+        self.display.show_interface(self, _to_interface_json(self.switch_configuration, ports))
 
     @with_valid_port_list
     def _show_interfaces_switchport(self, ports):
         phys_ports = filter(lambda p: not isinstance(p, VlanPort), ports)
-        self.display.show_interface_switchport(self, _to_switchport_json(phys_ports))
+        self.display.show_interface_switchport(self, _to_switchport_json(self.switch_configuration, phys_ports))
 
 
-def _to_vlans_json(vlans):
+def _to_vlans_json(switch_configuration, vlans):
+    cache = _json_cache(switch_configuration)
     return {
         "vlans": {
-            str(vlan.number): {
-                "dynamic": False,
-                "interfaces": {},
-                "name": vlan_display_name(vlan),
-                "status": "active"
-            } for vlan in vlans
+            str(vlan.number): _cached(cache, "vlan", vlan, vlan_display_name(vlan),
+                                      lambda: _overlay(_VLAN_TEMPLATE, name=vlan_display_name(vlan)))
+            for vlan in vlans
         }
     }
 
 
-def _to_interface_json(ports):
+def _to_interface_json(switch_configuration, ports):
+    cache = _json_cache(switch_configuration)
     return {
         "interfaces": {
-            port.name: _json_format_interface(port) for port in ports
+            port.name: _json_format_interface(cache, port) for port in ports
         }
     }
 
 
-def _json_format_interface(port):
+def _json_format_interface(cache, port):
     if isinstance(port, VlanPort):
-        return _to_ip_interface_json(port)
+        return _to_ip_interface_json(cache, port)
     else:
-        return _to_phys_interface_json(port)
+        return _to_phys_interface_json(cache, port)
 
 
-def _to_phys_interface_json(port):
-    return {
-        "lastStatusChangeTimestamp": 0.0,
-        "name": port.name,
-        "interfaceStatus": "connected",
-        "autoNegotiate": "unknown",
-        "burnedInAddress": "00:00:00:00:00:00",
-        "loopbackMode": "loopbackNone",
-        "interfaceStatistics": {
-            "inBitsRate": 0.0,
-            "inPktsRate": 0.0,
-            "outBitsRate": 0.0,
-            "updateInterval": 0.0,
-            "outPktsRate": 0.0
-        },
-        "mtu": 9214,
-        "hardware": "ethernet",
-        "duplex": "duplexFull",
-        "bandwidth": 0,
-        "forwardingModel": "bridged",
-        "lineProtocolStatus": "up",
-        "interfaceCounters": {
-            "outBroadcastPkts": 0,
-            "outUcastPkts": 0,
-            "totalOutErrors": 0,
-            "inMulticastPkts": 0,
-            "counterRefreshTime": 0,
-            "inBroadcastPkts": 0,
-            "outputErrorsDetail": {
-                "deferredTransmissions": 0,
-                "txPause": 0,
-                "collisions": 0,
-                "lateCollisions": 0
-            },
-            "inOctets": 0,
-            "outDiscards": 0,
-            "outOctets": 0,
-            "inUcastPkts": 0,
-            "inTotalPkts": 0,
-            "inputErrorsDetail": {
-                "runtFrames": 0,
-                "rxPause": 0,
-                "fcsErrors": 0,
-                "alignmentErrors": 0,
-                "giantFrames": 0,
-                "symbolErrors": 0
-            },
-            "linkStatusChanges": 5,
-            "outMulticastPkts": 0,
-            "totalInErrors": 0,
-            "inDiscards": 0
-        },
-        "interfaceAddress": [],
-        "physicalAddress": "00:00:00:00:00:00",
-        "description": ""
-    }
+def _to_phys_interface_json(cache, port):
+    return _cached(cache, "interface", port, port.name,
+                   lambda: _overlay(_PHYS_INTERFACE_TEMPLATE, name=port.name))
 
 
-def _to_ip_interface_json(port):
-    return {
-        "bandwidth": 0,
-        "burnedInAddress": "00:00:00:00:00:00",
-        "description": "",
-        "forwardingModel": "routed",
-        "hardware": "vlan",
-        "interfaceAddress": _interface_address_json(port),
-        "interfaceStatus": "connected",
-        "lastStatusChangeTimestamp": 0.0,
-        "lineProtocolStatus": "up",
-        "mtu": 1500,
-        "name": port.name,
-        "physicalAddress": "00:00:00:00:00:00"
-    }
+def _to_ip_interface_json(cache, port):
+    # IPNetwork equality ignores the host bits, 10.0.0.2/24 == 10.0.0.3/24
+    fingerprint = (port.name, tuple(str(ip) for ip in port.ips),
+                   port.vendor_specific.get("has-internet-protocol", False))
+    return _cached(cache, "interface", port, fingerprint,
+                   lambda: _overlay(_IP_INTERFACE_TEMPLATE, name=port.name,
+                                    interfaceAddress=_interface_address_json(port)))
 
 
 def _interface_address_json(port):
@@ -218,33 +159,26 @@ def _interface_address_json(port):
     }]
 
 
-def _to_switchport_json(ports):
+def _to_switchport_json(switch_configuration, ports):
+    cache = _json_cache(switch_configuration)
     return {
         "switchports": {
-            port.name: {
-                "enabled": True,
-                "switchportInfo": {
-                    "accessVlanId": 1,
-                    "accessVlanName": "default",
-                    "dot1qVlanTagRequired": False,
-                    "dot1qVlanTagRequiredStatus": False,
-                    "dynamicAllowedVlans": {},
-                    "dynamicTrunkGroups": [],
-                    "macLearning": True,
-                    "mode": port.mode or "access",
-                    "sourceportFilterMode": "enabled",
-                    "staticTrunkGroups": [],
-                    "tpid": "0x8100",
-                    "tpidStatus": True,
-                    "trunkAllowedVlans": _allow_vlans(port.trunk_vlans),
-                    "trunkingNativeVlanId": 1,
-                    "trunkingNativeVlanName": "default"
-                }
-            } for port in ports
+            port.name: _cached(cache, "switchport", port, _switchport_fingerprint(port),
+                               lambda: {
+                                   "enabled": True,
+                                   "switchportInfo": _overlay(_SWITCHPORT_INFO_TEMPLATE,
+                                                              mode=port.mode or "access",
+                                                              trunkAllowedVlans=_allow_vlans(port.trunk_vlans))
+                               })
+            for port in ports
         }
     }
 
 
+def _switchport_fingerprint(port):
+    return port.mode, None if port.trunk_vlans is None else tuple(port.trunk_vlans)
+
+
 def _allow_vlans(vlans):
     if vlans is None:
         return "ALL"
@@ -252,3 +186,122 @@ def _allow_vlans(vlans):
         return "NONE"
 
     return to_vlan_ranges(vlans)
+
+
+def _json_cache(switch_configuration):
+    cache = _json_caches.setdefault(switch_configuration, {})
+    # at most an interface and a switchport entry per port and a vlan entry per vlan, more means some were removed
+    if len(cache) > 2 * len(switch_configuration.ports) + len(switch_configuration.vlans):
+        for key in [key for key in cache if key[1].switch_configuration is not switch_configuration]:
+            del cache[key]
+    return cache
+
+
+def _cached(cache, kind, obj, fingerprint, build):
+    cached = cache.get((kind, obj))
+    if cached is None or cached[0] != fingerprint:
+        cached = cache[(kind, obj)] = (fingerprint, build())
+    return cached[1]
+
+
+def _overlay(template, **values):
+    return {key: values[key] if key in values else deepcopy(value) for key, value in template.items()}
+
+
+_json_caches = WeakKeyDictionary()
+
+_VLAN_TEMPLATE = {
+    "dynamic": False,
+    "interfaces": {},
+    "name": None,
+    "status": "active"
+}
+
+_PHYS_INTERFACE_TEMPLATE = {
+    "lastStatusChangeTimestamp": 0.0,
+    "name": None,
+    "interfaceStatus": "connected",
+    "autoNegotiate": "unknown",
+    "burnedInAddress": "00:00:00:00:00:00",
+    "loopbackMode": "loopbackNone",
+    "interfaceStatistics": {
+        "inBitsRate": 0.0,
+        "inPktsRate": 0.0,
+        "outBitsRate": 0.0,
+        "updateInterval": 0.0,
+        "outPktsRate": 0.0
+    },
+    "mtu": 9214,
+    "hardware": "ethernet",
+    "duplex": "duplexFull",
+    "bandwidth": 0,
+    "forwardingModel": "bridged",
+    "lineProtocolStatus": "up",
+    "interfaceCounters": {
+        "outBroadcastPkts": 0,
+        "outUcastPkts": 0,
+        "totalOutErrors": 0,
+        "inMulticastPkts": 0,
+        "counterRefreshTime": 0,
+        "inBroadcastPkts": 0,
+        "outputErrorsDetail": {
+            "deferredTransmissions": 0,
+            "txPause": 0,
+            "collisions": 0,
+            "lateCollisions": 0
+        },
+        "inOctets": 0,
+        "outDiscards": 0,
+        "outOctets": 0,
+        "inUcastPkts": 0,
+        "inTotalPkts": 0,
+        "inputErrorsDetail": {
+            "runtFrames": 0,
+            "rxPause": 0,
+            "fcsErrors": 0,
+            "alignmentErrors": 0,
+            "giantFrames": 0,
+            "symbolErrors": 0
+        },
+        "linkStatusChanges": 5,
+        "outMulticastPkts": 0,
+        "totalInErrors": 0,
+        "inDiscards": 0
+    },
+    "interfaceAddress": [],
+    "physicalAddress": "00:00:00:00:00:00",
+    "description": ""
+}
+
+_IP_INTERFACE_TEMPLATE = {
+    "bandwidth": 0,
+    "burnedInAddress": "00:00:00:00:00:00",
+    "description": "",
+    "forwardingModel": "routed",
+    "hardware": "vlan",
+    "interfaceAddress": [],
+    "interfaceStatus": "connected",
+    "lastStatusChangeTimestamp": 0.0,
+    "lineProtocolStatus": "up",
+    "mtu": 1500,
+    "name": None,
+    "physicalAddress": "00:00:00:00:00:00"
+}
+
+_SWITCHPORT_INFO_TEMPLATE = {
+    "accessVlanId": 1,
+    "accessVlanName": "default",
+    "dot1qVlanTagRequired": False,
+    "dot1qVlanTagRequiredStatus": False,
+    "dynamicAllowedVlans": {},
+    "dynamicTrunkGroups": [],
+    "macLearning": True,
+    "mode": None,
+    "sourceportFilterMode": "enabled",
+    "staticTrunkGroups": [],
+    "tpid": "0x8100",
+    "tpidStatus": True,
+    "trunkAllowedVlans": None,
+    "trunkingNativeVlanId": 1,
+    "trunkingNativeVlanName": "default"
+}
@@ -13,12 +13,23 @@
 # limitations under the License.
 
 import json
+import traceback
 
+from twisted.internet import task
 from twisted.web import resource
+from twisted.web.server import NOT_DONE_YET
 
 from fake_switches.arista.command_processor.terminal_display import TerminalDisplay
 from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
-from fake_switches.terminal import TerminalController
+from fake_switches.recording import open_recording
+from fake_switches.terminal import BufferingTerminalController
+
+
+RESPONSE_CHUNK_SIZE = 65536
+
+INVALID_REQUEST = -32600
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
 
 
 class EAPI(resource.Resource, object):
@@ -30,25 +41,100 @@ class EAPI(resource.Resource, object):
         self.switch_configuration = switch_configuration
         self.processor_stack_factory = processor_stack_factory
         self.logger = logger
+        self.piping_processor = NotPipingProcessor()
+        self.idle_processors = {}
+        self.cooperate = task.cooperate
 
     def render_POST(self, request):
-        content = json.loads(request.content.read().decode())
+        body = request.content.read()
+        content = json_loads(body)
         self.logger.info("Request in: {}".format(content))
 
-        driver = driver_for(content["params"]["format"])
+        recording = open_recording(self.switch_configuration, "eapi")
+        if recording is not None:
+            recording.input(body.decode())
+            request = _RecordedRequest(request, recording)
+
+        work = self.cooperate(self.respond(request, content))
+        request.notifyFinish().addErrback(lambda _: _stop(work))
+        work.whenDone().addCallbacks(lambda _: request.finish(), self._failed, errbackArgs=(request,))
+
+        return NOT_DONE_YET
+
+    def respond(self, request, content):
+        batch = isinstance(content, list)
+        if batch and len(content) == 0:
+            request.write(json_dumps(_error_response(None, INVALID_REQUEST, "Invalid Request: empty batch")))
+            return
+
+        calls = content if batch else [content]
+        if batch:
+            request.write(b"[")
+        for i, call in enumerate(calls):
+            if i > 0:
+                request.write(b",")
+
+            result = _invalid_call(call)
+            if result is None:
+                result = {}
+                try:
+                    for _ in self.process_call(call, result):
+                        yield
+                except Exception:
+                    if not batch:
+                        raise
+                    self.logger.error("Call failed: {}".format(traceback.format_exc()))
+                    result = _error_response(call["id"], INTERNAL_ERROR, "Internal error")
+
+            payload = json_dumps(result)
+            for start in range(0, len(payload), RESPONSE_CHUNK_SIZE):
+                request.write(payload[start:start + RESPONSE_CHUNK_SIZE])
+                yield
+        if isinstance(content, list):
+            request.write(b"]")
+
+    def _failed(self, failure, request):
+        if failure.check(task.TaskStopped):
+            return
+
+        self.logger.error("Request failed: {}".format(failure.getTraceback()))
+        if not request.startedWriting:
+            request.setResponseCode(500)
+        request.finish()
+
+    def process_call(self, content, result):
+        driver_format = content["params"]["format"]
+        driver = driver_for(driver_format)
+
+        command_processor = self.acquire_processor(driver_format, driver)
+        try:
+            for _ in self.process_request(content, driver, command_processor, result):
+                yield
+        finally:
+            self.idle_processors[driver_format].append(command_processor)
+
+    def acquire_processor(self, driver_format, driver):
+        idle = self.idle_processors.setdefault(driver_format, [])
+        if idle:
+            command_processor = idle.pop()
+            terminal_controller = command_processor.terminal_controller
+            terminal_controller.pop()
+        else:
+            command_processor = self.processor_stack_factory(display=driver.display_class())
+            terminal_controller = BufferingTerminalController()
 
-        command_processor = self.processor_stack_factory(display=driver.display_class())
         command_processor.init(
             switch_configuration=self.switch_configuration,
-            terminal_controller=BufferingTerminalController(),
+            terminal_controller=terminal_controller,
             logger=self.logger,
-            piping_processor=NotPipingProcessor()
+            piping_processor=self.piping_processor
         )
+        driver.reset(command_processor.display)
+        return command_processor
 
-        result = {
-            "jsonrpc": content["jsonrpc"],
-            "id": content["id"],
-        }
+    def process_request(self, content, driver, command_processor, result):
+        result["jsonrpc"] = content["jsonrpc"]
+        result["id"] = content["id"]
 
         command_index = 1
         command_results = []
@@ -57,6 +143,7 @@ class EAPI(resource.Resource, object):
                 command_processor.process_command(cmd)
                 command_results.append(driver.format_output(command_processor))
                 command_index += 1
+                yield
             result["result"] = command_results
         except CommandProcessorError as e:
             command_results.append(driver.format_errors([str(e)], base_obj=e.json_data))
@@ -71,7 +158,80 @@ class EAPI(resource.Resource, object):
                 "code": e.code
             }
 
-        return json.dumps(result).encode()
+
+def _invalid_call(call):
+    if not isinstance(call, dict) or call.get("jsonrpc") != "2.0" or "id" not in call:
+        return _error_response(call.get("id") if isinstance(call, dict) else None, INVALID_REQUEST, "Invalid Request")
+
+    params = call.get("params")
+    if not isinstance(params, dict) or not isinstance(params.get("cmds"), list):
+        return _error_response(call["id"], INVALID_PARAMS, "Invalid params: expected a list of cmds")
+    if params.get("format") not in ("json", "text"):
+        return _error_response(call["id"], INVALID_PARAMS,
+                               "Invalid params: expected format to be 'json' or 'text'")
+    return None
+
+
+def _error_response(id, code, message):
+    return {
+        "jsonrpc": "2.0",
+        "id": id,
+        "error": {
+            "code": code,
+            "message": message
+        }
+    }
+
+
+def _active_processor(command_processor):
+    while command_processor.sub_processor is not None:
+        command_processor = command_processor.sub_processor
+    return command_processor
+
+
+class _RecordedRequest(object):
+    def __init__(self, request, recording):
+        self._request = request
+        self._recording = recording
+        self._written = []
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
+
+    def write(self, data):
+        self._written.append(data)
+        self._request.write(data)
+
+    def finish(self):
+        self._recording.output(b"".join(self._written).decode())
+        self._recording.close()
+        self._request.finish()
+
+
+def _stop(work):
+    try:
+        work.stop()
+    except task.TaskDone:
+        pass
+
+
+def _json_codec():
+    try:
+        import orjson
+        return orjson.loads, lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    except ImportError:
+        pass
+
+    try:
+        import ujson
+        return ujson.loads, lambda obj: ujson.dumps(obj).encode()
+    except ImportError:
+        pass
+
+    return lambda data: json.loads(data.decode()), lambda obj: json.dumps(obj).encode()
+
+
+json_loads, json_dumps = _json_codec()
 
 
 def driver_for(format):
@@ -121,6 +281,9 @@ class JsonDisplay(object):
 class JsonDriver(object):
     display_class = JsonDisplay
 
+    def reset(self, display):
+        display.display_object = None
+
     def format_output(self, command_processor):
         obj = command_processor.display.display_object or {}
         obj['sourceDetail'] = ''
@@ -136,29 +299,13 @@ class JsonDriver(object):
 class TextDriver(object):
     display_class = TerminalDisplay
 
+    def reset(self, display):
+        pass
+
     def format_output(self, command_processor):
         return {
-            "output": strip_prompt(command_processor, command_processor.terminal_controller.pop())
+            "output": command_processor.terminal_controller.pop(trailing=_active_processor(command_processor).get_prompt())
         }
 
     def format_errors(self, errors, base_obj):
         raise NotImplementedError
-
-
-class BufferingTerminalController(TerminalController):
-
-    def __init__(self):
-        self.buffer = ""
-
-    def pop(self):
-        buffer = self.buffer
-        self.buffer = ""
-        return buffer
-
-    def write(self, text):
-        self.buffer += text
-
-
-def strip_prompt(command_processor, content):
-    prompt = command_processor.get_prompt()
-    return content[:-len(prompt)]
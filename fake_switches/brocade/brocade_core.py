@@ -25,12 +25,29 @@ from fake_switches.brocade.command_processor.config_vrf import ConfigVrfCommandP
 from fake_switches.brocade.command_processor.default import DefaultCommandProcessor
 from fake_switches.brocade.command_processor.enabled import EnabledCommandProcessor
 from fake_switches.brocade.command_processor.piping import PipingProcessor
+from fake_switches.command_processing.base_command_processor import ProcessorGraph
 from fake_switches.command_processing.shell_session import ShellSession
 from fake_switches.switch_configuration import Port
 from fake_switches.terminal import LoggingTerminalController
 
 
 class BrocadeSwitchCore(switch_core.SwitchCore):
+    processor_graph = ProcessorGraph(
+        DefaultCommandProcessor,
+        enabled=ProcessorGraph(
+            EnabledCommandProcessor,
+            config=ProcessorGraph(
+                ConfigCommandProcessor,
+                config_vlan=ProcessorGraph(ConfigVlanCommandProcessor),
+                config_vrf=ProcessorGraph(ConfigVrfCommandProcessor),
+                config_interface=ProcessorGraph(ConfigInterfaceCommandProcessor),
+                config_virtual_interface=ProcessorGraph(
+                    ConfigVirtualInterfaceCommandProcessor,
+                    config_virtual_interface_vrrp=ProcessorGraph(ConfigVirtualInterfaceVrrpCommandProcessor)
+                )
+            )
+        ))
+
     def __init__(self, switch_configuration):
         super(BrocadeSwitchCore, self).__init__(switch_configuration)
         self.switch_configuration.add_vlan(self.switch_configuration.new("Vlan", 1))
@@ -43,17 +60,7 @@ class BrocadeSwitchCore(switch_core.SwitchCore):
         self.logger = logging.getLogger(
             "fake_switches.brocade.%s.%s.%s" % (self.switch_configuration.name, self.last_connection_id, protocol))
 
-        command_processor = DefaultCommandProcessor(
-            enabled=EnabledCommandProcessor(
-                config=ConfigCommandProcessor(
-                    config_vlan=ConfigVlanCommandProcessor(),
-                    config_vrf=ConfigVrfCommandProcessor(),
-                    config_interface=ConfigInterfaceCommandProcessor(),
-                    config_virtual_interface=ConfigVirtualInterfaceCommandProcessor(
-                        config_virtual_interface_vrrp=ConfigVirtualInterfaceVrrpCommandProcessor()
-                    )
-                )
-            ))
+        command_processor = self.processor_graph()
         command_processor.init(switch_configuration=self.switch_configuration,
                                terminal_controller=LoggingTerminalController(self.logger, terminal_controller),
                                piping_processor=PipingProcessor(self.logger),
@@ -62,7 +62,8 @@ class EnabledCommandProcessor(BaseCommandProcessor):
 
     def do_ncopy(self, protocol, url, filename, target):
         try:
-            SwitchTftpParser(self.switch_configuration).parse(url, filename, self.config_processor)
+            config_processor = self.get_sub_processor(self.config_processor)
+            SwitchTftpParser(self.switch_configuration).parse(url, filename, config_processor)
             self.write_line("done")
         except Exception as e:
             self.logger.warning("tftp parsing went wrong : %s" % str(e))
@@ -87,13 +88,7 @@ class EnabledCommandProcessor(BaseCommandProcessor):
             else:
                 self.write_line("vlan %d" % vlan.number)
 
-            untagged_ports = []
-            for port in self.switch_configuration.ports:
-                if not isinstance(port, VlanPort):
-                    if vlan.number == 1 and port.access_vlan is None and port.trunk_native_vlan is None:
-                        untagged_ports.append(port)
-                    elif port.access_vlan == vlan.number or port.trunk_native_vlan == vlan.number:
-                        untagged_ports.append(port)
+            untagged_ports = self.get_untagged_ports_for(vlan)
 
             if len(untagged_ports) > 0:
                 if vlan.number == 1:
@@ -101,8 +96,7 @@ class EnabledCommandProcessor(BaseCommandProcessor):
                 else:
                     self.write_line(" untagged %s" % to_port_ranges(untagged_ports))
 
-            tagged_ports = [p for p in self.switch_configuration.ports if
-                            p.trunk_vlans and vlan.number in p.trunk_vlans]
+            tagged_ports = self.switch_configuration.get_members(("trunk_vlans", vlan.number))
             if tagged_ports:
                 self.write_line(" tagged %s" % to_port_ranges(tagged_ports))
 
@@ -183,8 +177,10 @@ class EnabledCommandProcessor(BaseCommandProcessor):
         self.write_line("VLAN     Name       Encap ESI                              Ve    Pri Ports")
         self.write_line("----     ----       ----- ---                              ----- --- -----")
         for vlan in sorted(self.switch_configuration.vlans, key=lambda v: v.number):
-            ports = [port for port in self.switch_configuration.ports
-                     if port.access_vlan == vlan.number or (port.access_vlan is None and vlan.number == 1)]
+            memberships = [("access_vlan", vlan.number)]
+            if vlan.number == 1:
+                memberships.append(("access_vlan", None))
+            ports = self.switch_configuration.get_members(*memberships)
             self.write_line("%-4s     %-10s                                        -     -%s" % (
                 vlan.number,
                 vlan_name(vlan)[:10] if vlan_name(vlan) else "[None]",
@@ -257,9 +253,7 @@ class EnabledCommandProcessor(BaseCommandProcessor):
                 self.write_line("  Configured BW 0 kbps")
 
     def get_interface_vlan_for(self, vlan):
-        return next((p for p in self.switch_configuration.ports
-                     if isinstance(p, VlanPort) and p.vlan_id == vlan.number),
-                    None)
+        return next(iter(self.switch_configuration.get_members(("vlan_id", vlan.number))), None)
 
     def show_version(self):
         self.write_line("System: NetIron CER (Serial #: 1P2539K036,  Part #: 40-1000617-02)")
@@ -283,14 +277,21 @@ class EnabledCommandProcessor(BaseCommandProcessor):
         self.write_line("System uptime is 109 days 4 hours 39 minutes 4 seconds")
 
     def get_interface_ports_for(self, vlan):
-        vlan_ports = {"tagged": [], "untagged": []}
-        for port in self.switch_configuration.ports:
-            if not isinstance(port, VlanPort):
-                if port.access_vlan == vlan.number or port.trunk_native_vlan == vlan.number:
-                    vlan_ports["untagged"].append(port)
-                elif port.trunk_vlans and vlan.number in port.trunk_vlans:
-                    vlan_ports["tagged"].append(port)
-        return vlan_ports
+        untagged = [p for p in self.switch_configuration.get_members(("access_vlan", vlan.number),
+                                                                     ("trunk_native_vlan", vlan.number))
+                    if not isinstance(p, VlanPort)]
+        already_untagged = set(untagged)
+        tagged = [p for p in self.switch_configuration.get_members(("trunk_vlans", vlan.number))
+                  if not isinstance(p, VlanPort) and p not in already_untagged]
+        return {"tagged": tagged, "untagged": untagged}
+
+    def get_untagged_ports_for(self, vlan):
+        memberships = [("access_vlan", vlan.number), ("trunk_native_vlan", vlan.number)]
+        if vlan.number == 1:
+            memberships.append(("access_vlan", None))
+        return [p for p in self.switch_configuration.get_members(*memberships)
+                if not isinstance(p, VlanPort)
+                and (vlan.number != 1 or p.access_vlan == 1 or p.trunk_native_vlan in (None, 1))]
 
 
 def port_index(port):
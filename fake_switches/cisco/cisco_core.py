@@ -22,12 +22,15 @@ from fake_switches.cisco.command_processor.config_vrf import ConfigVRFCommandPro
 from fake_switches.cisco.command_processor.default import DefaultCommandProcessor
 from fake_switches.cisco.command_processor.enabled import EnabledCommandProcessor
 from fake_switches.cisco.command_processor.piping import PipingProcessor
+from fake_switches.command_processing.base_command_processor import ProcessorGraph
 from fake_switches.command_processing.shell_session import ShellSession
 from fake_switches.switch_configuration import Port
 from fake_switches.terminal import LoggingTerminalController
 
 
 class BaseCiscoSwitchCore(switch_core.SwitchCore):
+    processor_graph = None
+
     def __init__(self, switch_configuration):
         super(BaseCiscoSwitchCore, self).__init__(switch_configuration)
         self.switch_configuration.add_vlan(self.switch_configuration.new("Vlan", 1))
@@ -41,9 +44,14 @@ class BaseCiscoSwitchCore(switch_core.SwitchCore):
         self.logger = logging.getLogger(
             "fake_switches.cisco.%s.%s.%s" % (self.switch_configuration.name, self.last_connection_id, protocol))
 
-        processor = self.new_command_processor()
-        if not self.switch_configuration.auto_enabled:
-            processor = DefaultCommandProcessor(processor)
+        if self.processor_graph is None:
+            processor = self.new_command_processor()
+            if not self.switch_configuration.auto_enabled:
+                processor = DefaultCommandProcessor(processor)
+        elif self.switch_configuration.auto_enabled:
+            processor = self.processor_graph()
+        else:
+            processor = DefaultCommandProcessor(self.processor_graph)
 
         processor.init(
             self.switch_configuration,
@@ -53,6 +61,7 @@ class BaseCiscoSwitchCore(switch_core.SwitchCore):
         return CiscoShellSession(processor)
 
     def new_command_processor(self):
+        # cores declaring no processor_graph still build their processors on every launch
         raise NotImplementedError
 
     def get_netconf_protocol(self):
@@ -77,14 +86,15 @@ class BaseCiscoSwitchCore(switch_core.SwitchCore):
 
 
 class Cisco2960SwitchCore(BaseCiscoSwitchCore):
-    def new_command_processor(self):
-        return EnabledCommandProcessor(
-            config=ConfigCommandProcessor(
-                config_vlan=ConfigVlanCommandProcessor(),
-                config_vrf=ConfigVRFCommandProcessor(),
-                config_interface=ConfigInterfaceCommandProcessor()
-            )
+    processor_graph = ProcessorGraph(
+        EnabledCommandProcessor,
+        config=ProcessorGraph(
+            ConfigCommandProcessor,
+            config_vlan=ProcessorGraph(ConfigVlanCommandProcessor),
+            config_vrf=ProcessorGraph(ConfigVRFCommandProcessor),
+            config_interface=ProcessorGraph(ConfigInterfaceCommandProcessor)
         )
+    )
 
 
 CiscoSwitchCore = Cisco2960SwitchCore  # Backward compatibility
@@ -16,6 +16,8 @@ import re
 import textwrap
 from functools import partial
 
+from netaddr import valid_ipv4, valid_ipv6
+
 from fake_switches import group_sequences
 from fake_switches.command_processing.base_command_processor import BaseCommandProcessor
 from fake_switches.command_processing.switch_tftp_parser import SwitchTftpParser
@@ -72,8 +74,8 @@ class EnabledCommandProcessor(BaseCommandProcessor):
             self.write_line("VLAN Name                             Status    Ports")
             self.write_line("---- -------------------------------- --------- -------------------------------")
             for vlan in sorted(self.switch_configuration.vlans, key=lambda v: v.number):
-                ports = [port.get_subname(length=2) for port in self.switch_configuration.get_physical_ports()
-                         if port.access_vlan == vlan.number or (vlan.number == 1 and port.access_vlan is None)]
+                ports = [port.get_subname(length=2) for port in self._get_access_members(vlan)
+                         if not isinstance(port, (VlanPort, AggregatedPort))]
                 formatted_membership = []
                 if ports:
                     ports_membership = ["    {}".format(l) for l in get_port_groups(ports, max_line_length=30)]
@@ -124,8 +126,8 @@ class EnabledCommandProcessor(BaseCommandProcessor):
             self.write_line("Group  Port-channel  Protocol    Ports")
             self.write_line("------+-------------+-----------+-----------------------------------------------")
             for port_channel in port_channels:
-                members = [short_name(p) for p in ports
-                           if p.aggregation_membership == port_channel.name]
+                members = [short_name(p) for p in sorted(
+                    self.switch_configuration.get_aggregation_members(port_channel.name), key=lambda x: x.name)]
                 self.write_line(
                     "{: <6} {: <13} {: <11} {}".format(
                         port_channel_number(port_channel),
@@ -167,10 +169,37 @@ class EnabledCommandProcessor(BaseCommandProcessor):
                     routes = self.switch_configuration.static_routes
                     for route in routes:
                         self.write_line("S        {0} [x/y] via {1}".format(route.destination, route.next_hop))
+                elif is_ip_address(args[2]):
+                    self.show_ip_route_for(args[2])
                 self.write_line("")
         elif "version".startswith(args[0]):
             self.show_version()
 
+    def show_ip_route_for(self, ip):
+        route = self.switch_configuration.get_static_route_for(ip)
+        port, port_ip = self.switch_configuration.get_connected_port_and_ip_for(ip)
+
+        if port is not None and (route is None or port_ip.prefixlen >= route.dest.prefixlen):
+            self.write_line("Routing entry for %s" % port_ip.cidr)
+            self.write_line("  Known via \"connected\", distance 0, metric 0 (connected, via interface)")
+            self.write_line("  Routing Descriptor Blocks:")
+            self.write_line("  * directly connected, via %s" % port.name)
+            self.write_line("      Route metric is 0, traffic share count is 1")
+        elif route is not None:
+            self.write_line("Routing entry for %s" % route.dest.cidr)
+            self.write_line("  Known via \"static\", distance 1, metric 0")
+            self.write_line("  Routing Descriptor Blocks:")
+            self.write_line("  * %s" % route.next_hop)
+            self.write_line("      Route metric is 0, traffic share count is 1")
+        else:
+            self.write_line("% Network not in table")
+
+    def _get_access_members(self, vlan):
+        memberships = [("access_vlan", vlan.number)]
+        if vlan.number == 1:
+            memberships.append(("access_vlan", None))
+        return self.switch_configuration.get_members(*memberships)
+
     def do_copy(self, source_url, destination_url):
         dest_protocol, dest_file = destination_url.split(":")
         self.write("Destination filename [%s]? " % strip_leading_slash(dest_file))
@@ -180,7 +209,8 @@ class EnabledCommandProcessor(BaseCommandProcessor):
         self.write_line("Accessing %s..." % source_url)
         try:
             url, filename = re.match('tftp://([^/]*)/(.*)', source_url).group(1, 2)
-            SwitchTftpParser(self.switch_configuration).parse(url, filename, self.config_processor)
+            config_processor = self.get_sub_processor(self.config_processor)
+            SwitchTftpParser(self.switch_configuration).parse(url, filename, config_processor)
             self.write_line("Done (or some official message...)")
         except Exception as e:
             self.logger.warning("tftp parsing went wrong : %s" % str(e))
@@ -231,6 +261,10 @@ class EnabledCommandProcessor(BaseCommandProcessor):
         ))
 
 
+def is_ip_address(text):
+    return valid_ipv4(text) or valid_ipv6(text)
+
+
 def strip_leading_slash(dest_file):
     return dest_file[1:]
 
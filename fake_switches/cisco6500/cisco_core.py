@@ -4,19 +4,21 @@ from fake_switches.cisco.command_processor.config_interface import ConfigInterfa
 from fake_switches.cisco.command_processor.config_vlan import ConfigVlanCommandProcessor
 from fake_switches.cisco.command_processor.config_vrf import ConfigVRFCommandProcessor
 from fake_switches.cisco.command_processor.enabled import EnabledCommandProcessor
-
-
-class Cisco6500SwitchCore(BaseCiscoSwitchCore):
-    def new_command_processor(self):
-        return EnabledCommandProcessor(
-            config=ConfigCommandProcessor(
-                config_vlan=ConfigVlanCommandProcessor(),
-                config_vrf=ConfigVRFCommandProcessor(),
-                config_interface=Cisco6500ConfigInterfaceCommandProcessor()
-            )
-        )
+from fake_switches.command_processing.base_command_processor import ProcessorGraph
 
 
 class Cisco6500ConfigInterfaceCommandProcessor(ConfigInterfaceCommandProcessor):
     def _handle_ip_verify_unicast(self):
         self.port.unicast_reverse_path_forwarding = True
+
+
+class Cisco6500SwitchCore(BaseCiscoSwitchCore):
+    processor_graph = ProcessorGraph(
+        EnabledCommandProcessor,
+        config=ProcessorGraph(
+            ConfigCommandProcessor,
+            config_vlan=ProcessorGraph(ConfigVlanCommandProcessor),
+            config_vrf=ProcessorGraph(ConfigVRFCommandProcessor),
+            config_interface=ProcessorGraph(Cisco6500ConfigInterfaceCommandProcessor)
+        )
+    )
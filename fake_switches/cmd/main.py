@@ -3,6 +3,7 @@ import logging
 
 
 from fake_switches import switch_factory
+from fake_switches.recording import SessionRecorder
 from fake_switches.transports.ssh_service import SwitchSshService
 from twisted.internet import reactor
 
@@ -24,12 +25,15 @@ def main():
     parser.add_argument('--password', type=str, default='root', help='Switch password')
     parser.add_argument('--listen-host', type=str, default='0.0.0.0', help='Listen host')
     parser.add_argument('--listen-port', type=int, default=2222, help='Listen port')
+    parser.add_argument('--record', type=str, help='Record the sessions in this file')
 
     args = parser.parse_args()
     args.password = args.password.encode()
 
+    recorder = SessionRecorder(open(args.record, 'a')) if args.record else None
+
     factory = switch_factory.SwitchFactory()
-    switch_core = factory.get(args.model, args.hostname, args.password)
+    switch_core = factory.get(args.model, args.hostname, args.password, recorder=recorder)
 
     ssh_service = SwitchSshService(
         ip=args.listen_host,
@@ -15,6 +15,21 @@
 from fake_switches.command_processing.command_processor import CommandProcessor
 
 
+class ProcessorGraph(object):
+    """
+    Describes a command processor and the modes it can move to without building them:
+    the graph of a switch is shared by all its sessions and each session only builds
+    the processors of the modes it enters.
+    """
+
+    def __init__(self, processor_class, **sub_processors):
+        self.processor_class = processor_class
+        self.sub_processors = sub_processors
+
+    def __call__(self, *args):
+        return self.processor_class(*args, **self.sub_processors)
+
+
 class BaseCommandProcessor(CommandProcessor):
     def init(self, switch_configuration, terminal_controller, logger, piping_processor, *args):
         """
@@ -82,6 +97,7 @@ class BaseCommandProcessor(CommandProcessor):
         return processed
 
     def move_to(self, new_processor, *args):
+        new_processor = self.get_sub_processor(new_processor)
         new_processor.init(self.switch_configuration,
                            self.terminal_controller,
                            self.logger,
@@ -91,6 +107,14 @@ class BaseCommandProcessor(CommandProcessor):
         self.logger.info("new subprocessor = {}".format(self.sub_processor.__class__.__name__))
         self.sub_processor.show_prompt()
 
+    def get_sub_processor(self, processor):
+        if isinstance(processor, ProcessorGraph):
+            return self.build_sub_processor(processor)
+        return processor
+
+    def build_sub_processor(self, processor_graph):
+        return processor_graph()
+
     def continue_to(self, continuing_action):
         self.continuing_to = continuing_action
 
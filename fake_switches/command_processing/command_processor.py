@@ -13,6 +13,9 @@
 # limitations under the License.
 
 import re
+from bisect import bisect_left
+
+_commands_by_class = {}
 
 
 class CommandProcessor(object):
@@ -30,8 +33,18 @@ class CommandProcessor(object):
 
             command = re.sub('[-]', "_", command)
 
-            matching = sorted([c for c in dir(self) if c.startswith('do_' + command)])
-            if len(matching) >= 1:
-                return getattr(self, matching[0], None), args
+            prefix = 'do_' + command
+            commands = _commands_of(type(self))
+            index = bisect_left(commands, prefix)
+            if index < len(commands) and commands[index].startswith(prefix):
+                return getattr(self, commands[index], None), args
 
         return None, []
+
+
+def _commands_of(processor_class):
+    try:
+        return _commands_by_class[processor_class]
+    except KeyError:
+        commands = _commands_by_class[processor_class] = sorted(c for c in dir(processor_class) if c.startswith('do_'))
+        return commands
@@ -0,0 +1,92 @@
+# Copyright 2018 Inap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+class CommandSession(object):
+    """
+    Drive a shell session without any transport: every command returns what
+    the switch wrote in response, without the prompt that follows it.
+
+    While the switch waits for a keystroke (a pager, a y/n question) the
+    characters of the next command are delivered as keystrokes, the same way
+    they would be if they were typed without pressing enter.
+    """
+
+    def __init__(self, shell_session, terminal_controller):
+        """
+        :type shell_session: fake_switches.command_processing.shell_session.ShellSession
+        :type terminal_controller: fake_switches.terminal.BufferingTerminalController
+        """
+        self.shell_session = shell_session
+        self.terminal_controller = terminal_controller
+        self.is_open = True
+
+        self.terminal_controller.pop()
+
+    def execute(self, commands):
+        return [self.send(command) for command in commands]
+
+    def send(self, line):
+        self._ensure_open()
+
+        if self.terminal_controller.any_key_handler is not None:
+            line = self._press(line)
+            if not line:
+                return self._output()
+
+        self.is_open = self.shell_session.receive(line)
+        return self._output()
+
+    def press(self, key):
+        self._ensure_open()
+        if self.terminal_controller.any_key_handler is None:
+            raise NotAwaitingKeystroke()
+
+        self._press(key[:1])
+        return self._output()
+
+    @property
+    def prompt(self):
+        return self.active_processor().get_prompt()
+
+    def active_processor(self):
+        processor = self.shell_session.command_processor
+        while processor.sub_processor is not None:
+            processor = processor.sub_processor
+        return processor
+
+    def _press(self, keys):
+        while keys and self.terminal_controller.any_key_handler is not None:
+            callback, params = self.terminal_controller.any_key_handler
+            callback(*(params + (keys[0],)))
+            keys = keys[1:]
+        return keys
+
+    def _output(self):
+        processor = self.active_processor()
+        if not self.is_open or processor.continuing_to or processor.awaiting_keystroke:
+            return self.terminal_controller.pop()
+        return self.terminal_controller.pop(trailing=processor.get_prompt())
+
+    def _ensure_open(self):
+        if not self.is_open:
+            raise SessionClosed()
+
+
+class SessionClosed(Exception):
+    pass
+
+
+class NotAwaitingKeystroke(Exception):
+    pass
@@ -12,18 +12,30 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from fake_switches.recording import open_recording
+from fake_switches.terminal import RecordingTerminalController
+
 
 class ShellSession(object):
     def __init__(self, command_processor):
         self.command_processor = command_processor
 
+        self.recording = open_recording(command_processor.switch_configuration, "cli")
+        if self.recording is not None:
+            command_processor.terminal_controller = RecordingTerminalController(
+                command_processor.terminal_controller, self.recording)
+
         self.command_processor.show_prompt()
 
     def receive(self, line):
         self.command_processor.logger.debug("received: %s" % line)
+        if self.recording is not None:
+            self.recording.input(line)
+
         try:
             processed = self.command_processor.process_command(line)
         except TerminalExitSignal:
+            self.close()
             return False
 
         if not processed:
@@ -33,11 +45,17 @@ class ShellSession(object):
 
             self.command_processor.show_prompt()
 
+        if self.command_processor.is_done:
+            self.close()
         return not self.command_processor.is_done
 
     def handle_unknown_command(self, line):
         pass
 
+    def close(self):
+        if self.recording is not None:
+            self.recording.close()
+
 
 class TerminalExitSignal(Exception):
     pass
@@ -16,7 +16,7 @@ import logging
 
 from fake_switches.adapters import tftp_reader
 from fake_switches.command_processing.piping_processor_base import NotPipingProcessor
-from fake_switches.terminal import NoopTerminalController
+from fake_switches.terminal import BufferingTerminalController
 
 
 class SwitchTftpParser(object):
@@ -30,10 +30,12 @@ class SwitchTftpParser(object):
 
         data = self.reader.read_tftp(url, filename).split("\n")
 
+        terminal_controller = BufferingTerminalController()
         command_processor.init(
-            self.configuration, NoopTerminalController(),
+            self.configuration, terminal_controller,
             self.logger, NotPipingProcessor())
 
         for line in data:
-            self.logger.debug("Processing : %s" % line)
+            self.logger.debug("Processing : %s", line)
             command_processor.process_command(line)
+            self.logger.debug("Output : %r", terminal_controller.pop())
@@ -247,12 +247,9 @@ class DellEnabledCommandProcessor(BaseCommandProcessor):
             self.on_keystroke(self.continue_vlan_pages, vlans)
 
     def get_ports_for_vlan(self, vlan):
-        ports = []
-        for port in self.switch_configuration.ports:
-            if not isinstance(port, VlanPort):
-                if (port.trunk_vlans and vlan.number in port.trunk_vlans) or port.access_vlan == vlan.number:
-                    ports.append(port)
-        return ports
+        return [port for port in self.switch_configuration.get_members(("trunk_vlans", vlan.number),
+                                                                       ("access_vlan", vlan.number))
+                if not isinstance(port, VlanPort)]
 
     def _build_port_strings(self, ports):
         port_range_list = group_sequences(ports, are_in_sequence=self._are_in_sequence)
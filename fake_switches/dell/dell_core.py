@@ -18,6 +18,7 @@ from fake_switches.brocade.brocade_core import BrocadeSwitchCore
 from fake_switches.brocade.command_processor.config_vrf import ConfigVrfCommandProcessor
 from fake_switches.brocade.command_processor.piping import \
     PipingProcessor
+from fake_switches.command_processing.base_command_processor import ProcessorGraph
 from fake_switches.command_processing.shell_session import \
     ShellSession
 from fake_switches.dell.command_processor.config import DellConfigCommandProcessor
@@ -31,17 +32,22 @@ from fake_switches.terminal import LoggingTerminalController
 
 
 class DellSwitchCore(BrocadeSwitchCore):
+    processor_graph = ProcessorGraph(
+        DellDefaultCommandProcessor,
+        enabled=ProcessorGraph(
+            DellEnabledCommandProcessor,
+            config=ProcessorGraph(
+                DellConfigCommandProcessor,
+                config_vlan=ProcessorGraph(DellConfigureVlanCommandProcessor),
+                config_vrf=ProcessorGraph(ConfigVrfCommandProcessor),
+                config_interface=ProcessorGraph(DellConfigInterfaceCommandProcessor)
+            )))
+
     def launch(self, protocol, terminal_controller):
         self.last_connection_id += 1
         self.logger = logging.getLogger("fake_switches.dell.%s.%s.%s" % (self.switch_configuration.name, self.last_connection_id, protocol))
 
-        processor = DellDefaultCommandProcessor(
-            enabled=DellEnabledCommandProcessor(
-                config=DellConfigCommandProcessor(
-                    config_vlan=DellConfigureVlanCommandProcessor(),
-                    config_vrf=ConfigVrfCommandProcessor(),
-                    config_interface=DellConfigInterfaceCommandProcessor()
-                )))
+        processor = self.processor_graph()
         processor.init(
             switch_configuration=self.switch_configuration,
             terminal_controller=LoggingTerminalController(self.logger, terminal_controller),
@@ -17,6 +17,7 @@ import logging
 from fake_switches.brocade.command_processor.config_vrf import ConfigVrfCommandProcessor
 from fake_switches.brocade.command_processor.piping import \
     PipingProcessor
+from fake_switches.command_processing.base_command_processor import ProcessorGraph
 from fake_switches.dell.dell_core import DellSwitchCore, DellShellSession
 from fake_switches.dell10g.command_processor.config import Dell10GConfigCommandProcessor
 from fake_switches.dell10g.command_processor.config_interface import Dell10GConfigInterfaceCommandProcessor
@@ -29,17 +30,22 @@ from fake_switches.terminal import LoggingTerminalController
 
 
 class Dell10GSwitchCore(DellSwitchCore):
+    processor_graph = ProcessorGraph(
+        Dell10GDefaultCommandProcessor,
+        enabled=ProcessorGraph(
+            Dell10GEnabledCommandProcessor,
+            config=ProcessorGraph(
+                Dell10GConfigCommandProcessor,
+                config_vlan=ProcessorGraph(Dell10GConfigureVlanCommandProcessor),
+                config_vrf=ProcessorGraph(ConfigVrfCommandProcessor),
+                config_interface=ProcessorGraph(Dell10GConfigInterfaceCommandProcessor)
+            )))
+
     def launch(self, protocol, terminal_controller):
         self.last_connection_id += 1
         self.logger = logging.getLogger("fake_switches.dell10g.%s.%s.%s" % (self.switch_configuration.name, self.last_connection_id, protocol))
 
-        processor = Dell10GDefaultCommandProcessor(
-            enabled=Dell10GEnabledCommandProcessor(
-                config=Dell10GConfigCommandProcessor(
-                    config_vlan=Dell10GConfigureVlanCommandProcessor(),
-                    config_vrf=ConfigVrfCommandProcessor(),
-                    config_interface=Dell10GConfigInterfaceCommandProcessor()
-                )))
+        processor = self.processor_graph()
         processor.init(
             switch_configuration=self.switch_configuration,
             terminal_controller=LoggingTerminalController(self.logger, terminal_controller),
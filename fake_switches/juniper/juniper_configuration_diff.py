@@ -0,0 +1,192 @@
+# Copyright 2015-2016 Internap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import re
+from collections import OrderedDict
+
+UNLABELED_LISTS = [("interfaces", "interface"), ("vlans", "vlan"), ("bridge-domains", "domain")]
+
+
+def configuration_diff(old, new):
+    lines = []
+    _diff_children([], old, new, lines, _signatures(old, new))
+    return "\n".join(lines)
+
+
+def _diff_children(path, old, new, lines, signatures):
+    old_children = _keyed_children(old)
+    new_children = _keyed_children(new)
+
+    changes = []
+    nested_changes = []
+    for key, old_child in old_children.items():
+        new_child = new_children.get(key)
+        if new_child is None:
+            _render(old_child, "-", 1, changes)
+        elif not _same(old_child, new_child, signatures):
+            if _is_leaf(old_child) and _is_leaf(new_child) and _values(old_child) and _values(new_child):
+                _render_values(old_child, new_child, changes)
+            elif _is_leaf(old_child) or _is_leaf(new_child):
+                _render(old_child, "-", 1, changes)
+                _render(new_child, "+", 1, changes)
+            else:
+                _diff_children(path + [_label(old_child)], old_child, new_child, nested_changes, signatures)
+
+    for key, new_child in new_children.items():
+        if key not in old_children:
+            _render(new_child, "+", 1, changes)
+
+    if changes:
+        lines.append("[edit{}]".format("".join(" " + p for p in path)))
+        lines.extend(changes)
+    lines.extend(nested_changes)
+
+
+def changed_paths(old, new):
+    paths = set()
+    _collect_changed_paths((), old, new, paths, _signatures(old, new))
+    return paths
+
+
+def _collect_changed_paths(path, old, new, paths, signatures):
+    old_children = _keyed_children(old) if old is not None else OrderedDict()
+    new_children = _keyed_children(new) if new is not None else OrderedDict()
+
+    if not old_children and not new_children:
+        paths.add(path)
+        return
+
+    for key in list(old_children) + [k for k in new_children if k not in old_children]:
+        old_child = old_children.get(key)
+        new_child = new_children.get(key)
+        if _is_leaf(old_child) or _is_leaf(new_child):
+            if old_child is None or new_child is None or not _same(old_child, new_child, signatures):
+                paths.add(path + (key,))
+        elif old_child is None or new_child is None or not _same(old_child, new_child, signatures):
+            _collect_changed_paths(path + (key,), old_child, new_child, paths, signatures)
+
+
+def _keyed_children(node):
+    children = OrderedDict()
+    name_node = _name_node(node)
+    for child in node:
+        if child is name_node or callable(child.tag):
+            continue
+        name = _name_node(child)
+        if name is not None:
+            children[(child.tag, name.text.strip())] = child
+        elif len(child) == 0:
+            children.setdefault((child.tag,), []).append(child)
+        else:
+            key = (child.tag,)
+            while key in children:
+                key += (len(key),)
+            children[key] = child
+    return children
+
+
+def _name_node(node):
+    if isinstance(node, list):
+        return None
+    name = next((child for child in node if child.tag == "name"), None)
+    if name is not None and len(name) == 0 and name.text and name.text.strip():
+        return name
+    return None
+
+
+def _same(old, new, signatures):
+    if _is_leaf(old) or _is_leaf(new):
+        return _is_leaf(old) and _is_leaf(new) and _values(old) == _values(new)
+    return signatures[old] == signatures[new]
+
+
+def _signatures(*roots):
+    """Digest of every element, built from the digests of its children."""
+    signatures = {}
+    for root in roots:
+        for node in reversed(list(root.iter())):
+            if callable(node.tag):
+                continue
+            digest = hashlib.sha1()
+            digest.update(node.tag.encode("utf-8") + b"\0")
+            for name, value in sorted(node.attrib.items()):
+                digest.update("{}={}\0".format(name, value).encode("utf-8"))
+            digest.update((node.text or "").strip().encode("utf-8") + b"\0")
+            for child in node:
+                if not callable(child.tag):
+                    digest.update(signatures[child])
+            signatures[node] = digest.digest()
+    return signatures
+
+
+def _is_leaf(entry):
+    return isinstance(entry, list)
+
+
+def _values(leaves):
+    return [leaf.text.strip() for leaf in leaves if leaf.text and leaf.text.strip()]
+
+
+def _label(node):
+    name = _name_node(node)
+    if name is None:
+        return node.tag
+    parent = node.getparent()
+    if parent is not None and (parent.tag, node.tag) in UNLABELED_LISTS:
+        return _quote(name.text.strip())
+    return "{} {}".format(node.tag, _quote(name.text.strip()))
+
+
+def _render(entry, sign, depth, lines):
+    prefix = sign + ("    " * depth)[1:]
+
+    if _is_leaf(entry):
+        values = _values(entry)
+        tag = entry[0].tag
+        if not values:
+            lines.append("{}{};".format(prefix, tag))
+        elif len(values) == 1:
+            lines.append("{}{} {};".format(prefix, tag, _quote(values[0])))
+        else:
+            lines.append("{}{} [ {} ];".format(prefix, tag, " ".join(_quote(v) for v in values)))
+        return
+
+    children = _keyed_children(entry)
+    if not children:
+        lines.append("{}{};".format(prefix, _label(entry)))
+        return
+
+    lines.append("{}{} {{".format(prefix, _label(entry)))
+    for child in children.values():
+        _render(child, sign, depth + 1, lines)
+    lines.append("{}}}".format(prefix))
+
+
+def _render_values(old, new, lines):
+    old_values = _values(old)
+    new_values = _values(new)
+    tag = old[0].tag
+    for value in old_values:
+        if value not in new_values:
+            lines.append("-   {} {};".format(tag, _quote(value)))
+    for value in new_values:
+        if value not in old_values:
+            lines.append("+   {} {};".format(tag, _quote(value)))
+
+
+def _quote(value):
+    if value == "" or re.search(r"[\s;{}\[\]\"#]", value):
+        return '"{}"'.format(value.replace('"', '\\"'))
+    return value
@@ -13,14 +13,14 @@
 # limitations under the License.
 
 import logging
-import textwrap
 
 from fake_switches import switch_core
 from fake_switches.juniper.juniper_netconf_datastore import JuniperNetconfDatastore, NS_JUNOS
-from fake_switches.netconf import OperationNotSupported, RUNNING, CANDIDATE, Response, xml_equals, NetconfError
+from fake_switches.netconf import OperationNotSupported, RUNNING, CANDIDATE, Response, NetconfError
 from fake_switches.netconf.capabilities import Candidate1_0, ConfirmedCommit1_0, Validate1_0, Url1_0, \
     Capability
 from fake_switches.netconf.netconf_protocol import NetconfProtocol
+from fake_switches.recording import open_recording
 from fake_switches.switch_configuration import Port, AggregatedPort
 from lxml import etree
 
@@ -41,12 +41,18 @@ class BaseJuniperSwitchCore(switch_core.SwitchCore):
     def get_netconf_protocol(self):
         self.last_connection_id += 1
 
+        datastore = self.datastore
+        if self.switch_configuration.private_candidates:
+            datastore = datastore.private_session()
+
         return NetconfProtocol(
-            datastore=self.datastore,
+            datastore=datastore,
             capabilities=self.capabilities(),
             additionnal_namespaces={"junos": NS_JUNOS},
+            pretty_print=not self.switch_configuration.compact_netconf_replies,
             logger=logging.getLogger(
-                "fake_switches.juniper.%s.%s.netconf" % (self.switch_configuration.name, self.last_connection_id))
+                "fake_switches.juniper.%s.%s.netconf" % (self.switch_configuration.name, self.last_connection_id)),
+            recording=open_recording(self.switch_configuration, "netconf")
         )
 
     def capabilities(self):
@@ -78,17 +84,11 @@ class NetconfJunos1_0(Capability):
         if "compare" not in request.attrib:
             raise OperationNotSupported("get_configuration without a compare")
 
-        running = self.datastore.to_etree(RUNNING)
-        candidate = self.datastore.to_etree(CANDIDATE)
-
-        # NOTE(lindycoder): Not actually computing the diff, not needed so far, just show that there's a change
-        data_string = textwrap.dedent(
-            """
-            <configuration-information>
-                <configuration-output>{0}</configuration-output>
-            </configuration-information>
-            """).format("There were some changes" if not xml_equals(running, candidate) else "")
-        data = etree.fromstring(data_string, parser=etree.XMLParser(recover=True))
+        data = etree.Element("configuration-information")
+        output = etree.SubElement(data, "configuration-output")
+        diff = self.datastore.candidate_diff()
+        if diff:
+            output.text = "\n{}\n".format(diff)
 
         return Response(data)
 
@@ -13,18 +13,25 @@
 # limitations under the License.
 
 import re
-from copy import deepcopy
+from copy import copy, deepcopy
 
 from lxml import etree
+from netaddr import IPNetwork
+from twisted.internet import reactor
 
 from fake_switches.netconf import XML_NS, XML_ATTRIBUTES, CANDIDATE, RUNNING, AlreadyLocked, NetconfError, \
     CannotLockUncleanCandidate, first,UnknownVlan, InvalidInterfaceType, InvalidTrailingInput, \
     AggregatePortOutOfRange, PhysicalPortOutOfRange,  MultipleNetconfErrors, InvalidNumericValue, InvalidMTUValue
+from fake_switches.juniper.juniper_configuration_diff import changed_paths, configuration_diff
+from fake_switches.netconf.capabilities import filter_selection, selected_keys, is_selected
 from fake_switches.netconf.netconf_protocol import dict_2_etree
-from fake_switches.switch_configuration import AggregatedPort, VlanPort
+from fake_switches.switch_configuration import AggregatedPort, VlanPort, Port, Vlan, VRRP, LazyAttribute, \
+    split_port_name
 
 NS_JUNOS = "http://xml.juniper.net/junos/11.4R1/junos"
 
+_compiled_xpaths = {}
+
 
 class JuniperNetconfDatastore(object):
     VLANS_COLLECTION = "vlans"
@@ -36,22 +43,59 @@ class JuniperNetconfDatastore(object):
     MAX_PHYSICAL_PORT_NUMBER = 127
     MAX_MTU = 9216
     SYSTEM_INTERFACES = []
+    MAX_ROLLBACKS = 50
 
     def __init__(self, configuration):
         self.original_configuration = configuration
         self.configurations = {}
+        self.shared = self
+        self.revision = 0
+        self.rollbacks = []
+        self.changes = []
+        self.pending_rollback = None
+        self.clock = reactor
         self.reset()
         self.edit_errors = []
 
     def reset(self):
+        if self.is_private():
+            self.configurations = _PrivateConfigurations(self)
+            self.private_edits = []
+            self.base_revision = None
+            self.base = None
+            self.touched = set()
+            return
+
         self.configurations = {
             CANDIDATE: deepcopy(self.original_configuration),
             RUNNING: self.original_configuration,
         }
+        self.base_revision = self.revision
+        self.touched = set()
 
         self.configurations[CANDIDATE].routing_engine = None
 
-    def to_etree(self, source):
+    def private_session(self):
+        """
+        A session with its own candidate, merged with the commits of other sessions when it commits.
+        The candidate is only copied from running when the session first uses it, usually at its first edit-config.
+        """
+        session = copy(self)
+        session.shared = self
+        session.reset()
+        return session
+
+    def _check_out_candidate(self):
+        candidate = deepcopy(self.original_configuration)
+        candidate.routing_engine = None
+        self.base_revision = self.shared.revision
+        self.base = first(select(self.to_etree(RUNNING), "configuration"))
+        return candidate
+
+    def is_private(self):
+        return self.shared is not self
+
+    def to_etree(self, source, filtering=None):
         etree.register_namespace("junos", NS_JUNOS)
 
         configuration = {
@@ -64,18 +108,125 @@ class JuniperNetconfDatastore(object):
             }
         }
 
-        _add_if_not_empty(configuration, "interfaces", self._extract_interfaces(self.configurations[source]))
+        # a private candidate that was never used is still the running configuration
+        switch_configuration = self.configurations.get(source, self.configurations[RUNNING])
+
+        if is_selected(filter_selection(filtering, "configuration", "interfaces")):
+            names = selected_keys(filter_selection(filtering, "configuration", "interfaces", "interface"))
+            _add_if_not_empty(configuration, "interfaces", self._extract_interfaces(switch_configuration, names))
 
-        _add_if_not_empty(configuration, "protocols", self._extract_protocols(self.configurations[source]))
+        if is_selected(filter_selection(filtering, "configuration", "protocols")):
+            _add_if_not_empty(configuration, "protocols", self._extract_protocols(switch_configuration))
 
-        _add_if_not_empty(configuration, self.VLANS_COLLECTION,
-                         [{self.VLANS_COLLECTION_OBJ: self.vlan_to_etree(vlan)} for vlan in self.configurations[source].vlans])
+        if is_selected(filter_selection(filtering, "configuration", self.VLANS_COLLECTION)):
+            names = selected_keys(filter_selection(filtering, "configuration", self.VLANS_COLLECTION, self.VLANS_COLLECTION_OBJ))
+            _add_if_not_empty(configuration, self.VLANS_COLLECTION, self._extract_vlans(switch_configuration, names))
 
         return dict_2_etree({"data": {"configuration": configuration}})
 
+    def candidate_diff(self):
+        """
+        The changes of the candidate from running, rendering only the interfaces and vlans edited since they diverged.
+        """
+        changed = self._changed_objects()
+        if changed is None:
+            interfaces = vlans = None
+        else:
+            interfaces = set(name for collection, name in changed if collection == "interfaces")
+            vlans = set(name for collection, name in changed if collection == self.VLANS_COLLECTION)
+
+        running = self._partial_etree(RUNNING, interfaces, vlans)
+        candidate = self._partial_etree(CANDIDATE, interfaces, vlans)
+        if changed is not None:
+            missing = _sections(running) ^ _sections(candidate)
+            if missing and self._add_unchanged_objects(missing, interfaces, vlans):
+                running = self._partial_etree(RUNNING, interfaces, vlans)
+                candidate = self._partial_etree(CANDIDATE, interfaces, vlans)
+
+        return configuration_diff(running, candidate)
+
+    def _partial_etree(self, source, interfaces, vlans):
+        switch_configuration = self.configurations.get(source, self.configurations[RUNNING])
+        configuration = {}
+        _add_if_not_empty(configuration, "interfaces", self._extract_interfaces(switch_configuration, interfaces))
+        _add_if_not_empty(configuration, "protocols", self._extract_protocols(switch_configuration, interfaces))
+        _add_if_not_empty(configuration, self.VLANS_COLLECTION, self._extract_vlans(switch_configuration, vlans))
+        return dict_2_etree({"configuration": configuration})
+
+    def _add_unchanged_objects(self, missing, interfaces, vlans):
+        # a section present on one side only must be rendered on both, with any unchanged object
+        switch_configuration = self.configurations.get(CANDIDATE, self.configurations[RUNNING])
+        added = False
+        for port in switch_configuration.ports:
+            if not missing - {(self.VLANS_COLLECTION,)}:
+                break
+            if port.name in interfaces:
+                continue
+            single_port = _PortsView([port])
+            if ("interfaces",) in missing:
+                for interface in self._extract_interfaces(single_port):
+                    name = val(dict_2_etree(interface), "name")
+                    if name not in interfaces:
+                        interfaces.add(name)
+                        missing.discard(("interfaces",))
+                        added = True
+            for protocol in self._extract_protocols(single_port):
+                if ("protocols", protocol) in missing:
+                    interfaces.add(port.name)
+                    missing -= {("protocols",), ("protocols", protocol)}
+                    added = True
+
+        if (self.VLANS_COLLECTION,) in missing:
+            for vlan in switch_configuration.vlans:
+                if vlan.name not in vlans:
+                    vlans.add(vlan.name)
+                    added = True
+                    break
+        return added
+
+    def _changed_objects(self):
+        if CANDIDATE not in self.configurations:
+            return set()
+
+        shared = self.shared
+        count = shared.revision - self.base_revision
+        if count > len(shared.changes):
+            return None
+
+        changed = set(self.touched)
+        for running_changes in shared.changes[:count]:
+            if running_changes is None:
+                return None
+            changed |= running_changes
+        return changed
+
+    def _edited_objects(self, conf, etree_conf):
+        edited = set()
+        for name_node in select(etree_conf, "{}/{}/name".format(self.VLANS_COLLECTION, self.VLANS_COLLECTION_OBJ)):
+            edited.add((self.VLANS_COLLECTION, name_node.text))
+
+        for name_node in select(etree_conf, "interfaces/interface/name") + select(etree_conf, "protocols/*/interface/name"):
+            edited.add(("interfaces", name_node.text))
+            if name_node.text is not None and re.search(r"\d", name_node.text):
+                port = conf.get_port_by_partial_name(name_node.text)
+                if port is not None:
+                    edited.add(("interfaces", port.name))
+        return edited
+
+    def _record_running_change(self, changed):
+        shared = self.shared
+        shared.revision += 1
+        shared.changes.insert(0, changed)
+        del shared.changes[self.MAX_ROLLBACKS:]
+
     def edit(self, target, etree_conf):
         self.edit_errors = []
         conf = self.configurations[target]
+        edited = self._edited_objects(conf, etree_conf)
+        if target == CANDIDATE:
+            self.touched |= edited
+        else:
+            self._record_running_change(edited)
         handled_elements = []
 
         handled_elements += self.parse_vlans(conf, etree_conf)
@@ -87,26 +238,84 @@ class JuniperNetconfDatastore(object):
         if len(self.edit_errors) > 0:
             raise MultipleNetconfErrors(self.edit_errors)
 
-    def commit_candidate(self):
-        self._validate(self.configurations[CANDIDATE])
-        for updated_vlan in self.configurations[CANDIDATE].vlans:
-            actual_vlan = self.configurations[RUNNING].get_vlan_by_name(updated_vlan.name)
+        if self.is_private() and target == CANDIDATE:
+            self.private_edits.append(deepcopy(etree_conf))
+
+    def commit_candidate(self, confirm_timeout=None):
+        candidate = self.configurations.get(CANDIDATE)
+        if candidate is not None:
+            if self.is_private() and self.base_revision != self.shared.revision:
+                self._rebase_private_candidate()
+                candidate = self.configurations[CANDIDATE]
+            self._validate(candidate)
+
+        changed = self._changed_objects()
+        if confirm_timeout is not None and self.shared.pending_rollback is None:
+            self._record_rollback()
+        if candidate is not None:
+            self._merge_into_running(candidate)
+        self._confirm_pending_rollback(confirm_timeout)
+
+        self._record_running_change(changed)
+        if self.is_private():
+            locked = candidate is not None and candidate.locked
+            self.reset()
+            if locked:
+                self.configurations[CANDIDATE].locked = True
+        else:
+            self.base_revision = self.revision
+            self.touched = set()
+
+    def _record_rollback(self):
+        rollbacks = self.shared.rollbacks
+        previous = rollbacks[0] if rollbacks else None
+        rollbacks.insert(0, RollbackSnapshot.of(self.configurations[RUNNING], previous))
+        del rollbacks[self.MAX_ROLLBACKS:]
+
+    def _confirm_pending_rollback(self, confirm_timeout):
+        shared = self.shared
+        snapshot = None
+        if shared.pending_rollback is not None:
+            delayed_call, snapshot = shared.pending_rollback
+            delayed_call.cancel()
+            shared.pending_rollback = None
+
+        if confirm_timeout is not None:
+            snapshot = snapshot or shared.rollbacks[0]
+            shared.pending_rollback = (shared.clock.callLater(confirm_timeout, shared.rollback, snapshot), snapshot)
+
+    def rollback(self, snapshot):
+        self.pending_rollback = None
+        self._merge_into_running(snapshot)
+        self._record_running_change(None)
+        self.reset()
+
+    def _merge_into_running(self, source):
+        running_vlans = _index_by_name(self.configurations[RUNNING].vlans)
+        candidate_vlans = _index_by_name(source.vlans)
+        running_ports = _index_by_name(self.configurations[RUNNING].ports)
+        candidate_ports = _index_by_name(source.ports)
+
+        for updated_vlan in source.vlans:
+            actual_vlan = running_vlans.get(updated_vlan.name)
             if not actual_vlan:
-                self.configurations[RUNNING].add_vlan(deepcopy(updated_vlan))
+                running_vlans[updated_vlan.name] = _detached_copy(updated_vlan)
+                self.configurations[RUNNING].add_vlan(running_vlans[updated_vlan.name])
             else:
                 actual_vlan.number = updated_vlan.number
                 actual_vlan.description = updated_vlan.description
-                actual_vlan.vendor_specific = updated_vlan.vendor_specific
+                actual_vlan.vendor_specific = deepcopy(updated_vlan.vendor_specific)
 
         for p in self.configurations[RUNNING].vlans[:]:
-            if self.configurations[CANDIDATE].get_vlan_by_name(p.name) is None:
+            if p.name not in candidate_vlans:
                 self.configurations[RUNNING].remove_vlan(p)
 
-        for updated_port in self.configurations[CANDIDATE].ports:
-            actual_port = self.configurations[RUNNING].get_port_by_partial_name(updated_port.name)
+        for updated_port in source.ports:
+            actual_port = running_ports.get(updated_port.name) or \
+                self.configurations[RUNNING].get_port_by_partial_name(updated_port.name)
 
             if actual_port is None:
-                actual_port = deepcopy(updated_port)
+                actual_port = running_ports[updated_port.name] = _detached_copy(updated_port)
                 self.configurations[RUNNING].add_port(actual_port)
             else:
                 actual_port.mode = updated_port.mode
@@ -122,7 +331,7 @@ class JuniperNetconfDatastore(object):
                 actual_port.aggregation_membership = updated_port.aggregation_membership
                 actual_port.lldp_transmit = updated_port.lldp_transmit
                 actual_port.lldp_receive = updated_port.lldp_receive
-                actual_port.vendor_specific = updated_port.vendor_specific
+                actual_port.vendor_specific = deepcopy(updated_port.vendor_specific)
                 actual_port.recovery_timeout = updated_port.recovery_timeout
 
                 if isinstance(actual_port, AggregatedPort):
@@ -132,11 +341,13 @@ class JuniperNetconfDatastore(object):
                     actual_port.vlan_id = updated_port.vlan_id
                     actual_port.access_group_in = updated_port.access_group_in
                     actual_port.access_group_out = updated_port.access_group_out
-                    for ip in actual_port.ips:
-                        if ip not in updated_port.ips:
+                    updated_ips = set(_ip_state(ip) for ip in updated_port.ips)
+                    for ip in list(actual_port.ips):
+                        if _ip_state(ip) not in updated_ips:
                             actual_port.remove_ip(ip)
+                    actual_ips = set(_ip_state(ip) for ip in actual_port.ips)
                     for ip in updated_port.ips:
-                        if ip not in actual_port.ips:
+                        if _ip_state(ip) not in actual_ips:
                             actual_port.add_ip(ip)
                     actual_port.secondary_ips = deepcopy(updated_port.secondary_ips)
                     actual_port.vrrp_common_authentication = updated_port.vrrp_common_authentication
@@ -147,9 +358,28 @@ class JuniperNetconfDatastore(object):
                     actual_port.unicast_reverse_path_forwarding = updated_port.unicast_reverse_path_forwarding
 
         for p in self.configurations[RUNNING].ports[:]:
-            if self.configurations[CANDIDATE].get_port_by_partial_name(p.name) is None:
+            if p.name not in candidate_ports and source.get_port_by_partial_name(p.name) is None:
                 self.configurations[RUNNING].remove_port(p)
 
+    def _rebase_private_candidate(self):
+        running = first(select(self.to_etree(RUNNING), "configuration"))
+        candidate = first(select(self.to_etree(CANDIDATE), "configuration"))
+        if _overlapping(changed_paths(self.base, running), changed_paths(self.base, candidate)):
+            raise PrivateCandidateConflict()
+
+        rebased = self.shared.private_session()
+        try:
+            for etree_conf in self.private_edits:
+                rebased.edit(CANDIDATE, etree_conf)
+        except NetconfError:
+            raise PrivateCandidateConflict()
+
+        self.configurations[CANDIDATE] = rebased.configurations[CANDIDATE]
+        self.private_edits = rebased.private_edits
+        self.base_revision = rebased.base_revision
+        self.base = rebased.base
+        self.touched = rebased.touched
+
     def lock(self, target):
         if etree.tostring(self.to_etree(RUNNING)) != etree.tostring(self.to_etree(CANDIDATE)):
             raise CannotLockUncleanCandidate()
@@ -158,7 +388,9 @@ class JuniperNetconfDatastore(object):
         self.configurations[target].locked = True
 
     def unlock(self, target):
-        self.configurations[target].locked = False
+        configuration = self.configurations.get(target)
+        if configuration is not None:
+            configuration.locked = False
 
     def get_interface_information_terse(self):
         return dict_2_etree({
@@ -245,7 +477,7 @@ class JuniperNetconfDatastore(object):
 
     def parse_interfaces(self, conf, etree_conf):
         handled_elements = []
-        for interface_node in etree_conf.xpath("interfaces/interface/name/.."):
+        for interface_node in select(etree_conf, "interfaces/interface/name/.."):
             handled_elements.append(interface_node)
 
             self.parse_interface(conf, interface_node)
@@ -270,7 +502,7 @@ class JuniperNetconfDatastore(object):
 
     def handle_interface_operation(self, conf, operation, port):
         if operation in ("delete", "replace"):
-            backup = deepcopy(vars(port))
+            backup = _backup_protocols_specific_data(port)
 
             port.reset()
 
@@ -280,41 +512,41 @@ class JuniperNetconfDatastore(object):
         port.description = resolve_new_value(interface_node, "description", port.description)
         port.mtu = resolve_new_value(interface_node, "mtu", port.mtu, transformer=self._validate_mtu)
 
-        shutdown_node = first(interface_node.xpath("disable"))
+        shutdown_node = first(select(interface_node, "disable"))
         if shutdown_node is not None:
             if port.shutdown is False and resolve_operation(shutdown_node) == "delete":
                 raise NotFound('')
             port.shutdown = resolve_operation(shutdown_node) != "delete"
 
-        ether_options_attributes = first(interface_node.xpath(self.ETHER_OPTIONS_TAG))
+        ether_options_attributes = first(select(interface_node, self.ETHER_OPTIONS_TAG))
         if ether_options_attributes is not None:
             if resolve_operation(ether_options_attributes) != "delete":
-                speed_node = first(ether_options_attributes.xpath("speed/*"))
+                speed_node = first(select(ether_options_attributes, "speed/*"))
                 if speed_node is not None:
                     port.speed = speed_node.tag.split("-")[-1]
 
                 self.edit_errors.extend(assign_auto_negotiation_state(ether_options_attributes, port))
 
-                if resolve_operation(first(ether_options_attributes.xpath("ieee-802.3ad"))) == "delete":
+                if resolve_operation(first(select(ether_options_attributes, "ieee-802.3ad"))) == "delete":
                     if port.aggregation_membership is None:
                         raise NotFound("802.3ad")
                     port.aggregation_membership = None
                 else:
                     port.aggregation_membership = resolve_new_value(ether_options_attributes, "ieee-802.3ad/bundle", port.aggregation_membership)
 
-                if resolve_operation(first(ether_options_attributes.xpath("ieee-802.3ad/lacp"))) == "delete":
+                if resolve_operation(first(select(ether_options_attributes, "ieee-802.3ad/lacp"))) == "delete":
                     if port.force_up is None:
                         raise NotFound("lacp")
                     port.force_up = None
                 else:
-                    force_up = first(ether_options_attributes.xpath("ieee-802.3ad/lacp/force-up"))
+                    force_up = first(select(ether_options_attributes, "ieee-802.3ad/lacp/force-up"))
                     if force_up is not None:
                         port.force_up = True
             else:
                 port.speed = None
                 port.aggregation_membership = None
 
-        if "delete" in [resolve_operation(first(interface_node.xpath("unit"))), resolve_operation(first(interface_node.xpath("unit/family")))]:
+        if "delete" in [resolve_operation(first(select(interface_node, "unit"))), resolve_operation(first(select(interface_node, "unit/family")))]:
             port.mode = None
             port.trunk_native_vlan = None
             port.access_vlan = None
@@ -322,7 +554,7 @@ class JuniperNetconfDatastore(object):
             port.recovery_timeout = None
             port.vendor_specific["has-ethernet-switching"] = False
         else:
-            port_attributes = first(interface_node.xpath("unit/family/{}".format(self.ETHERNET_SWITCHING_TAG)))
+            port_attributes = first(select(interface_node, "unit/family/{}".format(self.ETHERNET_SWITCHING_TAG)))
             if port_attributes is not None:
                 port.vendor_specific["has-ethernet-switching"] = True
 
@@ -333,13 +565,13 @@ class JuniperNetconfDatastore(object):
                 else:
                     port.access_vlan = None
 
-                if resolve_operation(first(port_attributes.xpath("vlan"))) == "delete":
+                if resolve_operation(first(select(port_attributes, "vlan"))) == "delete":
                     port.access_vlan = None
                     port.trunk_vlans = None
                 else:
                     self.parse_vlan_members(port, port_attributes)
 
-                if resolve_operation(first(port_attributes.xpath("recovery-timeout"))) == "delete":
+                if resolve_operation(first(select(port_attributes, "recovery-timeout"))) == "delete":
                     port.recovery_timeout = None
                 else:
                     port.recovery_timeout = resolve_new_value(port_attributes, "recovery-timeout",
@@ -353,11 +585,11 @@ class JuniperNetconfDatastore(object):
         if isinstance(port, AggregatedPort):
             port.speed = resolve_new_value(interface_node, "aggregated-ether-options/link-speed", port.speed)
             port.auto_negotiation = resolve_new_value(interface_node, "aggregated-ether-options/auto-negotiation", port.auto_negotiation, transformer=lambda _: True)
-            port.lacp_active = first(interface_node.xpath("aggregated-ether-options/lacp/active")) is not None
+            port.lacp_active = first(select(interface_node, "aggregated-ether-options/lacp/active")) is not None
             port.lacp_periodic = resolve_new_value(interface_node, "aggregated-ether-options/lacp/periodic", port.lacp_periodic)
 
     def parse_vlan_members(self, port, port_attributes):
-        for member in port_attributes.xpath("vlan/members"):
+        for member in select(port_attributes, "vlan/members"):
             if resolve_operation(member) == "delete":
                 if port_is_in_access_mode(port):
                     port.access_vlan = None
@@ -375,7 +607,7 @@ class JuniperNetconfDatastore(object):
 
     def parse_vlans(self, conf, etree_conf):
         handled_elements = []
-        for vlan_node in etree_conf.xpath("{}/{}/name/..".format(self.VLANS_COLLECTION, self.VLANS_COLLECTION_OBJ)):
+        for vlan_node in select(etree_conf, "{}/{}/name/..".format(self.VLANS_COLLECTION, self.VLANS_COLLECTION_OBJ)):
             handled_elements.append(vlan_node)
 
             vlan = conf.get_vlan_by_name(val(vlan_node, "name"))
@@ -399,8 +631,9 @@ class JuniperNetconfDatastore(object):
         vlan.description = resolve_new_value(vlan_node, "description", vlan.description)
 
     def parse_trunk_native_vlan(self, interface_node, port):
-        if len(interface_node.xpath("unit/family/{}/native-vlan-id".format(self.ETHERNET_SWITCHING_TAG))) == 1 and interface_node.xpath("unit/family/{}/native-vlan-id".format(self.ETHERNET_SWITCHING_TAG))[0].text is not None:
-            port_attributes = first(interface_node.xpath("unit/family/{}".format(self.ETHERNET_SWITCHING_TAG)))
+        native_vlan_id_node = self.get_trunk_native_vlan_node(interface_node)
+        if len(native_vlan_id_node) == 1 and native_vlan_id_node[0].text is not None:
+            port_attributes = first(select(interface_node, "unit/family/{}".format(self.ETHERNET_SWITCHING_TAG)))
             return resolve_new_value(port_attributes, "native-vlan-id", port.trunk_native_vlan,
                               transformer=int)
         return port.trunk_native_vlan
@@ -419,7 +652,7 @@ class JuniperNetconfDatastore(object):
                     interface_data[-1]['unit']['family'][self.ETHERNET_SWITCHING_TAG]['native-vlan-id'] = str(port.trunk_native_vlan)
 
     def get_trunk_native_vlan_node(self, interface_node):
-        return interface_node.xpath("unit/family/{}/native-vlan-id".format(self.ETHERNET_SWITCHING_TAG))
+        return select(interface_node, "unit/family/{}/native-vlan-id".format(self.ETHERNET_SWITCHING_TAG))
 
     def vlan_to_etree(self, vlan):
         vlan_data = [{"name": vlan.name}]
@@ -433,10 +666,15 @@ class JuniperNetconfDatastore(object):
         return vlan_data
 
     def _validate(self, configuration):
-        vlan_list = [vlan.number for vlan in configuration.vlans]
+        vlan_list = set(vlan.number for vlan in configuration.vlans)
+        ports_with_unknown_vlans = set(configuration.get_members(*[
+            (membership, vlan)
+            for membership in ("access_vlan", "trunk_native_vlan", "trunk_vlans")
+            for vlan in configuration.get_membership_values(membership) - vlan_list]))
 
         for port in configuration.ports:
-            self.validate_vlan_config(port, vlan_list)
+            if port in ports_with_unknown_vlans:
+                self.validate_vlan_config(port, vlan_list)
             self._assert_no_garbage(port)
 
     def validate_vlan_config(self, port, vlan_list):
@@ -483,46 +721,47 @@ class JuniperNetconfDatastore(object):
 
         return {"physical-interface": interface}
 
-    def _extract_interfaces(self, source):
+    def _extract_interfaces(self, source, names=None):
         interfaces = []
         for port in source.ports:
+            if names is not None and port.name not in names:
+                continue
             interface_node = self.interface_to_etree(port)
             if interface_node:
                 interfaces.append({"interface": interface_node})
         return interfaces
 
-    def _extract_protocols(self, configuration):
+    def _extract_protocols(self, configuration, names=None):
         protocols = {}
+        interfaces = {}
         for port in configuration.ports:
+            if names is not None and port.name not in names:
+                continue
             if port.vendor_specific.get("rstp-edge"):
-                if "rstp" not in protocols:
-                    protocols["rstp"] = []
-                interface = self._get_or_create_interface(protocols["rstp"], port)
-                interface["interface"].append({"edge": ""})
+                interface = self._get_or_create_interface(protocols, interfaces, "rstp", port)
+                interface.append({"edge": ""})
 
             if port.vendor_specific.get("rstp-no-root-port"):
-                if "rstp" not in protocols:
-                    protocols["rstp"] = []
-                interface = self._get_or_create_interface(protocols["rstp"], port)
-                interface["interface"].append({"no-root-port": ""})
+                interface = self._get_or_create_interface(protocols, interfaces, "rstp", port)
+                interface.append({"no-root-port": ""})
 
             if port.vendor_specific.get("lldp"):
-                if "lldp" not in protocols:
-                    protocols["lldp"] = []
-                interface = self._get_or_create_interface(protocols["lldp"], port)
+                interface = self._get_or_create_interface(protocols, interfaces, "lldp", port)
                 if port.lldp_receive is False and port.lldp_transmit is False:
-                    interface["interface"].append({"disable": ""})
+                    interface.append({"disable": ""})
 
         return protocols
 
-    def _get_or_create_interface(self, if_list, port):
+    def _extract_vlans(self, source, names=None):
+        return [{self.VLANS_COLLECTION_OBJ: self.vlan_to_etree(vlan)} for vlan in source.vlans
+                if names is None or vlan.name in names]
+
+    def _get_or_create_interface(self, protocols, interfaces, protocol, port):
         port_name = self._format_protocol_port_name(port)
-        existing = next((v for v in if_list if v["interface"][0]["name"] == port_name), None)
+        existing = interfaces.get((protocol, port_name))
         if existing is None:
-            existing = {"interface": [
-                {"name": port_name},
-            ]}
-            if_list.append(existing)
+            existing = interfaces[(protocol, port_name)] = [{"name": port_name}]
+            protocols.setdefault(protocol, []).append({"interface": existing})
 
         return existing
 
@@ -562,28 +801,28 @@ class JuniperNetconfDatastore(object):
 
 def parse_protocols(conf, etree_conf):
     handled_elements = []
-    for rstp_interface_node in etree_conf.xpath("protocols/rstp/interface/name/.."):
+    for rstp_interface_node in select(etree_conf, "protocols/rstp/interface/name/.."):
         handled_elements.append(rstp_interface_node)
 
         port = conf.get_port_by_partial_name(val(rstp_interface_node, "name"))
 
-        if first(rstp_interface_node.xpath("edge")) is not None:
-            if resolve_operation(first(rstp_interface_node.xpath("edge"))) == "delete":
+        if first(select(rstp_interface_node, "edge")) is not None:
+            if resolve_operation(first(select(rstp_interface_node, "edge"))) == "delete":
                 port.vendor_specific.pop("rstp-edge")
             else:
                 port.vendor_specific["rstp-edge"] = True
         elif "rstp-edge" in port.vendor_specific:
             port.vendor_specific.pop("rstp-edge")
 
-        if first(rstp_interface_node.xpath("no-root-port")) is not None:
-            if resolve_operation(first(rstp_interface_node.xpath("no-root-port"))) == "delete":
+        if first(select(rstp_interface_node, "no-root-port")) is not None:
+            if resolve_operation(first(select(rstp_interface_node, "no-root-port"))) == "delete":
                 port.vendor_specific.pop("rstp-no-root-port")
             else:
                 port.vendor_specific["rstp-no-root-port"] = True
         elif "rstp-no-root-port" in port.vendor_specific:
             port.vendor_specific.pop("rstp-no-root-port")
 
-    for lldp_interface_node in etree_conf.xpath("protocols/lldp/interface/name/.."):
+    for lldp_interface_node in select(etree_conf, "protocols/lldp/interface/name/.."):
         handled_elements.append(lldp_interface_node)
 
         port = conf.get_port_by_partial_name(val(lldp_interface_node, "name"))
@@ -595,7 +834,7 @@ def parse_protocols(conf, etree_conf):
         else:
             port.vendor_specific["lldp"] = True
 
-            disable_node = first(lldp_interface_node.xpath("disable"))
+            disable_node = first(select(lldp_interface_node, "disable"))
             if disable_node is not None:
                 if resolve_operation(disable_node) == "delete":
                     port.lldp_transmit = None
@@ -608,26 +847,27 @@ def parse_protocols(conf, etree_conf):
 
 
 def _get_errors_for_unused_nodes(root, handled_elements):
+    handled_elements = set(handled_elements)
+    if root in handled_elements or any(ancestor in handled_elements for ancestor in root.iterancestors()):
+        return []
+
     errors = []
-    for element in root:
-        if len(element) == 0:
-            current = element
-            handled = False
-            while current is not None:
-                if current in handled_elements:
-                    handled = True
-                    break
-                current = current.getparent()
+    _collect_unused_nodes(root, handled_elements, errors)
+    return errors
+
 
-            if not handled:
-                errors.append(BadElement(element.tag))
+def _collect_unused_nodes(node, handled_elements, errors):
+    for element in node:
+        if element in handled_elements:
+            continue
+        if len(element) == 0:
+            errors.append(BadElement(element.tag))
         else:
-            errors.extend(_get_errors_for_unused_nodes(element, handled_elements))
-    return errors
+            _collect_unused_nodes(element, handled_elements, errors)
 
 
 def resolve_new_value(node, value_name, actual_value, transformer=None):
-    value_node = first(node.xpath(value_name))
+    value_node = first(select(node, value_name))
     if value_node is not None:
         operation = resolve_operation(value_node)
 
@@ -651,7 +891,14 @@ def resolve_operation(node):
 
 
 def val(node, xpath):
-    return first(node.xpath(xpath)).text
+    return first(select(node, xpath)).text
+
+
+def select(node, xpath):
+    compiled = _compiled_xpaths.get(xpath)
+    if compiled is None:
+        compiled = _compiled_xpaths[xpath] = etree.XPath(xpath)
+    return compiled(node)
 
 
 class BadElement(NetconfError):
@@ -659,6 +906,13 @@ class BadElement(NetconfError):
         super(BadElement, self).__init__("syntax error", info={"bad-element": name})
 
 
+class PrivateCandidateConflict(NetconfError):
+    def __init__(self):
+        super(PrivateCandidateConflict, self).__init__("configuration database modified",
+                                                       info={"detail": "private candidate conflicts with a commit "
+                                                                       "from another session"})
+
+
 class NotFound(NetconfError):
     def __init__(self, name):
         super(NotFound, self).__init__("statement not found: %s" % name, severity="warning")
@@ -685,11 +939,114 @@ def port_is_in_trunk_mode(port):
     return not port_is_in_access_mode(port)
 
 
+def _overlapping(paths, other_paths):
+    prefixes = set(path[:i] for path in paths for i in range(1, len(path) + 1))
+    return any(path in prefixes or any(path[:i] in paths for i in range(1, len(path))) for path in other_paths)
+
+
+def _sections(configuration):
+    sections = set((node.tag,) for node in configuration)
+    sections.update(("protocols", node.tag) for node in select(configuration, "protocols/*"))
+    return sections
+
+
+class _PortsView(object):
+    def __init__(self, ports):
+        self.ports = ports
+
+
+class _PrivateConfigurations(dict):
+    def __init__(self, datastore):
+        super(_PrivateConfigurations, self).__init__({RUNNING: datastore.original_configuration})
+        self.datastore = datastore
+
+    def __missing__(self, source):
+        if source != CANDIDATE:
+            raise KeyError(source)
+        candidate = self[CANDIDATE] = self.datastore._check_out_candidate()
+        return candidate
+
+
+class RollbackSnapshot(object):
+    def __init__(self, vlans, ports):
+        self.vlans = vlans
+        self.ports = ports
+
+    @classmethod
+    def of(cls, configuration, previous=None):
+        previous_vlans = _index_by_name(previous.vlans) if previous else {}
+        previous_ports = _index_by_name(previous.ports) if previous else {}
+        return cls(tuple(_shared_copy(vlan, previous_vlans) for vlan in configuration.vlans),
+                   tuple(_shared_copy(port, previous_ports) for port in configuration.ports))
+
+    def get_port_by_partial_name(self, name):
+        partial_name, number = split_port_name(name.lower())
+
+        return next((port for port in self.ports if port.name.lower().startswith(partial_name.strip()) and port.name.lower().endswith(number.strip())), None)
+
+
+def _shared_copy(obj, previous_objects):
+    previous = previous_objects.get(obj.name)
+    if previous is not None and _state(previous) == _state(obj):
+        return previous
+    return _detached_copy(obj)
+
+
+def _state(value):
+    # walks every slot of the object, so snapshotting a configuration stays O(configuration)
+    if isinstance(value, IPNetwork):
+        return _ip_state(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_state(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _state(v)) for k, v in value.items()))
+    if isinstance(value, (Port, Vlan, VRRP)):
+        return (type(value),) + tuple(_slot_state(value, slot) for slot in _slots(type(value))) + \
+            _state(getattr(value, "__dict__", {}))
+    return value
+
+
+def _ip_state(ip_network):
+    # IPNetwork equality ignores the host bits, 10.0.0.2/24 == 10.0.0.3/24
+    return str(ip_network.ip), ip_network.prefixlen
+
+
+def _slot_state(obj, slot):
+    lazy_attribute = getattr(type(obj), slot.lstrip("_"), None)
+    if isinstance(lazy_attribute, LazyAttribute):
+        return _state(getattr(obj, slot, None) or lazy_attribute.factory())
+    return _state(getattr(obj, slot, None))
+
+
+def _slots(cls):
+    return [slot for klass in reversed(cls.__mro__) for slot in klass.__dict__.get("__slots__", ())
+            if slot != "switch_configuration"]
+
+
+def _detached_copy(obj):
+    return deepcopy(obj, {id(obj.switch_configuration): None})
+
+
+def _index_by_name(objects):
+    index = {}
+    for obj in objects:
+        index.setdefault(obj.name, obj)
+    return index
+
+
 def _add_if_not_empty(target_dict, key, value):
     if value:
         target_dict[key] = value
 
 
+def _backup_protocols_specific_data(port):
+    return {
+        "vendor_specific": deepcopy(port.vendor_specific),
+        "lldp_transmit": port.lldp_transmit,
+        "lldp_receive": port.lldp_receive,
+    }
+
+
 def _restore_protocols_specific_data(backup, port):
     port.vendor_specific["rstp-edge"] = backup.get("vendor_specific", {}).get("rstp-edge")
     port.vendor_specific["rstp-no-root-port"] = backup.get("vendor_specific", {}).get("rstp-no-root-port")
@@ -11,10 +11,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from copy import deepcopy
 
 from fake_switches.juniper.juniper_netconf_datastore import resolve_new_value, NS_JUNOS, resolve_operation, parse_range, \
-    val, _restore_protocols_specific_data
+    val, select, _backup_protocols_specific_data, _restore_protocols_specific_data
 from fake_switches.juniper_qfx_copper.juniper_qfx_copper_netconf_datastore import JuniperQfxCopperNetconfDatastore
 from fake_switches.netconf import NetconfError, XML_ATTRIBUTES, first
 from fake_switches.switch_configuration import AggregatedPort, VlanPort
@@ -31,14 +30,14 @@ class JuniperMxNetconfDatastore(JuniperQfxCopperNetconfDatastore):
     MAX_MTU = 16360
 
     def parse_vlan_members(self, port, port_attributes):
-        vlan_node = first(port_attributes.xpath("vlan-id"))
+        vlan_node = first(select(port_attributes, "vlan-id"))
         if vlan_node is not None:
             if resolve_operation(vlan_node) == "delete":
                 port.access_vlan = None
             else:
                 port.access_vlan = vlan_node.text
 
-        for member in port_attributes.xpath("vlan-id-list"):
+        for member in select(port_attributes, "vlan-id-list"):
             if resolve_operation(member) == "delete":
                 if member.text:
                     port.trunk_vlans.remove(int(member.text))
@@ -90,36 +89,37 @@ class JuniperMxNetconfDatastore(JuniperQfxCopperNetconfDatastore):
             super(JuniperMxNetconfDatastore, self).parse_interface(conf, interface_node)
 
     def parse_vlan_interfaces(self, conf, interface_node):
-        for unit_node in interface_node.xpath("unit/name/.."):
+        vlans_by_routing_interface = index_vlans_by_routing_interface(conf)
+        for unit_node in select(interface_node, "unit/name/.."):
             unit_id = val(unit_node, "name")
 
             port_name = "irb.{}".format(unit_id)
 
             port = conf.get_port(port_name)
             if port is None:
-                linked_vlan = find_vlan_with_routing_interface(conf, port_name)
+                linked_vlan = vlans_by_routing_interface.get(port_name)
                 port = self.original_configuration.new("VlanPort",
                                                        vlan_id=linked_vlan.number if linked_vlan else None,
                                                        name=port_name)
                 port.vendor_specific["irb-unit"] = unit_id
                 conf.add_port(port)
 
-            inet = first(unit_node.xpath("family/inet".format(self.ETHERNET_SWITCHING_TAG)))
+            inet = first(select(unit_node, "family/inet"))
             if inet is not None:
-                if first(inet.xpath("no-redirects")) is not None:
-                    if resolve_operation(first(inet.xpath("no-redirects"))) == "delete":
+                if first(select(inet, "no-redirects")) is not None:
+                    if resolve_operation(first(select(inet, "no-redirects"))) == "delete":
                         port.ip_redirect = True
                     else:
                         port.ip_redirect = False
 
-                for address in inet.xpath("address/name/.."):
+                for address in select(inet, "address/name/.."):
                     ip = IPNetwork(val(address, "name"))
                     if resolve_operation(address) == "delete":
                         port.remove_ip(ip)
                     else:
                         port.add_ip(ip)
 
-                        for vrrp_node in address.xpath("vrrp-group/name/.."):
+                        for vrrp_node in select(address, "vrrp-group/name/.."):
                             group_id = val(vrrp_node, "name")
                             vrrp_group = port.get_vrrp_group(group_id)
 
@@ -131,16 +131,16 @@ class JuniperMxNetconfDatastore(JuniperQfxCopperNetconfDatastore):
                                     port.vrrps.append(vrrp_group)
 
                                 vrrp_group.related_ip_network = ip
-                                vrrp_group.ip_addresses = [vip.text for vip in vrrp_node.xpath("virtual-address")
+                                vrrp_group.ip_addresses = [vip.text for vip in select(vrrp_node, "virtual-address")
                                                            if resolve_operation(vip) != "delete"]
                                 vrrp_group.priority = resolve_new_value(vrrp_node, "priority", vrrp_group.priority)
 
                                 vrrp_group.preempt_delay_minimum = resolve_new_value(vrrp_node, "preempt/hold-time", vrrp_group.preempt_delay_minimum)
-                                if resolve_operation(first(vrrp_node.xpath("preempt"))) == "delete":
+                                if resolve_operation(first(select(vrrp_node, "preempt"))) == "delete":
                                     vrrp_group.preempt_delay_minimum = None
 
-                                if first(vrrp_node.xpath("accept-data")) is not None:
-                                    if resolve_operation(first(vrrp_node.xpath("accept-data"))) == "delete":
+                                if first(select(vrrp_node, "accept-data")) is not None:
+                                    if resolve_operation(first(select(vrrp_node, "accept-data"))) == "delete":
                                         vrrp_group.vendor_specific.pop("accept-data")
                                     else:
                                         vrrp_group.vendor_specific["accept-data"] = True
@@ -153,7 +153,7 @@ class JuniperMxNetconfDatastore(JuniperQfxCopperNetconfDatastore):
 
                                 vrrp_group.authentication = resolve_new_value(vrrp_node, "authentication-key", vrrp_group.authentication)
 
-                                track = first(vrrp_node.xpath("track"))
+                                track = first(select(vrrp_node, "track"))
                                 if track is not None:
                                     if resolve_operation(track) == "delete":
                                         vrrp_group.track = {}
@@ -161,19 +161,17 @@ class JuniperMxNetconfDatastore(JuniperQfxCopperNetconfDatastore):
                                         vrrp_group.track = {val(track, "route/route_address"): val(track, "route/priority-cost")}
 
     def _validate(self, conf):
-        ips = []
-        for p in conf.ports:
-            if hasattr(p, "ips"):
-                ips = ips + p.ips
-        if not len(ips) == len(set(ips)):
-            raise IpAlreadyInUse("Overlapping subnet is configured")
+        for port in conf.get_vlan_ports():
+            if len(port.ips) != len(set(port.ips)) or \
+                    any(len(conf.get_ports_by_network(ip)) > 1 for ip in port.ips):
+                raise IpAlreadyInUse("Overlapping subnet is configured")
         return super(JuniperMxNetconfDatastore, self)._validate(conf)
 
     def handle_interface_operation(self, conf, operation, port):
         if operation == 'delete' and isinstance(port, AggregatedPort):
             conf.remove_port(port)
         elif operation in ("delete", "replace"):
-            backup = deepcopy(vars(port))
+            backup = _backup_protocols_specific_data(port)
 
             port.reset()
 
@@ -191,13 +189,14 @@ class JuniperMxNetconfDatastore(JuniperQfxCopperNetconfDatastore):
                 if port.name == vlan.vendor_specific["linked-port-vlan"]:
                     port.vlan_id = vlan.number
 
-    def _extract_interfaces(self, source):
+    def _extract_interfaces(self, source, names=None):
         interfaces = []
         vlan_ports = []
         for port in source.ports:
             if isinstance(port, VlanPort):
-                vlan_ports.append(port)
-            else:
+                if names is None or "irb" in names:
+                    vlan_ports.append(port)
+            elif names is None or port.name in names:
                 interface_node = self.interface_to_etree(port)
                 if interface_node:
                     interfaces.append({"interface": interface_node})
@@ -280,12 +279,11 @@ class JuniperMxNetconfDatastore(JuniperQfxCopperNetconfDatastore):
         return etree
 
 
-def find_vlan_with_routing_interface(conf, interface_name):
+def index_vlans_by_routing_interface(conf):
+    index = {}
     for vlan in conf.vlans:
-        if vlan.vendor_specific.get("linked-port-vlan") == interface_name:
-            return vlan
-
-    return None
+        index.setdefault(vlan.vendor_specific.get("linked-port-vlan"), vlan)
+    return index
 
 
 class TrunkShouldHaveVlanMembers(NetconfError):
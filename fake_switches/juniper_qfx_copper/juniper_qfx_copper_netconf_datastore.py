@@ -13,7 +13,8 @@
 # limitations under the License.
 from fake_switches.switch_configuration import AggregatedPort
 
-from fake_switches.juniper.juniper_netconf_datastore import JuniperNetconfDatastore, resolve_new_value, port_is_in_trunk_mode
+from fake_switches.juniper.juniper_netconf_datastore import JuniperNetconfDatastore, resolve_new_value, port_is_in_trunk_mode, \
+    select
 from fake_switches.netconf import NetconfError
 
 
@@ -30,14 +31,14 @@ class JuniperQfxCopperNetconfDatastore(JuniperNetconfDatastore):
             interface_data.append({"native-vlan-id": str(port.trunk_native_vlan)})
 
     def parse_trunk_native_vlan(self, interface_node, port):
-        native_vlan_id_node = interface_node.xpath("native-vlan-id")
+        native_vlan_id_node = select(interface_node, "native-vlan-id")
         if len(native_vlan_id_node) == 1 and native_vlan_id_node[0].text is not None:
             return resolve_new_value(interface_node, "native-vlan-id", port.trunk_native_vlan,
                                  transformer=int)
         return port.trunk_native_vlan
 
     def get_trunk_native_vlan_node(self, interface_node):
-        return interface_node.xpath("native-vlan-id")
+        return select(interface_node, "native-vlan-id")
 
     def _validate(self, configuration):
         for port in configuration.ports:
@@ -35,7 +35,7 @@ class SimpleDatastore(object):
     def set_data(self, source, data):
         self.data[source] = data
 
-    def to_etree(self, source):
+    def to_etree(self, source, filtering=None):
         return dict_2_etree({"data": self.data[source]})
 
     def edit(self, target, config):
@@ -182,6 +182,13 @@ class InvalidNumericValue(NetconfError):
         super(InvalidNumericValue, self).__init__("Invalid numeric value: '{}'".format(value))
 
 
+class InvalidConfirmTimeout(NetconfError):
+    def __init__(self, value):
+        super(InvalidConfirmTimeout, self).__init__("Invalid confirm-timeout value: '{}'".format(value),
+                                                    err_type="protocol", tag="invalid-value",
+                                                    info={"bad-element": "confirm-timeout"})
+
+
 class InvalidMTUValue(NetconfError):
     def __init__(self, value, max_mtu):
         super(InvalidMTUValue, self).__init__("Value {} is not within range (256..{})".format(value, max_mtu))
@@ -14,7 +14,9 @@
 
 from lxml import etree
 
-from fake_switches.netconf import resolve_source_name, Response, NS_BASE_1_0, first
+from fake_switches.netconf import resolve_source_name, Response, NS_BASE_1_0, first, InvalidConfirmTimeout
+
+DEFAULT_CONFIRM_TIMEOUT = 600
 
 
 class Capability(object):
@@ -31,8 +33,8 @@ class Base1_0(Capability):
 
     def get_config(self, request):
         source = first(request.xpath("source"))
-        content = self.datastore.to_etree(resolve_source_name(source[0].tag))
         filtering = first(request.xpath("filter"))
+        content = self.datastore.to_etree(resolve_source_name(source[0].tag), filtering=filtering)
         if filtering is not None:
             filter_content(content, filtering)
         return Response(content)
@@ -61,24 +63,42 @@ class Base1_0(Capability):
 
         return Response(etree.Element("ok"))
 
-    def commit_configuration(self, *args, **kwargs):
-        return self.commit(*args, **kwargs)
+    def commit_configuration(self, request):
+        return self._commit(request, confirm_timeout_unit=60)
+
+    def commit(self, request):
+        return self._commit(request, confirm_timeout_unit=1)
 
-    def commit(self, *args, **kwargs):
-        self.datastore.commit_candidate()
-        self.datastore.configurations.get('candidate').commit()
+    def _commit(self, request, confirm_timeout_unit):
+        confirm_timeout = None
+        if first(request.xpath("confirmed")) is not None:
+            timeout = first(request.xpath("confirm-timeout/text()"))
+            confirm_timeout = _positive_int(timeout) * confirm_timeout_unit if timeout else DEFAULT_CONFIRM_TIMEOUT
+
+        self.datastore.commit_candidate(confirm_timeout=confirm_timeout)
+        self.datastore.configurations.get('running').commit()
         return Response(etree.Element("ok"))
 
 
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise InvalidConfirmTimeout(value)
+    if number <= 0:
+        raise InvalidConfirmTimeout(value)
+    return number
+
+
 def filter_content(content, filtering):
-    valid_endpoints = []
-    valid_endpoints_parents = []
+    valid_endpoints = set()
+    valid_endpoints_parents = set()
     for xpath in crawl_for_leaves(filtering, parent=""):
         for node in content.xpath("//data" + xpath):
-            valid_endpoints.append(node)
+            valid_endpoints.add(node)
             n = node.getparent()
-            while n is not None:
-                valid_endpoints_parents.append(n)
+            while n is not None and n not in valid_endpoints_parents:
+                valid_endpoints_parents.add(n)
                 n = n.getparent()
 
     filter_by_valid_nodes(content, valid_endpoints, valid_endpoints_parents)
@@ -114,6 +134,38 @@ def filter_by_valid_nodes(content, valid_endpoints, valid_endpoints_parents):
             content.remove(e)
 
 
+def filter_selection(filtering, *path):
+    if filtering is None:
+        return None
+
+    nodes = [filtering]
+    for tag in path:
+        children = []
+        for node in nodes:
+            if not any(_has_children(child) or not child.text for child in node):
+                return None
+            children.extend(child for child in node if child.tag == tag)
+        nodes = children
+    return nodes
+
+
+def selected_keys(nodes, key="name"):
+    if nodes is None:
+        return None
+
+    keys = set()
+    for node in nodes:
+        key_node = next((child for child in node if child.tag == key and not _has_children(child) and child.text), None)
+        if key_node is None:
+            return None
+        keys.add(key_node.text)
+    return keys
+
+
+def is_selected(selection):
+    return selection is None or len(selection) > 0
+
+
 
 class Candidate1_0(Capability):
     def get_url(self):
@@ -13,7 +13,6 @@
 # limitations under the License.
 
 import logging
-import re
 
 from lxml import etree
 from twisted.internet.protocol import Protocol
@@ -24,8 +23,10 @@ from fake_switches.netconf.capabilities import Base1_0
 
 
 class NetconfProtocol(Protocol):
-    def __init__(self, datastore=None, capabilities=None, additionnal_namespaces=None, logger=None):
+    def __init__(self, datastore=None, capabilities=None, additionnal_namespaces=None, logger=None, pretty_print=True,
+                 recording=None):
         self.logger = logger or logging.getLogger("fake_switches.netconf")
+        self.recording = recording
 
         self.input_buffer = ""
         self.session_count = 0
@@ -35,7 +36,10 @@ class NetconfProtocol(Protocol):
         caps_class_list = capabilities or []
         caps_class_list.insert(0, Base1_0)
         self.capabilities = [cap(self.datastore) for cap in caps_class_list]
+        self.operations = operations_table(self.capabilities)
         self.additionnal_namespaces = additionnal_namespaces or {}
+        self.parser = etree.XMLParser()
+        self.pretty_print = pretty_print
 
     def __call__(self, *args, **kwargs):
         return self
@@ -52,6 +56,10 @@ class NetconfProtocol(Protocol):
             ]
         }))
 
+    def connectionLost(self, reason):
+        if self.recording is not None:
+            self.recording.close()
+
     def dataReceived(self, data):
         data = data.decode()
         self.logger.info("Received : %s" % repr(data))
@@ -66,24 +74,24 @@ class NetconfProtocol(Protocol):
             self.been_greeted = True
             return
 
-        xml_request_root = remove_namespaces(etree.fromstring(data.encode()))
+        if self.recording is not None:
+            self.recording.input(data)
+
+        xml_request_root = remove_namespaces(etree.fromstring(data.encode(), self.parser))
         message_id = xml_request_root.get("message-id")
         operation = xml_request_root[0]
         self.logger.info("Operation requested %s" % repr(operation.tag))
 
-        handled = False
         operation_name = normalize_operation_name(operation)
-        for capability in self.capabilities:
-            if hasattr(capability, operation_name):
-                try:
-                    self.reply(message_id, getattr(capability, operation_name)(operation))
-                except NetconfError as e:
-                    self.reply(message_id, Response(e.to_etree()))
-
-                handled = True
-
-        if not handled:
+        handler = self.operations.get(operation_name)
+        if handler is None:
             self.reply(message_id, Response(OperationNotSupported(operation_name).to_etree()))
+            return
+
+        try:
+            self.reply(message_id, handler(operation))
+        except NetconfError as e:
+            self.reply(message_id, Response(e.to_etree()))
 
     def reply(self, message_id, response):
         reply = etree.Element("rpc-reply", xmlns=NS_BASE_1_0, nsmap=self.additionnal_namespaces)
@@ -95,18 +103,30 @@ class NetconfProtocol(Protocol):
 
         if response.require_disconnect:
             self.logger.info("Disconnecting")
+            if self.recording is not None:
+                self.recording.close()
             self.transport.loseConnection()
 
     def say(self, etree_root):
-        self.logger.info("Saying : %s" % repr(etree.tostring(etree_root)))
-        self.transport.write(etree.tostring(etree_root, pretty_print=True) + b"]]>]]>\n")
+        payload = etree.tostring(etree_root, pretty_print=self.pretty_print)
+        self.logger.info("Saying : %s" % repr(payload))
+        if self.recording is not None and self.been_greeted:
+            self.recording.output(payload.decode())
+        self.transport.write(payload + b"]]>]]>\n")
+
+
+def operations_table(capabilities):
+    operations = {}
+    for capability in capabilities:
+        for name in dir(capability):
+            if not name.startswith("_") and name != "get_url" and callable(getattr(capability, name)):
+                operations.setdefault(name, getattr(capability, name))
+    return operations
 
 
 def remove_namespaces(xml_root):
-    xml_root.tag = unqualify(xml_root.tag)
-    for child in xml_root:
-        remove_namespaces(child)
+    for element in xml_root.iter(etree.Element):
+        tag = element.tag
+        if tag.startswith("{"):
+            element.tag = tag[tag.index("}") + 1:]
     return xml_root
-
-def unqualify(tag):
-    return re.sub("\{[^\}]*\}", "", tag)
@@ -0,0 +1,145 @@
+# Copyright 2018 Inap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+from collections import OrderedDict
+
+FORMAT_VERSION = 1
+
+
+class SessionRecorder(object):
+    """
+    Records what goes in and out of the sessions of one or many switches,
+    one JSON event per line:
+
+    {"started":1529412345.12,"v":1}
+    {"e":"open","kind":"cli","s":1,"switch":"my_switch","t":0.0}
+    {"d":"my_switch>","e":"out","s":1,"t":0.0}
+    {"d":"enable","e":"in","s":1,"t":1.501}
+
+    t is the number of seconds since the recording started, s identifies the session.
+    """
+
+    def __init__(self, output, clock=time.time):
+        self.output = output
+        self.clock = clock
+        self.started = None
+        self.last_session_id = 0
+
+    def __deepcopy__(self, memo):
+        # copies of a configuration, like Juniper candidates, keep recording in the same place
+        return self
+
+    def open_session(self, switch_name, kind):
+        self.last_session_id += 1
+        return SessionRecording(self, self.last_session_id, switch_name, kind)
+
+    def record(self, session_id, event, data=None, **details):
+        now = self.clock()
+        if self.started is None:
+            self.started = now
+            self._write({"v": FORMAT_VERSION, "started": now})
+
+        line = {"t": round(now - self.started, 6), "s": session_id, "e": event}
+        if data is not None:
+            line["d"] = data
+        line.update(details)
+        self._write(line)
+
+    def _write(self, line):
+        self.output.write(u"{}\n".format(json.dumps(line, separators=(",", ":"), sort_keys=True)))
+        self.output.flush()
+
+
+class SessionRecording(object):
+    def __init__(self, recorder, session_id, switch_name, kind):
+        self.recorder = recorder
+        self.session_id = session_id
+        self.switch_name = switch_name
+        self.kind = kind
+        self.opened = False
+        self.closed = False
+
+    def input(self, data):
+        self._record("in", data)
+
+    def output(self, data):
+        self._record("out", data)
+
+    def key(self, key):
+        self._record("key", key)
+
+    def close(self):
+        if self.opened and not self.closed:
+            self._record("close")
+        self.closed = True
+
+    def _record(self, event, data=None):
+        if not self.opened:
+            self.opened = True
+            self.recorder.record(self.session_id, "open", switch=self.switch_name, kind=self.kind)
+        self.recorder.record(self.session_id, event, data)
+
+
+def open_recording(switch_configuration, kind):
+    if switch_configuration.recorder is None:
+        return None
+    return switch_configuration.recorder.open_session(switch_configuration.name, kind)
+
+
+class RecordedSession(object):
+    def __init__(self, session_id, switch_name, kind, started):
+        self.session_id = session_id
+        self.switch_name = switch_name
+        self.kind = kind
+        self.started = started
+        self.events = []
+
+    @property
+    def closed(self):
+        return bool(self.events) and self.events[-1][1] == "close"
+
+    def exchanges(self):
+        """
+        The session as a list of (time, event, data, output) where output is everything
+        the switch wrote after this event and before the next input.  The first exchange
+        holds what was written before any input and has no event.
+        """
+        exchanges = [[self.started, None, None, []]]
+        for t, event, data in self.events:
+            if event == "out":
+                exchanges[-1][3].append(data)
+            elif event in ("in", "key"):
+                exchanges.append([t, event, data, []])
+
+        return [(t, event, data, "".join(output)) for t, event, data, output in exchanges]
+
+
+def read_sessions(lines):
+    sessions = OrderedDict()
+    for line in lines:
+        if not line.strip():
+            continue
+
+        event = json.loads(line)
+        if "v" in event:
+            if event["v"] != FORMAT_VERSION:
+                raise ValueError("Unsupported recording version {}".format(event["v"]))
+        elif event["e"] == "open":
+            sessions[event["s"]] = RecordedSession(event["s"], event["switch"], event["kind"], event["t"])
+        else:
+            sessions[event["s"]].events.append((event["t"], event["e"], event.get("d")))
+
+    return list(sessions.values())
@@ -16,9 +16,12 @@ from time import sleep
 
 from netaddr import IPNetwork, IPAddress
 
+NETWORK_MEMBERSHIPS = ("ips", "secondary_ips")
+
 
 class SwitchConfiguration(object):
-    def __init__(self, ip, name="", auto_enabled=False, privileged_passwords=None, ports=None, vlans=None, objects_overrides=None, commit_delay=0):
+    def __init__(self, ip, name="", auto_enabled=False, privileged_passwords=None, ports=None, vlans=None, objects_overrides=None, commit_delay=0,
+                 private_candidates=False, compact_netconf_replies=False, recorder=None):
         self.ip = ip
         self.name = name
         self.privileged_passwords = privileged_passwords or []
@@ -26,8 +29,13 @@ class SwitchConfiguration(object):
         self.vlans = []
         self.ports = []
         self.static_routes = []
+        self.routes = PrefixIndex()
+        self.networks = PrefixIndex()
         self.vrfs = [VRF('DEFAULT-LAN')]
         self.locked = False
+        self.memberships = {}
+        self.port_ranks = {}
+        self.next_port_rank = 0
         self.objects_factory = {
             "Route": Route,
             "VRF": VRF,
@@ -38,6 +46,9 @@ class SwitchConfiguration(object):
             "AggregatedPort": AggregatedPort,
         }
         self.commit_delay = commit_delay
+        self.private_candidates = private_candidates
+        self.compact_netconf_replies = compact_netconf_replies
+        self.recorder = recorder
 
         if vlans:
             [self.add_vlan(v) for v in vlans]
@@ -51,12 +62,17 @@ class SwitchConfiguration(object):
 
     def add_static_route(self, route):
         self.static_routes.append(route)
+        self.routes.add(route.dest, route)
 
     def remove_static_route(self, destination, mask):
         subnet = IPNetwork("{}/{}".format(destination, mask))
-        route = next(route for route in self.static_routes if route.dest == subnet)
+        route = next(iter(self.routes.get(subnet)))
+        self.routes.remove(subnet, route)
         self.static_routes.remove(route)
 
+    def get_static_route_for(self, ip):
+        return _longest_prefix(self.routes.lookup(ip), lambda route: route.dest)
+
     def get_vlan(self, number):
         return next((vlan for vlan in self.vlans if vlan.number == number), None)
 
@@ -77,22 +93,70 @@ class SwitchConfiguration(object):
     def add_port(self, port):
         self.ports.append(port)
         port.switch_configuration = self
+        self.port_ranks[port] = self.next_port_rank
+        self.next_port_rank += 1
+        for membership in port.MEMBERSHIPS:
+            self.add_membership(port, membership, getattr(port, membership))
 
     def remove_port(self, port):
+        for membership in port.MEMBERSHIPS:
+            self.remove_membership(port, membership, getattr(port, membership))
+        del self.port_ranks[port]
         port.switch_configuration = None
         self.ports.remove(port)
 
+    def add_membership(self, port, membership, values):
+        for value in _as_collection(values):
+            if membership in NETWORK_MEMBERSHIPS:
+                if value is not None:
+                    self.networks.add(value, (membership, port, value))
+            else:
+                self.memberships.setdefault((membership, value), set()).add(port)
+
+    def remove_membership(self, port, membership, values):
+        for value in _as_collection(values):
+            if membership in NETWORK_MEMBERSHIPS:
+                if value is not None:
+                    self.networks.remove(value, (membership, port, value))
+                continue
+            members = self.memberships.get((membership, value))
+            if members is not None:
+                members.discard(port)
+                if not members:
+                    del self.memberships[(membership, value)]
+
+    def get_members(self, *memberships):
+        members = set()
+        for membership in memberships:
+            members.update(self.memberships.get(membership, ()))
+        return sorted(members, key=self.port_ranks.get)
+
+    def get_membership_values(self, membership):
+        return set(value for m, value in self.memberships if m == membership and value is not None)
+
+    def get_aggregation_members(self, aggregated_port_name):
+        return self.get_members(("aggregation_membership", aggregated_port_name))
+
     def get_port_by_partial_name(self, name):
         partial_name, number = split_port_name(name.lower())
 
         return next((port for port in self.ports if port.name.lower().startswith(partial_name.strip()) and port.name.lower().endswith(number.strip())), None)
 
     def get_port_and_ip_by_ip(self, ip_string):
-        for port in [e for e in self.ports if isinstance(e, VlanPort)]:
-            for ip in port.ips:
-                if ip_string in ip:
-                    return port, ip
-        return None, None
+        candidates = [(port, ip) for membership, port, ip in self.networks.lookup(ip_string) if membership == "ips"]
+        if not candidates:
+            return None, None
+        return min(candidates, key=lambda c: (self.port_ranks[c[0]], _position(c[0].ips, c[1])))
+
+    def get_connected_port_and_ip_for(self, ip):
+        match = _longest_prefix(self.networks.lookup(ip), lambda entry: entry[2])
+        if match is None:
+            return None, None
+        return match[1], match[2]
+
+    def get_ports_by_network(self, network):
+        return sorted([port for membership, port, _ in self.networks.get(network) if membership == "ips"],
+                      key=self.port_ranks.get)
 
     def add_vrf(self, vrf):
         if not self.get_vrf(vrf.name):
@@ -120,11 +184,15 @@ class SwitchConfiguration(object):
 
 
 class VRF(object):
+    __slots__ = ("name",)
+
     def __init__(self, name):
         self.name = name
 
 
 class Route(object):
+    __slots__ = ("dest", "next_hop")
+
     def __init__(self, destination, mask, next_hop):
         self.dest = IPNetwork("{}/{}".format(destination, mask))
         self.next_hop = IPAddress(next_hop)
@@ -138,16 +206,190 @@ class Route(object):
         return self.dest.netmask
 
 
+class PrefixIndex(object):
+    def __init__(self):
+        self.entries = {}
+        self.prefix_lengths = {4: {}, 6: {}}
+
+    def get(self, network):
+        return list(self.entries.get(_prefix_key(network), []))
+
+    def add(self, network, value):
+        key = _prefix_key(network)
+        values = self.entries.get(key)
+        if values is None:
+            values = self.entries[key] = []
+            lengths = self.prefix_lengths[network.version]
+            lengths[network.prefixlen] = lengths.get(network.prefixlen, 0) + 1
+        if _position(values, value) is None:
+            values.append(value)
+
+    def remove(self, network, value):
+        key = _prefix_key(network)
+        values = self.entries.get(key)
+        position = _position(values, value) if values is not None else None
+        if position is not None:
+            del values[position]
+            if not values:
+                del self.entries[key]
+                lengths = self.prefix_lengths[network.version]
+                lengths[network.prefixlen] -= 1
+                if lengths[network.prefixlen] == 0:
+                    del lengths[network.prefixlen]
+
+    def lookup(self, ip):
+        address = IPAddress(ip)
+        width = 32 if address.version == 4 else 128
+        matches = []
+        for prefixlen in sorted(self.prefix_lengths[address.version]):
+            mask = ((1 << prefixlen) - 1) << (width - prefixlen)
+            matches.extend(self.entries.get((address.version, prefixlen, int(address) & mask), []))
+        return matches
+
+
+class Membership(object):
+    def __init__(self, name):
+        self.name = name
+        self.attribute = "_" + name
+
+    def __get__(self, port, owner):
+        if port is None:
+            return self
+        return getattr(port, self.attribute, None)
+
+    def __set__(self, port, value):
+        previous = getattr(port, self.attribute, None)
+        setattr(port, self.attribute, value)
+        if port.switch_configuration is not None:
+            port.switch_configuration.remove_membership(port, self.name, previous)
+            port.switch_configuration.add_membership(port, self.name, value)
+
+
+class ListMembership(Membership):
+    def __get__(self, port, owner):
+        values = super(ListMembership, self).__get__(port, owner)
+        if values is not None and port is not None and values.port is not port:
+            values.port = port
+            values.membership = self.name
+        return values
+
+    def __set__(self, port, value):
+        if value is getattr(port, self.attribute, None):
+            return
+        if value is not None:
+            value = MembershipList(value)
+            value.port = port
+            value.membership = self.name
+        super(ListMembership, self).__set__(port, value)
+
+
+class LazyAttribute(object):
+    def __init__(self, name, factory):
+        self.attribute = "_" + name
+        self.factory = factory
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = getattr(instance, self.attribute)
+        if value is None:
+            value = self.factory()
+            setattr(instance, self.attribute, value)
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.attribute, value)
+
+
+class MembershipList(list):
+    port = None
+    membership = None
+
+    def __reduce_ex__(self, protocol):
+        return MembershipList, (list(self),)
+
+    def _changed(self, added, removed):
+        conf = self.port.switch_configuration if self.port is not None else None
+        if conf is not None:
+            if self.membership in NETWORK_MEMBERSHIPS:
+                remaining = set(_value_key(v) for v in self)
+                removed = [v for v in removed if _value_key(v) not in remaining]
+            else:
+                remaining = set(self) if len(removed) > 1 else self
+                removed = [v for v in removed if v not in remaining]
+            conf.remove_membership(self.port, self.membership, removed)
+            conf.add_membership(self.port, self.membership, added)
+
+    def append(self, value):
+        super(MembershipList, self).append(value)
+        self._changed([value], [])
+
+    def extend(self, values):
+        values = list(values)
+        super(MembershipList, self).extend(values)
+        self._changed(values, [])
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def insert(self, index, value):
+        super(MembershipList, self).insert(index, value)
+        self._changed([value], [])
+
+    def remove(self, value):
+        value = self[self.index(value)]
+        super(MembershipList, self).remove(value)
+        self._changed([], [value])
+
+    def pop(self, *args):
+        value = super(MembershipList, self).pop(*args)
+        self._changed([], [value])
+        return value
+
+    def __setitem__(self, index, value):
+        previous = list(self)
+        super(MembershipList, self).__setitem__(index, value)
+        self._changed(list(self), previous)
+
+    def __delitem__(self, index):
+        previous = list(self)
+        super(MembershipList, self).__delitem__(index)
+        self._changed([], previous)
+
+
 class Vlan(object):
+    __slots__ = ("number", "name", "description", "switch_configuration", "_vendor_specific")
+
+    vendor_specific = LazyAttribute("vendor_specific", dict)
+
     def __init__(self, number=None, name=None, description=None, switch_configuration=None):
         self.number = number
         self.name = name
         self.description = description
         self.switch_configuration = switch_configuration
-        self.vendor_specific = {}
+        self._vendor_specific = None
 
 
 class Port(object):
+    __slots__ = ("name", "switch_configuration", "description", "mode", "_access_vlan", "_trunk_vlans",
+                 "_trunk_native_vlan", "trunk_encapsulation_mode", "shutdown", "vrf", "speed", "force_up",
+                 "recovery_timeout", "auto_negotiation", "_aggregation_membership", "mtu", "_vendor_specific",
+                 "_ip_helpers", "lldp_transmit", "lldp_receive", "lldp_med", "lldp_med_transmit_capabilities",
+                 "lldp_med_transmit_network_policy", "spanning_tree", "spanning_tree_portfast", "ntp", "link_name",
+                 "access_group_in", "access_group_out", "vrrp_common_authentication", "vrrp_version",
+                 "varp_addresses", "ip_redirect", "ip_proxy_arp", "unicast_reverse_path_forwarding", "load_interval",
+                 "mpls_ip")
+
+    MEMBERSHIPS = ("access_vlan", "trunk_native_vlan", "trunk_vlans", "aggregation_membership")
+
+    access_vlan = Membership("access_vlan")
+    trunk_native_vlan = Membership("trunk_native_vlan")
+    trunk_vlans = ListMembership("trunk_vlans")
+    aggregation_membership = Membership("aggregation_membership")
+    vendor_specific = LazyAttribute("vendor_specific", dict)
+    ip_helpers = LazyAttribute("ip_helpers", list)
+
     def __init__(self, name):
         self.name = name
         self.switch_configuration = None
@@ -168,8 +410,8 @@ class Port(object):
         self.auto_negotiation = None
         self.aggregation_membership = None
         self.mtu = None
-        self.vendor_specific = {}
-        self.ip_helpers = []
+        self._vendor_specific = None
+        self._ip_helpers = None
         self.lldp_transmit = None
         self.lldp_receive = None
         self.lldp_med = None
@@ -185,6 +427,12 @@ class Port(object):
 
 
 class VRRP(object):
+    __slots__ = ("group_id", "ip_addresses", "description", "authentication", "timers_hello", "timers_hold",
+                 "priority", "track", "preempt", "preempt_delay_minimum", "activated", "advertising",
+                 "related_ip_network", "_vendor_specific")
+
+    vendor_specific = LazyAttribute("vendor_specific", dict)
+
     def __init__(self, group_id):
         self.group_id = group_id
         self.ip_addresses = None
@@ -199,10 +447,18 @@ class VRRP(object):
         self.activated = None
         self.advertising = None
         self.related_ip_network = None
-        self.vendor_specific = {}
+        self._vendor_specific = None
 
 
 class VlanPort(Port):
+    __slots__ = ("_vlan_id", "_ips", "_secondary_ips", "vrrps")
+
+    MEMBERSHIPS = Port.MEMBERSHIPS + ("vlan_id", "ips", "secondary_ips")
+
+    vlan_id = Membership("vlan_id")
+    ips = ListMembership("ips")
+    secondary_ips = ListMembership("secondary_ips")
+
     def __init__(self, vlan_id, *args, **kwargs):
         super(VlanPort, self).__init__(*args, **kwargs)
 
@@ -247,6 +503,8 @@ class VlanPort(Port):
 
 
 class AggregatedPort(Port):
+    __slots__ = ("lacp_active", "lacp_periodic")
+
     def reset(self):
         self.lacp_active = False
         self.lacp_periodic = None
@@ -254,7 +512,35 @@ class AggregatedPort(Port):
         super(AggregatedPort, self).reset()
 
     def get_child_ports_linked_to_a_machine(self):
-        return [p for p in self.switch_configuration.ports if p.aggregation_membership == self.name and p.link_name is not None]
+        return [p for p in self.switch_configuration.get_aggregation_members(self.name) if p.link_name is not None]
+
+
+def _prefix_key(network):
+    return network.version, network.prefixlen, network.first
+
+
+def _value_key(value):
+    # IPNetwork equality ignores the host bits, 10.0.0.2/24 == 10.0.0.3/24
+    if isinstance(value, IPNetwork):
+        return str(value)
+    if isinstance(value, tuple):
+        return tuple(_value_key(v) for v in value)
+    return value
+
+
+def _position(values, value):
+    key = _value_key(value)
+    return next((i for i, v in enumerate(values) if _value_key(v) == key), None)
+
+
+def _longest_prefix(matches, network_of):
+    return max(matches, key=lambda match: network_of(match).prefixlen) if matches else None
+
+
+def _as_collection(values):
+    if isinstance(values, list):
+        return values
+    return [values]
 
 
 def split_port_name(name):
@@ -12,6 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from fake_switches.command_processing.command_session import CommandSession
+from fake_switches.terminal import BufferingTerminalController
+
 
 class SwitchCore(object):
     def __init__(self, switch_configuration):
@@ -20,6 +23,13 @@ class SwitchCore(object):
     def launch(self, protocol, terminal_controller):
         raise NotImplementedError()
 
+    def open_session(self, protocol="api"):
+        terminal_controller = BufferingTerminalController()
+        return CommandSession(self.launch(protocol, terminal_controller), terminal_controller)
+
+    def execute(self, commands, protocol="api"):
+        return self.open_session(protocol).execute(commands)
+
     @staticmethod
     def get_default_ports():
         raise NotImplementedError()
@@ -91,6 +91,33 @@ class LoggingTerminalController(TerminalController):
         return self.terminal_controller.remove_any_key_handler()
 
 
+class RecordingTerminalController(TerminalController):
+
+    def __init__(self, terminal_controller, recording):
+        """
+        :param terminal_controller: the real terminal controller
+        :type terminal_controller: TerminalController
+        :param recording: records everything written and every intercepted keystroke
+        :type recording: fake_switches.recording.SessionRecording
+        """
+        self.terminal_controller = terminal_controller
+        self.recording = recording
+
+    def write(self, text):
+        self.recording.output(text)
+        return self.terminal_controller.write(text)
+
+    def add_any_key_handler(self, callback, *params):
+        def recorded_callback(*args):
+            self.recording.key(args[-1])
+            return callback(*args)
+
+        return self.terminal_controller.add_any_key_handler(recorded_callback, *params)
+
+    def remove_any_key_handler(self):
+        return self.terminal_controller.remove_any_key_handler()
+
+
 class NoopTerminalController(TerminalController):
 
     def write(self, text):
@@ -101,3 +128,31 @@ class NoopTerminalController(TerminalController):
 
     def remove_any_key_handler(self):
         return None
+
+
+class BufferingTerminalController(TerminalController):
+
+    def __init__(self):
+        self.chunks = []
+        self.any_key_handler = None
+
+    def pop(self, trailing=None):
+        chunks = self.chunks
+        self.chunks = []
+
+        if trailing and chunks:
+            if chunks[-1] == trailing:
+                chunks.pop()
+            elif chunks[-1].endswith(trailing):
+                chunks[-1] = chunks[-1][:-len(trailing)]
+
+        return "".join(chunks)
+
+    def write(self, text):
+        self.chunks.append(text)
+
+    def add_any_key_handler(self, callback, *params):
+        self.any_key_handler = (callback, params)
+
+    def remove_any_key_handler(self):
+        self.any_key_handler = None
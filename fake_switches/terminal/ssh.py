@@ -39,6 +39,11 @@ class SwitchSSHShell(recvline.HistoricRecvLine):
         if not still_listening:
             self.terminal.loseConnection()
 
+    def connectionLost(self, reason):
+        recvline.HistoricRecvLine.connectionLost(self, reason)
+        if self.session is not None:
+            self.session.close()
+
     def keystrokeReceived(self, keyID, modifier):
         if keyID in self._printableChars:
             if self.awaiting_keystroke is not None:
@@ -130,6 +130,11 @@ class SwitchTelnetShell(StatefulTelnet):
         if not keep_going:
             self.transport.loseConnection()
 
+    def connectionLost(self, reason):
+        super(SwitchTelnetShell, self).connectionLost(reason)
+        if self.session is not None:
+            self.session.close()
+
     def applicationDataReceived(self, data):
         data_string = data.decode()
         if data_string in self._printable_chars:
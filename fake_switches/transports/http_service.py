@@ -14,19 +14,42 @@
 
 import logging
 
+from twisted.protocols.policies import WrappingFactory
 from twisted.web.server import Site
 
 from fake_switches.transports.base_transport import BaseTransport
 
 
 class SwitchHttpService(BaseTransport):
-    def __init__(self, ip=None, port=80, switch_core=None, users=None):
+    def __init__(self, ip=None, port=80, switch_core=None, users=None, keep_alive_timeout=None, max_connections=None):
         super(SwitchHttpService, self).__init__(ip, port, switch_core, users)
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_connections = max_connections
 
     def hook_to_reactor(self, reactor):
-        site = Site(self.switch_core.get_http_resource())
+        factory = self.build_factory()
 
-        lport = reactor.listenTCP(port=self.port, factory=site, interface=self.ip)
+        lport = reactor.listenTCP(port=self.port, factory=factory, interface=self.ip)
         logging.info(lport)
         logging.info("{} (HTTP): Registered on {} tcp/{}"
                      .format(self.switch_core.switch_configuration.name, self.ip, self.port))
+
+    def build_factory(self):
+        site = Site(self.switch_core.get_http_resource())
+        if self.keep_alive_timeout is not None:
+            site.timeOut = self.keep_alive_timeout
+
+        if self.max_connections is None:
+            return site
+        return ConnectionLimitingFactory(site, self.max_connections)
+
+
+class ConnectionLimitingFactory(WrappingFactory):
+    def __init__(self, wrapped_factory, max_connections):
+        WrappingFactory.__init__(self, wrapped_factory)
+        self.max_connections = max_connections
+
+    def buildProtocol(self, addr):
+        if len(self.protocols) >= self.max_connections:
+            return None
+        return WrappingFactory.buildProtocol(self, addr)
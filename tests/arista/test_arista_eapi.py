@@ -0,0 +1,206 @@
+# Copyright 2018 Inap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import unittest
+from io import BytesIO
+
+from hamcrest import assert_that, is_, has_length
+from twisted.internet.defer import Deferred
+from twisted.internet.error import ConnectionDone
+from twisted.internet.task import Cooperator
+from twisted.python.failure import Failure
+from twisted.web.server import NOT_DONE_YET
+
+from fake_switches.arista.arista_core import AristaSwitchCore
+from fake_switches.switch_configuration import SwitchConfiguration, Port
+
+
+class TestAristaEapiProcessorPool(unittest.TestCase):
+    def setUp(self):
+        self.core = AristaSwitchCore(SwitchConfiguration("127.0.0.1", name="my_arista", ports=[Port("Ethernet1")]))
+        self.eapi = self.core.get_http_resource().children[b"command-api"]
+        self.eapi.cooperate = Cooperator(scheduler=lambda work: work()).cooperate
+
+    def test_processors_are_reused_without_leaking_state(self):
+        self.post(["enable", "configure", "vlan 123"], format="json")
+
+        result = self.post(["enable", "show vlan 123"], format="json")
+
+        assert_that(result["result"][1]["vlans"]["123"]["name"], is_("VLAN0123"))
+        assert_that(self.eapi.idle_processors["json"], has_length(1))
+
+    def test_each_format_has_its_own_processors(self):
+        self.post(["show vlan"], format="json")
+        self.post(["enable", "configure", "vlan 123"], format="text")
+
+        result = self.post(["enable", "show vlan 123"], format="text")
+
+        assert_that(result["result"][1]["output"], is_(
+            "VLAN  Name                             Status    Ports\n"
+            "----- -------------------------------- --------- -------------------------------\n"
+            "123   VLAN0123                         active\n"
+            "\n"))
+        assert_that(self.eapi.idle_processors["json"], has_length(1))
+        assert_that(self.eapi.idle_processors["text"], has_length(1))
+
+    def test_display_state_is_reset_between_requests(self):
+        self.post(["enable", "show vlan"], format="json")
+
+        result = self.post(["enable"], format="json")
+
+        assert_that(result["result"], is_([{"sourceDetail": ""}]))
+
+    def test_batched_calls_are_answered_in_order_with_one_processor_per_format(self):
+        request = FakeRequest([
+            run_cmds(["enable", "configure", "vlan 123"], format="json", id="1"),
+            run_cmds(["enable", "show vlan 123"], format="json", id="2"),
+            run_cmds(["show vlan 999"], format="json", id="3"),
+        ])
+
+        assert_that(self.eapi.render_POST(request), is_(NOT_DONE_YET))
+
+        result = request.response()
+        assert_that([r["id"] for r in result], is_(["1", "2", "3"]))
+        assert_that(result[1]["result"][1]["vlans"]["123"]["name"], is_("VLAN0123"))
+        assert_that(result[2]["error"]["code"], is_(1000))
+        assert_that(request.finished, is_(True))
+        assert_that(self.eapi.idle_processors["json"], has_length(1))
+
+    def test_long_requests_do_not_block_other_requests(self):
+        scheduled = []
+        self.eapi.cooperate = Cooperator(terminationPredicateFactory=lambda: lambda: True,
+                                         scheduler=scheduled.append).cooperate
+
+        long_request = FakeRequest([run_cmds(["enable", "show interfaces"], format="text", id=str(i))
+                                    for i in range(10)])
+        short_request = FakeRequest(run_cmds(["show vlan"], format="json", id="1"))
+        self.eapi.render_POST(long_request)
+        self.eapi.render_POST(short_request)
+
+        while not short_request.finished:
+            scheduled.pop(0)()
+
+        assert_that(long_request.finished, is_(False))
+        assert_that(short_request.response()["result"][0]["vlans"]["1"]["name"], is_("default"))
+
+        while scheduled:
+            scheduled.pop(0)()
+
+        assert_that(long_request.response(), has_length(10))
+
+    def test_work_stops_when_the_client_disconnects(self):
+        scheduled = []
+        self.eapi.cooperate = Cooperator(terminationPredicateFactory=lambda: lambda: True,
+                                         scheduler=scheduled.append).cooperate
+
+        request = FakeRequest(run_cmds(["enable", "configure", "vlan 123"], format="json", id="1"))
+        self.eapi.render_POST(request)
+        scheduled.pop(0)()
+
+        request.disconnect()
+        while scheduled:
+            scheduled.pop(0)()
+
+        assert_that(self.core.switch_configuration.get_vlan(123), is_(None))
+        assert_that(request.finished, is_(False))
+        assert_that(self.eapi.idle_processors["json"], has_length(1))
+
+    def test_unexpected_errors_end_the_request(self):
+        request = FakeRequest(run_cmds(["show unknown"], format="json", id="1"))
+
+        self.eapi.render_POST(request)
+
+        assert_that(request.code, is_(500))
+        assert_that(request.finished, is_(True))
+
+    def test_invalid_params_are_answered_with_an_error(self):
+        request = FakeRequest(run_cmds(["show vlan"], format="xml", id="1"))
+
+        self.eapi.render_POST(request)
+
+        assert_that(request.code, is_(200))
+        assert_that(request.response()["id"], is_("1"))
+        assert_that(request.response()["error"]["code"], is_(-32602))
+        assert_that(request.finished, is_(True))
+
+    def test_failing_calls_of_a_batch_are_answered_with_errors(self):
+        missing_params = run_cmds(["show vlan"], format="json", id="2")
+        del missing_params["params"]
+        request = FakeRequest([
+            run_cmds(["show vlan"], format="json", id="1"),
+            missing_params,
+            run_cmds(["show vlan"], format="xml", id="3"),
+            run_cmds(["show unknown"], format="json", id="4"),
+            run_cmds(["show vlan"], format="text", id="5"),
+        ])
+
+        self.eapi.render_POST(request)
+
+        result = request.response()
+        assert_that([r["id"] for r in result], is_(["1", "2", "3", "4", "5"]))
+        assert_that([r.get("error", {}).get("code") for r in result], is_([None, -32602, -32602, -32603, None]))
+        assert_that(request.code, is_(200))
+        assert_that(request.finished, is_(True))
+
+    def test_empty_batches_are_invalid(self):
+        request = FakeRequest([])
+
+        self.eapi.render_POST(request)
+
+        assert_that(request.response(), is_({"jsonrpc": "2.0", "id": None,
+                                             "error": {"code": -32600, "message": "Invalid Request: empty batch"}}))
+        assert_that(request.finished, is_(True))
+
+    def post(self, cmds, format):
+        request = FakeRequest(run_cmds(cmds, format=format, id="1"))
+        self.eapi.render_POST(request)
+        return request.response()
+
+
+def run_cmds(cmds, format, id):
+    return {
+        "jsonrpc": "2.0",
+        "method": "runCmds",
+        "params": {"version": 1, "cmds": cmds, "format": format},
+        "id": id
+    }
+
+
+class FakeRequest(object):
+    def __init__(self, content):
+        self.content = BytesIO(json.dumps(content).encode())
+        self.written = []
+        self.finished = False
+        self.startedWriting = False
+        self.code = 200
+        self.finish_notification = Deferred()
+
+    def write(self, data):
+        self.startedWriting = True
+        self.written.append(data)
+
+    def setResponseCode(self, code):
+        self.code = code
+
+    def notifyFinish(self):
+        return self.finish_notification
+
+    def disconnect(self):
+        self.finish_notification.errback(Failure(ConnectionDone()))
+
+    def finish(self):
+        self.finished = True
+
+    def response(self):
+        return json.loads(b"".join(self.written).decode())
@@ -0,0 +1,116 @@
+# Copyright 2018 Inap.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from hamcrest import assert_that, is_
+from netaddr import IPNetwork
+
+from fake_switches.arista.command_processor.default import _to_interface_json, _to_switchport_json, _to_vlans_json
+from fake_switches.switch_configuration import Port, SwitchConfiguration, Vlan, VlanPort
+
+
+class TestAristaJsonFormats(unittest.TestCase):
+    def setUp(self):
+        self.conf = SwitchConfiguration("127.0.0.1", name="my_switch")
+
+    def test_unchanged_ports_reuse_their_json(self):
+        port = self._add_port(Port("Ethernet1"))
+        first = _to_interface_json(self.conf, [port])["interfaces"]["Ethernet1"]
+        second = _to_interface_json(self.conf, [port])["interfaces"]["Ethernet1"]
+
+        assert_that(first is second, is_(True))
+        assert_that(first["name"], is_("Ethernet1"))
+        assert_that(first["mtu"], is_(9214))
+
+    def test_ports_do_not_share_nested_values(self):
+        first, second = self._add_port(Port("Ethernet1")), self._add_port(Port("Ethernet2"))
+        interfaces = _to_interface_json(self.conf, [first, second])["interfaces"]
+
+        assert_that(interfaces["Ethernet1"]["interfaceCounters"] is interfaces["Ethernet2"]["interfaceCounters"],
+                    is_(False))
+
+    def test_ip_interface_json_follows_the_port_addresses(self):
+        port = self._add_port(VlanPort(1000, "Vlan1000"))
+        assert_that(_to_interface_json(self.conf, [port])["interfaces"]["Vlan1000"]["interfaceAddress"], is_([]))
+
+        port.add_ip(IPNetwork("10.0.0.1/24"))
+
+        address = _to_interface_json(self.conf, [port])["interfaces"]["Vlan1000"]["interfaceAddress"][0]
+        assert_that(address["primaryIp"], is_({"address": "10.0.0.1", "maskLen": 24}))
+
+    def test_ip_interface_json_follows_addresses_changed_within_the_same_subnet(self):
+        port = self._add_port(VlanPort(10, "Vlan10"))
+        port.add_ip(IPNetwork("10.0.0.2/24"))
+        _to_interface_json(self.conf, [port])
+
+        port.ips[0] = IPNetwork("10.0.0.3/24")
+
+        address = _to_interface_json(self.conf, [port])["interfaces"]["Vlan10"]["interfaceAddress"][0]
+        assert_that(address["primaryIp"], is_({"address": "10.0.0.3", "maskLen": 24}))
+
+    def test_switches_in_the_same_subnet_do_not_share_their_json(self):
+        other_conf = SwitchConfiguration("127.0.0.1", name="other_switch")
+        port = self._add_port(VlanPort(10, "Vlan10"))
+        port.add_ip(IPNetwork("10.0.0.2/24"))
+        other_port = VlanPort(10, "Vlan10")
+        other_conf.add_port(other_port)
+        other_port.add_ip(IPNetwork("10.0.0.3/24"))
+
+        _to_interface_json(self.conf, [port])
+        address = _to_interface_json(other_conf, [other_port])["interfaces"]["Vlan10"]["interfaceAddress"][0]
+        assert_that(address["primaryIp"]["address"], is_("10.0.0.3"))
+
+        other_port.ips[0] = IPNetwork("10.0.0.9/24")
+
+        address = _to_interface_json(other_conf, [other_port])["interfaces"]["Vlan10"]["interfaceAddress"][0]
+        assert_that(address["primaryIp"]["address"], is_("10.0.0.9"))
+
+    def test_removed_ports_are_forgotten(self):
+        port = self._add_port(Port("Ethernet1"))
+        first = _to_interface_json(self.conf, [port])["interfaces"]["Ethernet1"]
+
+        self.conf.remove_port(port)
+        _to_interface_json(self.conf, [])
+        port = self._add_port(Port("Ethernet1"))
+
+        assert_that(_to_interface_json(self.conf, [port])["interfaces"]["Ethernet1"] is first, is_(False))
+
+    def test_switchport_json_follows_the_port_mode_and_vlans(self):
+        port = self._add_port(Port("Ethernet1"))
+        info = _to_switchport_json(self.conf, [port])["switchports"]["Ethernet1"]["switchportInfo"]
+        assert_that((info["mode"], info["trunkAllowedVlans"]), is_(("access", "ALL")))
+
+        port.mode = "trunk"
+        port.trunk_vlans = [10, 11, 12]
+
+        info = _to_switchport_json(self.conf, [port])["switchports"]["Ethernet1"]["switchportInfo"]
+        assert_that((info["mode"], info["trunkAllowedVlans"]), is_(("trunk", "10-12")))
+
+        port.trunk_vlans.append(14)
+
+        info = _to_switchport_json(self.conf, [port])["switchports"]["Ethernet1"]["switchportInfo"]
+        assert_that(info["trunkAllowedVlans"], is_("10-12,14"))
+
+    def test_vlan_json_follows_the_vlan_name(self):
+        vlan = Vlan(123)
+        self.conf.add_vlan(vlan)
+        assert_that(_to_vlans_json(self.conf, [vlan])["vlans"]["123"]["name"], is_("VLAN0123"))
+
+        vlan.name = "my-vlan"
+
+        assert_that(_to_vlans_json(self.conf, [vlan])["vlans"]["123"]["name"], is_("my-vlan"))
+
+    def _add_port(self, port):
+        self.conf.add_port(port)
+        return port
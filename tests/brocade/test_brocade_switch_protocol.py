@@ -1,9 +1,9 @@
 import mock
-from tests.util.protocol_util import SshTester, with_protocol, ProtocolTest
+from tests.util.protocol_util import LoopbackSshTester, with_protocol, ProtocolTest
 
 
 class TestBrocadeSwitchProtocol(ProtocolTest):
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "brocade"
 
     @with_protocol
@@ -1,4 +1,4 @@
-from tests.util.protocol_util import SshTester, TelnetTester, with_protocol, ProtocolTest
+from tests.util.protocol_util import LoopbackSshTester, LoopbackTelnetTester, with_protocol, ProtocolTest
 
 
 class TestCiscoAutoEnabledSwitchProtocol(ProtocolTest):
@@ -22,9 +22,9 @@ class TestCiscoAutoEnabledSwitchProtocol(ProtocolTest):
 
 class TestCiscoSwitchProtocolSSH(TestCiscoAutoEnabledSwitchProtocol):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class TestCiscoSwitchProtocolTelnet(TestCiscoAutoEnabledSwitchProtocol):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
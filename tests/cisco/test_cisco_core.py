@@ -1,7 +1,13 @@
 import unittest
 
 from fake_switches.cisco import cisco_core
-from hamcrest import assert_that, has_length, has_property
+from fake_switches.cisco.command_processor.config import ConfigCommandProcessor
+from fake_switches.cisco.command_processor.config_interface import ConfigInterfaceCommandProcessor
+from fake_switches.cisco.command_processor.config_vlan import ConfigVlanCommandProcessor
+from fake_switches.cisco.command_processor.config_vrf import ConfigVRFCommandProcessor
+from fake_switches.cisco.command_processor.enabled import EnabledCommandProcessor
+from fake_switches.switch_configuration import SwitchConfiguration
+from hamcrest import assert_that, has_length, has_property, equal_to
 
 
 class CiscoCoreTest(unittest.TestCase):
@@ -26,3 +32,21 @@ class CiscoCoreTest(unittest.TestCase):
         assert_that(gigabit_ethernet_ports, has_length(2))
         assert_that(fast_ethernet_ports[0], has_property('name', 'FastEthernet0/1'))
         assert_that(gigabit_ethernet_ports[0], has_property('name', 'GigabitEthernet0/1'))
+
+    def test_cores_without_a_processor_graph_build_their_command_processor(self):
+        class LegacySwitchCore(cisco_core.BaseCiscoSwitchCore):
+            def new_command_processor(self):
+                return EnabledCommandProcessor(
+                    config=ConfigCommandProcessor(
+                        config_vlan=ConfigVlanCommandProcessor(),
+                        config_vrf=ConfigVRFCommandProcessor(),
+                        config_interface=ConfigInterfaceCommandProcessor()
+                    )
+                )
+
+        core = LegacySwitchCore(SwitchConfiguration("127.0.0.1", name="my_switch", privileged_passwords=["root"]))
+
+        session = core.open_session()
+        session.execute(["enable", "root", "configure terminal"])
+
+        assert_that(session.prompt, equal_to("my_switch(config)#"))
@@ -17,7 +17,7 @@ import mock
 from tests.cisco import enable, create_interface_vlan, configuring, configuring_interface_vlan, \
     assert_interface_configuration, remove_vlan, create_vlan, set_interface_on_vlan, configuring_interface, \
     revert_switchport_mode_access, create_port_channel_interface, configuring_port_channel
-from tests.util.protocol_util import SshTester, TelnetTester, with_protocol, ProtocolTest
+from tests.util.protocol_util import LoopbackSshTester, LoopbackTelnetTester, with_protocol, ProtocolTest
 
 
 class TestCiscoSwitchProtocol(ProtocolTest):
@@ -1342,6 +1342,39 @@ class TestCiscoSwitchProtocol(ProtocolTest):
         t.read("my_switch#")
         t.write("exit")
 
+    @with_protocol
+    def test_show_ip_route_for_an_address(self, t):
+        enable(t)
+        create_interface_vlan(t, "2999")
+        configuring_interface_vlan(t, "2999", do="ip address 1.1.1.2 255.255.255.0")
+        configuring(t, do="ip route 1.1.0.0 255.255.0.0 1.1.1.1")
+
+        t.write("show ip route 1.1.1.200")
+        t.readln("Routing entry for 1.1.1.0/24")
+        t.readln("  Known via \"connected\", distance 0, metric 0 (connected, via interface)")
+        t.readln("  Routing Descriptor Blocks:")
+        t.readln("  * directly connected, via Vlan2999")
+        t.readln("      Route metric is 0, traffic share count is 1")
+        t.readln("")
+        t.read("my_switch#")
+
+        t.write("show ip route 1.1.2.1")
+        t.readln("Routing entry for 1.1.0.0/16")
+        t.readln("  Known via \"static\", distance 1, metric 0")
+        t.readln("  Routing Descriptor Blocks:")
+        t.readln("  * 1.1.1.1")
+        t.readln("      Route metric is 0, traffic share count is 1")
+        t.readln("")
+        t.read("my_switch#")
+
+        t.write("show ip route 2.2.2.2")
+        t.readln("% Network not in table")
+        t.readln("")
+        t.read("my_switch#")
+
+        configuring(t, do="no ip route 1.1.0.0 255.255.0.0 1.1.1.1")
+        configuring(t, do="no interface vlan 2999")
+
     @with_protocol
     def test_write_memory(self, t):
         enable(t)
@@ -1541,9 +1574,9 @@ class TestCiscoSwitchProtocol(ProtocolTest):
 
 class TestCiscoSwitchProtocolSSH(TestCiscoSwitchProtocol):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class TestCiscoSwitchProtocolTelnet(TestCiscoSwitchProtocol):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
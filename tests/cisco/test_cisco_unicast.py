@@ -14,7 +14,7 @@
 
 from tests.cisco import enable, create_interface_vlan, configuring, configuring_interface_vlan, \
     assert_interface_configuration
-from tests.util.protocol_util import SshTester, TelnetTester, with_protocol, ProtocolTest
+from tests.util.protocol_util import LoopbackSshTester, LoopbackTelnetTester, with_protocol, ProtocolTest
 
 
 class CiscoUnicastTest(ProtocolTest):
@@ -70,9 +70,9 @@ class CiscoUnicastTest(ProtocolTest):
 
 class CiscoUnicastProtocolSSHTest(CiscoUnicastTest):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class CiscoUnicastProtocolTelnetTest(CiscoUnicastTest):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
@@ -14,13 +14,13 @@
 
 from tests.cisco import enable, create_interface_vlan, configuring, configuring_interface_vlan, \
     assert_interface_configuration
-from tests.util.protocol_util import SshTester, TelnetTester, with_protocol, ProtocolTest
+from tests.util.protocol_util import LoopbackSshTester, LoopbackTelnetTester, with_protocol, ProtocolTest
 
 
 class Cisco6500UnicastTest(ProtocolTest):
     __test__ = False
 
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "cisco6500"
 
     @with_protocol
@@ -48,9 +48,9 @@ class Cisco6500UnicastTest(ProtocolTest):
 
 class Cisco6500UnicastProtocolSSHTest(Cisco6500UnicastTest):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class Cisco6500UnicastProtocolTelnetTest(Cisco6500UnicastTest):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
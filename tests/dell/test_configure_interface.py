@@ -19,13 +19,13 @@ from tests.dell import enable, configuring_interface, \
     get_running_config, configure, configuring_vlan, unconfigure_vlan, \
     configuring_a_vlan_on_interface, create_bond, remove_bond, \
     configuring_bond
-from tests.util.protocol_util import with_protocol, ProtocolTest, SshTester, TelnetTester
+from tests.util.protocol_util import with_protocol, ProtocolTest, LoopbackSshTester, LoopbackTelnetTester
 
 
 class DellConfigureInterfaceTest(ProtocolTest):
     __test__ = False
 
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "dell"
 
     @with_protocol
@@ -999,9 +999,9 @@ class DellConfigureInterfaceTest(ProtocolTest):
 
 class DellConfigureInterfaceSshTest(DellConfigureInterfaceTest):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class DellConfigureInterfaceTelnetTest(DellConfigureInterfaceTest):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
@@ -15,13 +15,13 @@
 from tests.dell import enable, configuring_vlan, \
     assert_running_config_contains_in_order, unconfigure_vlan, \
     assert_interface_configuration
-from tests.util.protocol_util import with_protocol, ProtocolTest, SshTester, TelnetTester
+from tests.util.protocol_util import with_protocol, ProtocolTest, LoopbackSshTester, LoopbackTelnetTester
 
 
 class DellConfigureVlanTest(ProtocolTest):
     __test__ = False
 
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "dell"
 
     @with_protocol
@@ -119,9 +119,9 @@ class DellConfigureVlanTest(ProtocolTest):
 
 class DellConfigureVlanSshTest(DellConfigureVlanTest):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class DellConfigureVlanTelnetTest(DellConfigureVlanTest):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
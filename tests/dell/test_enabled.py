@@ -15,13 +15,13 @@
 from tests.dell import enable, assert_running_config_contains_in_order, \
     configuring_vlan, configuring_interface_vlan, unconfigure_vlan, \
     configuring_a_vlan_on_interface, configuring_interface
-from tests.util.protocol_util import with_protocol, ProtocolTest, SshTester, TelnetTester
+from tests.util.protocol_util import with_protocol, ProtocolTest, LoopbackSshTester, LoopbackTelnetTester
 
 
 class DellEnabledTest(ProtocolTest):
     __test__ = False
 
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "dell"
 
     @with_protocol
@@ -346,9 +346,9 @@ class DellEnabledTest(ProtocolTest):
 
 class DellEnabledSshTest(DellEnabledTest):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class DellEnabledTelnetTest(DellEnabledTest):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
@@ -12,13 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from tests.util.protocol_util import with_protocol, ProtocolTest, SshTester, TelnetTester
+from tests.util.protocol_util import with_protocol, ProtocolTest, LoopbackSshTester, LoopbackTelnetTester
 
 
 class DellUnprivilegedTest(ProtocolTest):
     __test__ = False
 
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "dell"
 
     @with_protocol
@@ -58,9 +58,9 @@ class DellUnprivilegedTest(ProtocolTest):
 
 class DellUnprivilegedSshTest(DellUnprivilegedTest):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class DellUnprivilegedTelnetTest(DellUnprivilegedTest):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
@@ -13,13 +13,13 @@
 # limitations under the License.
 
 from tests.dell10g import enable
-from tests.util.protocol_util import with_protocol, ProtocolTest, SshTester, TelnetTester
+from tests.util.protocol_util import with_protocol, ProtocolTest, LoopbackSshTester, LoopbackTelnetTester
 
 
 class Dell10GConfigureTest(ProtocolTest):
     __test__ = False
 
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "dell10g"
 
     @with_protocol
@@ -83,9 +83,9 @@ class Dell10GConfigureTest(ProtocolTest):
 
 class Dell10GConfigureSshTest(Dell10GConfigureTest):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class Dell10GConfigureTelnetTest(Dell10GConfigureTest):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
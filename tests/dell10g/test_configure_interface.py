@@ -17,11 +17,11 @@ from hamcrest import assert_that, is_not, has_item
 from tests.dell10g import enable, assert_interface_configuration, assert_running_config_contains_in_order, \
     get_running_config, configuring_interface, add_vlan, configuring, \
     remove_bond, create_bond
-from tests.util.protocol_util import with_protocol, ProtocolTest, SshTester, TelnetTester
+from tests.util.protocol_util import with_protocol, ProtocolTest, LoopbackSshTester, LoopbackTelnetTester
 
 
 class Dell10GConfigureInterfaceSshTest(ProtocolTest):
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "dell10g"
 
     @with_protocol
@@ -685,4 +685,4 @@ class Dell10GConfigureInterfaceSshTest(ProtocolTest):
 
 
 class Dell10GConfigureInterfaceTelnetTest(Dell10GConfigureInterfaceSshTest):
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
@@ -14,13 +14,13 @@
 
 from tests.dell10g import enable, configuring_vlan, \
     assert_running_config_contains_in_order, add_vlan, configuring
-from tests.util.protocol_util import with_protocol, ProtocolTest, SshTester, TelnetTester
+from tests.util.protocol_util import with_protocol, ProtocolTest, LoopbackSshTester, LoopbackTelnetTester
 
 
 class Dell10GConfigureVlanTest(ProtocolTest):
     __test__ = False
 
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "dell10g"
 
     @with_protocol
@@ -46,9 +46,9 @@ class Dell10GConfigureVlanTest(ProtocolTest):
 
 class Dell10GConfigureVlanSshTest(Dell10GConfigureVlanTest):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class Dell10GConfigureVlanTelnetTest(Dell10GConfigureVlanTest):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
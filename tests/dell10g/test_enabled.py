@@ -14,13 +14,13 @@
 
 from tests.dell10g import enable, assert_running_config_contains_in_order, \
     configuring_vlan, configuring, add_vlan, configuring_interface
-from tests.util.protocol_util import with_protocol, SshTester, ProtocolTest, TelnetTester
+from tests.util.protocol_util import with_protocol, LoopbackSshTester, ProtocolTest, LoopbackTelnetTester
 
 
 class Dell10GEnabledTest(ProtocolTest):
     __test__ = False
 
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "dell10g"
 
     @with_protocol
@@ -263,9 +263,9 @@ class Dell10GEnabledTest(ProtocolTest):
 
 class Dell10GEnabledSshTest(Dell10GEnabledTest):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class Dell10GEnabledTelnetTest(Dell10GEnabledTest):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
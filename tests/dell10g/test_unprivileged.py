@@ -12,13 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from tests.util.protocol_util import with_protocol, ProtocolTest, SshTester, TelnetTester
+from tests.util.protocol_util import with_protocol, ProtocolTest, LoopbackSshTester, LoopbackTelnetTester
 
 
 class Dell10GUnprivilegedTest(ProtocolTest):
     __test__ = False
 
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
     test_switch = "dell10g"
 
     @with_protocol
@@ -58,9 +58,9 @@ class Dell10GUnprivilegedTest(ProtocolTest):
 
 class Dell10GUnprivilegedSshTest(Dell10GUnprivilegedTest):
     __test__ = True
-    tester_class = SshTester
+    tester_class = LoopbackSshTester
 
 
 class Dell10GUnprivilegedTelnetTest(Dell10GUnprivilegedTest):
     __test__ = True
-    tester_class = TelnetTester
+    tester_class = LoopbackTelnetTester
@@ -95,6 +95,41 @@ class JuniperBaseProtocolTest(BaseJuniper):
         result = self.nc.get_config(source="running")
         assert_that(result.xpath("data/configuration/vlans/vlan"), has_length(0))
 
+    def test_confirmed_commit_is_kept_once_confirmed(self):
+        self.edit({
+            "vlans": {
+                "vlan": {
+                    "name": "VLAN2999",
+                }
+            }
+        })
+
+        result = self.nc.commit(confirmed=True, timeout="600")
+        assert_that(result.xpath("//rpc-reply/ok"), has_length(1))
+
+        result = self.nc.commit()
+        assert_that(result.xpath("//rpc-reply/ok"), has_length(1))
+
+        result = self.nc.get_config(source="running")
+        assert_that(result.xpath("data/configuration/vlans/vlan"), has_length(1))
+
+        self.edit({
+            "vlans": {
+                "vlan": {
+                    XML_ATTRIBUTES: {"operation": "delete"},
+                    "name": "VLAN2999"
+                }
+            }
+        })
+        self.nc.commit()
+
+    def test_confirmed_commit_rejects_invalid_timeouts(self):
+        for timeout in ["soon", "0"]:
+            with self.assertRaises(RPCError) as exc:
+                self.nc.rpc(dict_2_etree({"commit-configuration": {"confirmed": {}, "confirm-timeout": timeout}}))
+
+            assert_that(str(exc.exception), contains_string("Invalid confirm-timeout value: '{}'".format(timeout)))
+
     def test_locking_fails_if_changes_are_being_made(self):
         nc2 = self.create_client()
 
@@ -1302,7 +1337,7 @@ class JuniperBaseProtocolTest(BaseJuniper):
         result = self.nc.compare_configuration()
 
         output = result.xpath("configuration-information/configuration-output")[0]
-        assert_that(output.text, is_not("There were some changes"))
+        assert_that(output.text, is_(None))
 
         self.edit({
             "vlans": [
@@ -1314,14 +1349,20 @@ class JuniperBaseProtocolTest(BaseJuniper):
         result = self.nc.compare_configuration()
 
         output = result.xpath("configuration-information/configuration-output")[0]
-        assert_that(output.text, is_("There were some changes"))
+        assert_that(output.text, is_("\n"
+                                     "[edit]\n"
+                                     "+   vlans {\n"
+                                     "+       VLAN2995 {\n"
+                                     "+           vlan-id 2995;\n"
+                                     "+       }\n"
+                                     "+   }\n"))
 
         self.nc.commit()
 
         result = self.nc.compare_configuration()
 
         output = result.xpath("configuration-information/configuration-output")[0]
-        assert_that(output.text, is_not("There were some changes"))
+        assert_that(output.text, is_(None))
 
         self.cleanup(vlan("VLAN2995"))
 
@@ -0,0 +1,93 @@
+import unittest
+
+from hamcrest import assert_that, equal_to
+from lxml import etree
+
+from fake_switches.juniper.juniper_configuration_diff import configuration_diff, changed_paths
+
+
+class JuniperConfigurationDiffTest(unittest.TestCase):
+    def test_no_changes(self):
+        running = etree.fromstring("<configuration><vlans><vlan><name>VLAN1</name><vlan-id>1</vlan-id></vlan></vlans></configuration>")
+        candidate = etree.fromstring("<configuration><vlans><vlan><name>VLAN1</name><vlan-id>1</vlan-id></vlan></vlans></configuration>")
+
+        assert_that(configuration_diff(running, candidate), equal_to(""))
+
+    def test_changed_values_are_reported_under_their_hierarchy(self):
+        running = etree.fromstring(
+            "<configuration><interfaces>"
+            "<interface><name>ge-0/0/1</name><description>old</description>"
+            "<unit><name>0</name><family><ethernet-switching><vlan><members>10</members></vlan></ethernet-switching></family></unit>"
+            "</interface>"
+            "<interface><name>ge-0/0/2</name><disable/></interface>"
+            "</interfaces></configuration>")
+        candidate = etree.fromstring(
+            "<configuration><interfaces>"
+            "<interface><name>ge-0/0/1</name><description>new description</description>"
+            "<unit><name>0</name><family><ethernet-switching><vlan><members>10</members><members>20</members></vlan></ethernet-switching></family></unit>"
+            "</interface>"
+            "<interface><name>ge-0/0/2</name><disable/></interface>"
+            "</interfaces></configuration>")
+
+        assert_that(configuration_diff(running, candidate), equal_to(
+            "[edit interfaces ge-0/0/1]\n"
+            "-   description old;\n"
+            "+   description \"new description\";\n"
+            "[edit interfaces ge-0/0/1 unit 0 family ethernet-switching vlan]\n"
+            "+   members 20;"))
+
+    def test_each_value_added_or_removed_from_a_list_is_reported(self):
+        running = etree.fromstring(
+            "<configuration><vlans><vlan><name>VLAN1</name><vlan-id>1</vlan-id>"
+            "<interface><name>ge-0/0/1.0</name></interface>"
+            "</vlan></vlans><policy><members>10</members><members>20</members><members>30</members></policy></configuration>")
+        candidate = etree.fromstring(
+            "<configuration><vlans><vlan><name>VLAN1</name><vlan-id>1</vlan-id>\n  "
+            "<interface><name>ge-0/0/1.0</name></interface>"
+            "</vlan></vlans><policy><members>10</members><members>40</members><members>30</members></policy></configuration>")
+
+        assert_that(configuration_diff(running, candidate), equal_to(
+            "[edit policy]\n"
+            "-   members 20;\n"
+            "+   members 40;"))
+
+    def test_added_and_removed_subtrees_are_rendered_completely(self):
+        running = etree.fromstring(
+            "<configuration><vlans><vlan><name>VLAN1</name><vlan-id>1</vlan-id></vlan></vlans></configuration>")
+        candidate = etree.fromstring(
+            "<configuration><vlans><vlan><name>VLAN2</name><vlan-id>2</vlan-id></vlan></vlans>"
+            "<protocols><rstp><interface><name>ge-0/0/1.0</name><edge/></interface></rstp></protocols></configuration>")
+
+        assert_that(configuration_diff(running, candidate), equal_to(
+            "[edit]\n"
+            "+   protocols {\n"
+            "+       rstp {\n"
+            "+           interface ge-0/0/1.0 {\n"
+            "+               edge;\n"
+            "+           }\n"
+            "+       }\n"
+            "+   }\n"
+            "[edit vlans]\n"
+            "-   VLAN1 {\n"
+            "-       vlan-id 1;\n"
+            "-   }\n"
+            "+   VLAN2 {\n"
+            "+       vlan-id 2;\n"
+            "+   }"))
+
+    def test_changed_paths_go_down_to_the_changed_leaves(self):
+        running = etree.fromstring(
+            "<configuration><interfaces>"
+            "<interface><name>ge-0/0/1</name><description>old</description></interface>"
+            "<interface><name>ge-0/0/2</name><disable/></interface>"
+            "</interfaces></configuration>")
+        candidate = etree.fromstring(
+            "<configuration><interfaces>"
+            "<interface><name>ge-0/0/1</name><description>new</description></interface>"
+            "</interfaces><vlans><vlan><name>VLAN1</name><vlan-id>1</vlan-id></vlan></vlans></configuration>")
+
+        assert_that(changed_paths(running, candidate), equal_to({
+            (("interfaces",), ("interface", "ge-0/0/1"), ("description",)),
+            (("interfaces",), ("interface", "ge-0/0/2"), ("disable",)),
+            (("vlans",), ("vlan", "VLAN1"), ("vlan-id",)),
+        }))
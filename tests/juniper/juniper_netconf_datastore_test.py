@@ -0,0 +1,369 @@
+import unittest
+
+from hamcrest import assert_that, equal_to
+from lxml import etree
+from netaddr import IPNetwork
+from twisted.internet.task import Clock
+
+from fake_switches.juniper.juniper_configuration_diff import configuration_diff
+from fake_switches.juniper.juniper_netconf_datastore import _get_errors_for_unused_nodes, JuniperNetconfDatastore, \
+    PrivateCandidateConflict, RollbackSnapshot
+from fake_switches.netconf import CANDIDATE, RUNNING, dict_2_etree, first
+from fake_switches.switch_configuration import SwitchConfiguration, Port, Vlan, VlanPort
+
+
+class JuniperNetconfDatastoreUnusedNodesTest(unittest.TestCase):
+    def setUp(self):
+        self.root = etree.fromstring(
+            "<configuration>"
+            "<interfaces>"
+            "<interface><name>ge-0/0/1</name><mtu>9000</mtu></interface>"
+            "<garbage/>"
+            "<interface><name>ge-0/0/2</name></interface>"
+            "</interfaces>"
+            "<vlans><vlan><name>VLAN1</name><whatever/></vlan></vlans>"
+            "<unknown/>"
+            "</configuration>")
+
+    def test_unhandled_leaves_are_reported_in_document_order(self):
+        handled = [self.root.find("interfaces/interface")]
+
+        errors = _get_errors_for_unused_nodes(self.root, handled)
+
+        assert_that([e.info["bad-element"] for e in errors], equal_to(["garbage", "name", "name", "whatever", "unknown"]))
+
+    def test_nothing_is_reported_under_a_handled_root(self):
+        interfaces = self.root.find("interfaces")
+
+        assert_that(_get_errors_for_unused_nodes(interfaces, [self.root]), equal_to([]))
+        assert_that(_get_errors_for_unused_nodes(self.root, [self.root]), equal_to([]))
+
+
+class JuniperNetconfDatastoreCommitTest(unittest.TestCase):
+    def setUp(self):
+        self.running = SwitchConfiguration("127.0.0.1", ports=[Port("ge-0/0/1"), Port("ge-0/0/2")],
+                                           vlans=[Vlan(10, "VLAN10"), Vlan(20, "VLAN20")])
+        self.datastore = JuniperNetconfDatastore(self.running)
+
+    def test_commit_merges_added_and_removed_objects_into_running(self):
+        candidate = self.datastore.configurations[CANDIDATE]
+        candidate.remove_vlan(candidate.get_vlan_by_name("VLAN20"))
+        candidate.add_vlan(Vlan(30, "VLAN30"))
+        candidate.remove_port(candidate.get_port("ge-0/0/2"))
+        new_port = Port("ge-0/0/3")
+        new_port.access_vlan = 30
+        candidate.add_port(new_port)
+
+        self.datastore.commit_candidate()
+
+        assert_that([v.name for v in self.running.vlans], equal_to(["VLAN10", "VLAN30"]))
+        assert_that([p.name for p in self.running.ports], equal_to(["ge-0/0/1", "ge-0/0/3"]))
+        committed_port = self.running.get_port("ge-0/0/3")
+        assert_that(committed_port is new_port, equal_to(False))
+        assert_that(committed_port.switch_configuration is self.running, equal_to(True))
+        assert_that(self.running.get_vlan_by_name("VLAN30").switch_configuration is self.running, equal_to(True))
+        assert_that(self.running.get_members(("access_vlan", 30)), equal_to([committed_port]))
+
+
+class JuniperNetconfDatastorePrivateSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.running = SwitchConfiguration("127.0.0.1", ports=[Port("ge-0/0/1"), Port("ge-0/0/2")],
+                                           vlans=[Vlan(10, "VLAN10")])
+        self.datastore = JuniperNetconfDatastore(self.running)
+
+    def test_sessions_editing_different_objects_are_merged(self):
+        first_session = self.datastore.private_session()
+        second_session = self.datastore.private_session()
+
+        first_session.edit(CANDIDATE, _interface_description("ge-0/0/1", "first"))
+        second_session.edit(CANDIDATE, _interface_description("ge-0/0/2", "second"))
+        second_session.edit(CANDIDATE, etree.fromstring(
+            "<configuration><vlans><vlan><name>VLAN20</name><vlan-id>20</vlan-id></vlan></vlans></configuration>"))
+
+        assert_that(second_session.configurations[CANDIDATE].get_port("ge-0/0/1").description, equal_to(None))
+
+        first_session.commit_candidate()
+        second_session.commit_candidate()
+
+        assert_that(self.running.get_port("ge-0/0/1").description, equal_to("first"))
+        assert_that(self.running.get_port("ge-0/0/2").description, equal_to("second"))
+        assert_that([v.name for v in self.running.vlans], equal_to(["VLAN10", "VLAN20"]))
+        assert_that(etree.tostring(second_session.to_etree(CANDIDATE)),
+                    equal_to(etree.tostring(second_session.to_etree(RUNNING))))
+
+    def test_sessions_editing_the_same_object_conflict(self):
+        first_session = self.datastore.private_session()
+        second_session = self.datastore.private_session()
+
+        first_session.edit(CANDIDATE, _interface_description("ge-0/0/1", "first"))
+        second_session.edit(CANDIDATE, _interface_description("ge-0/0/1", "second"))
+
+        first_session.commit_candidate()
+
+        with self.assertRaises(PrivateCandidateConflict):
+            second_session.commit_candidate()
+
+        assert_that(self.running.get_port("ge-0/0/1").description, equal_to("first"))
+
+    def test_edits_that_no_longer_apply_conflict_and_leave_the_candidate_untouched(self):
+        self.running.get_port("ge-0/0/1").description = "old"
+        first_session = self.datastore.private_session()
+        second_session = self.datastore.private_session()
+
+        second_session.edit(CANDIDATE, _interface_description("ge-0/0/1", "old", operation="delete"))
+        second_session.edit(CANDIDATE, _interface_description("ge-0/0/1", "old"))
+        first_session.edit(CANDIDATE, _interface_description("ge-0/0/1", "old", operation="delete"))
+        first_session.commit_candidate()
+
+        with self.assertRaises(PrivateCandidateConflict):
+            second_session.commit_candidate()
+
+        assert_that(len(second_session.private_edits), equal_to(2))
+        assert_that(second_session.configurations[CANDIDATE].get_port("ge-0/0/1").description, equal_to("old"))
+        assert_that(self.running.get_port("ge-0/0/1").description, equal_to(None))
+
+    def test_private_candidates_are_copied_at_their_first_edit(self):
+        session = self.datastore.private_session()
+
+        assert_that(CANDIDATE in session.configurations, equal_to(False))
+
+        self.running.get_port("ge-0/0/2").description = "committed elsewhere"
+        assert_that(session.to_etree(CANDIDATE).xpath("//description/text()"), equal_to(["committed elsewhere"]))
+
+        session.edit(CANDIDATE, _interface_description("ge-0/0/1", "mine"))
+        session.commit_candidate()
+
+        assert_that(CANDIDATE in session.configurations, equal_to(False))
+        assert_that(self.running.get_port("ge-0/0/1").description, equal_to("mine"))
+        assert_that(self.running.get_port("ge-0/0/2").description, equal_to("committed elsewhere"))
+
+    def test_private_sessions_without_edits_commit_nothing(self):
+        session = self.datastore.private_session()
+        self.datastore.private_session().commit_candidate()
+        self.running.get_port("ge-0/0/1").description = "committed elsewhere"
+
+        session.commit_candidate()
+
+        assert_that(self.running.get_port("ge-0/0/1").description, equal_to("committed elsewhere"))
+        assert_that(CANDIDATE in session.configurations, equal_to(False))
+
+    def test_shared_candidate_is_seen_by_every_session(self):
+        self.datastore.edit(CANDIDATE, _interface_description("ge-0/0/1", "shared"))
+
+        assert_that(self.datastore.is_private(), equal_to(False))
+        assert_that(self.datastore.private_session().configurations[CANDIDATE].get_port("ge-0/0/1").description,
+                    equal_to(None))
+
+        self.datastore.commit_candidate()
+
+        assert_that(self.running.get_port("ge-0/0/1").description, equal_to("shared"))
+
+
+class JuniperNetconfDatastoreConfirmedCommitTest(unittest.TestCase):
+    def setUp(self):
+        self.running = SwitchConfiguration("127.0.0.1", ports=[Port("ge-0/0/1"), Port("ge-0/0/2")],
+                                           vlans=[Vlan(10, "VLAN10")])
+        self.datastore = JuniperNetconfDatastore(self.running)
+        self.datastore.clock = Clock()
+
+    def test_unconfirmed_commit_is_rolled_back_when_the_timeout_expires(self):
+        self.datastore.edit(CANDIDATE, _interface_description("ge-0/0/1", "confirmed"))
+        self.datastore.commit_candidate(confirm_timeout=60)
+
+        assert_that(self.running.get_port("ge-0/0/1").description, equal_to("confirmed"))
+
+        self.datastore.clock.advance(60)
+
+        assert_that(self.running.get_port("ge-0/0/1").description, equal_to(None))
+        assert_that(self.datastore.configurations[CANDIDATE].get_port("ge-0/0/1").description, equal_to(None))
+        assert_that(self.datastore.clock.getDelayedCalls(), equal_to([]))
+
+    def test_a_following_commit_confirms_and_cancels_the_rollback(self):
+        self.datastore.edit(CANDIDATE, _interface_description("ge-0/0/1", "confirmed"))
+        self.datastore.commit_candidate(confirm_timeout=60)
+        self.datastore.commit_candidate()
+
+        assert_that(self.datastore.clock.getDelayedCalls(), equal_to([]))
+
+        self.datastore.clock.advance(60)
+
+        assert_that(self.running.get_port("ge-0/0/1").description, equal_to("confirmed"))
+
+    def test_a_repeated_confirmed_commit_rolls_back_to_the_first_one(self):
+        self.datastore.edit(CANDIDATE, _interface_description("ge-0/0/1", "first"))
+        self.datastore.commit_candidate(confirm_timeout=60)
+        self.datastore.edit(CANDIDATE, _interface_description("ge-0/0/2", "second"))
+        self.datastore.commit_candidate(confirm_timeout=60)
+
+        self.datastore.clock.advance(60)
+
+        assert_that(self.running.get_port("ge-0/0/1").description, equal_to(None))
+        assert_that(self.running.get_port("ge-0/0/2").description, equal_to(None))
+
+    def test_plain_commits_take_no_rollback_snapshot(self):
+        self.datastore.edit(CANDIDATE, _interface_description("ge-0/0/1", "plain"))
+        self.datastore.commit_candidate()
+
+        assert_that(self.datastore.rollbacks, equal_to([]))
+
+    def test_rollback_snapshots_share_unchanged_objects(self):
+        for description in ["first", "second"]:
+            self.datastore.edit(CANDIDATE, _interface_description("ge-0/0/1", description))
+            self.datastore.commit_candidate(confirm_timeout=60)
+            self.datastore.commit_candidate()
+
+        latest, previous = self.datastore.rollbacks
+
+        assert_that(latest.ports[0] is previous.ports[0], equal_to(False))
+        assert_that(latest.ports[0].description, equal_to("first"))
+        assert_that(latest.ports[1] is previous.ports[1], equal_to(True))
+        assert_that(latest.vlans[0] is previous.vlans[0], equal_to(True))
+
+    def test_rollback_snapshots_see_addresses_changed_within_the_same_subnet(self):
+        irb = VlanPort(10, "irb.10")
+        irb.add_ip(IPNetwork("10.0.0.2/24"))
+        self.running.add_port(irb)
+        self.datastore.reset()
+
+        self.datastore.commit_candidate(confirm_timeout=60)
+        self.datastore.configurations[CANDIDATE].get_port("irb.10").ips = [IPNetwork("10.0.0.3/24")]
+        self.datastore.commit_candidate()
+        self.datastore.commit_candidate(confirm_timeout=60)
+
+        latest = self.datastore.rollbacks[0]
+        assert_that(str(latest.get_port_by_partial_name("irb.10").ips[0]), equal_to("10.0.0.3/24"))
+
+        self.datastore.rollback(latest)
+
+        assert_that([str(ip) for ip in self.running.get_port("irb.10").ips], equal_to(["10.0.0.3/24"]))
+
+    def test_rollback_history_is_bounded(self):
+        for i in range(JuniperNetconfDatastore.MAX_ROLLBACKS + 5):
+            self.datastore.commit_candidate(confirm_timeout=60)
+            self.datastore.commit_candidate()
+
+        assert_that(len(self.datastore.rollbacks), equal_to(JuniperNetconfDatastore.MAX_ROLLBACKS))
+        assert_that(isinstance(self.datastore.rollbacks[0], RollbackSnapshot), equal_to(True))
+
+
+class JuniperNetconfDatastoreProtocolsTest(unittest.TestCase):
+    def test_protocol_options_are_grouped_per_interface_in_port_order(self):
+        ge1, ge2 = Port("ge-0/0/1"), Port("ge-0/0/2")
+        ge2.vendor_specific.update({"rstp-edge": True, "rstp-no-root-port": True, "lldp": True})
+        ge2.lldp_receive = ge2.lldp_transmit = False
+        ge1.vendor_specific.update({"rstp-no-root-port": True})
+        datastore = JuniperNetconfDatastore(SwitchConfiguration("127.0.0.1", ports=[ge1, ge2]))
+
+        protocols = datastore._extract_protocols(datastore.configurations[CANDIDATE])
+
+        assert_that(protocols, equal_to({
+            "rstp": [
+                {"interface": [{"name": "ge-0/0/1.0"}, {"no-root-port": ""}]},
+                {"interface": [{"name": "ge-0/0/2.0"}, {"edge": ""}, {"no-root-port": ""}]},
+            ],
+            "lldp": [
+                {"interface": [{"name": "ge-0/0/2.0"}, {"disable": ""}]},
+            ]
+        }))
+
+
+class JuniperNetconfDatastoreFilteredRenderingTest(unittest.TestCase):
+    def setUp(self):
+        ports = [Port("ge-0/0/1"), Port("ge-0/0/2")]
+        for port in ports:
+            port.description = "uplink"
+            port.vendor_specific["rstp-edge"] = True
+        self.datastore = JuniperNetconfDatastore(SwitchConfiguration("127.0.0.1", ports=ports,
+                                                                     vlans=[Vlan(10, "VLAN10"), Vlan(20, "VLAN20")]))
+
+    def test_only_the_filtered_interfaces_are_rendered(self):
+        content = self.datastore.to_etree(CANDIDATE, filtering=dict_2_etree({"filter": {
+            "configuration": {"interfaces": {"interface": {"name": "ge-0/0/2"}}}
+        }}))
+
+        assert_that(content.xpath("configuration/interfaces/interface/name/text()"), equal_to(["ge-0/0/2"]))
+        assert_that(content.xpath("configuration/protocols"), equal_to([]))
+        assert_that(content.xpath("configuration/vlans"), equal_to([]))
+
+    def test_only_the_filtered_vlans_are_rendered(self):
+        content = self.datastore.to_etree(CANDIDATE, filtering=dict_2_etree({"filter": {
+            "configuration": {"vlans": {"vlan": {"name": "VLAN20"}}}
+        }}))
+
+        assert_that(content.xpath("configuration/vlans/vlan/name/text()"), equal_to(["VLAN20"]))
+        assert_that(content.xpath("configuration/interfaces"), equal_to([]))
+
+    def test_everything_is_rendered_for_a_whole_configuration_filter(self):
+        content = self.datastore.to_etree(CANDIDATE, filtering=dict_2_etree({"filter": {"configuration": {}}}))
+
+        assert_that(etree.tostring(content), equal_to(etree.tostring(self.datastore.to_etree(CANDIDATE))))
+
+
+class JuniperNetconfDatastoreCandidateDiffTest(unittest.TestCase):
+    def setUp(self):
+        ports = [Port("ge-0/0/{}".format(i)) for i in range(1, 6)]
+        for port in ports:
+            port.vendor_specific["has-ethernet-switching"] = True
+        ports[0].vendor_specific["rstp-edge"] = True
+        self.running = SwitchConfiguration("127.0.0.1", ports=ports, vlans=[Vlan(10, "VLAN10")])
+        self.datastore = JuniperNetconfDatastore(self.running)
+
+    def test_only_the_edited_objects_are_rendered(self):
+        rendered = []
+        interface_to_etree = self.datastore.interface_to_etree
+        self.datastore.interface_to_etree = lambda port: rendered.append(port.name) or interface_to_etree(port)
+
+        self.datastore.edit(CANDIDATE, _interface_description("ge-0/0/2", "edited"))
+        diff = self.datastore.candidate_diff()
+
+        assert_that(sorted(set(rendered)), equal_to(["ge-0/0/2"]))
+        assert_that(diff, equal_to(_full_diff(self.datastore)))
+
+    def test_sections_present_on_one_side_only_are_diffed_like_the_whole_configurations(self):
+        self.datastore.edit(CANDIDATE, etree.fromstring(
+            "<configuration>"
+            "<protocols><rstp><interface><name>ge-0/0/3</name><edge/></interface></rstp>"
+            "<lldp><interface><name>ge-0/0/4</name></interface></lldp></protocols>"
+            "<vlans><vlan><name>VLAN10</name><description>users</description></vlan>"
+            "<vlan><name>VLAN20</name><vlan-id>20</vlan-id></vlan></vlans>"
+            "</configuration>"))
+
+        assert_that(self.datastore.candidate_diff(), equal_to(_full_diff(self.datastore)))
+
+    def test_commits_of_other_sessions_are_part_of_the_diff(self):
+        session = self.datastore.private_session()
+        other_session = self.datastore.private_session()
+        session.edit(CANDIDATE, _interface_description("ge-0/0/1", "mine"))
+        other_session.edit(CANDIDATE, _interface_description("ge-0/0/5", "theirs"))
+        other_session.commit_candidate()
+
+        diff = session.candidate_diff()
+
+        assert_that(diff, equal_to(_full_diff(session)))
+        assert_that("theirs" in diff, equal_to(True))
+
+    def test_everything_is_diffed_when_the_changes_are_unknown(self):
+        self.datastore.edit(CANDIDATE, _interface_description("ge-0/0/2", "edited"))
+        session = self.datastore.private_session()
+        session.edit(CANDIDATE, _interface_description("ge-0/0/1", "mine"))
+        self.datastore.commit_candidate(confirm_timeout=10)
+        self.datastore.rollback(self.datastore.rollbacks[0])
+
+        assert_that(session.candidate_diff(), equal_to(_full_diff(session)))
+
+    def test_unused_private_candidates_have_no_changes(self):
+        session = self.datastore.private_session()
+
+        assert_that(session.candidate_diff(), equal_to(""))
+        assert_that(CANDIDATE in session.configurations, equal_to(False))
+
+
+def _full_diff(datastore):
+    return configuration_diff(first(datastore.to_etree(RUNNING).xpath("configuration")),
+                              first(datastore.to_etree(CANDIDATE).xpath("configuration")))
+
+
+def _interface_description(name, description, operation=None):
+    attributes = ' operation="{}"'.format(operation) if operation else ""
+    return etree.fromstring("<configuration><interfaces><interface><name>{}</name><description{}>{}</description>"
+                            "</interface></interfaces></configuration>".format(name, attributes, description))
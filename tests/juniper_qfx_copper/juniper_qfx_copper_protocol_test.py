@@ -1223,7 +1223,7 @@ configuration check-out failed
         result = self.nc.compare_configuration()
 
         output = result.xpath("configuration-information/configuration-output")[0]
-        assert_that(output.text, is_not("There were some changes"))
+        assert_that(output.text, is_(None))
 
         self.edit({
             "vlans": [
@@ -1235,14 +1235,20 @@ configuration check-out failed
         result = self.nc.compare_configuration()
 
         output = result.xpath("configuration-information/configuration-output")[0]
-        assert_that(output.text, is_("There were some changes"))
+        assert_that(output.text, is_("\n"
+                                     "[edit]\n"
+                                     "+   vlans {\n"
+                                     "+       VLAN2995 {\n"
+                                     "+           vlan-id 2995;\n"
+                                     "+       }\n"
+                                     "+   }\n"))
 
         self.nc.commit()
 
         result = self.nc.compare_configuration()
 
         output = result.xpath("configuration-information/configuration-output")[0]
-        assert_that(output.text, is_not("There were some changes"))
+        assert_that(output.text, is_(None))
 
         self.cleanup(vlan("VLAN2995"))
 
@@ -3,15 +3,16 @@ import re
 import sys
 import unittest
 
-from hamcrest import assert_that, ends_with, equal_to, has_length, has_key
+from hamcrest import assert_that, ends_with, equal_to, has_length, has_key, contains_string
 from hamcrest.core.base_matcher import BaseMatcher
-from lxml.etree import _Element
+from lxml import etree
+from lxml.etree import _Element, SubElement
 from mock import Mock
 from ncclient.xml_ import to_ele, to_xml
 
-from fake_switches.netconf import RUNNING, dict_2_etree
-from fake_switches.netconf.capabilities import filter_content
-from fake_switches.netconf.netconf_protocol import NetconfProtocol
+from fake_switches.netconf import RUNNING, dict_2_etree, Response
+from fake_switches.netconf.capabilities import Capability, filter_content, filter_selection, selected_keys
+from fake_switches.netconf.netconf_protocol import NetconfProtocol, remove_namespaces
 
 
 class NetconfProtocolTest(unittest.TestCase):
@@ -139,6 +140,58 @@ class NetconfProtocolTest(unittest.TestCase):
               <data/>
             </rpc-reply>""")
 
+    def test_an_operation_defined_by_many_capabilities_is_answered_once(self):
+        class OverridingCapability(Capability):
+            def get_url(self):
+                return "urn:overriding"
+
+            def get_config(self, request):
+                return Response(etree.Element("overridden"))
+
+        self.netconf = NetconfProtocol(capabilities=[OverridingCapability], logger=logging.getLogger())
+        self.netconf.transport = Mock()
+        self.netconf.connectionMade()
+        self.say_hello()
+
+        self.netconf.dataReceived(b"""
+            <nc:rpc xmlns:nc="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="67890">
+              <nc:get-config>
+                <nc:source><nc:running/></nc:source>
+              </nc:get-config>
+            </nc:rpc>
+            ]]>]]>""")
+
+        assert_that(self.netconf.transport.write.call_count, equal_to(2))
+        self.assert_xml_response("""
+            <rpc-reply xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="67890">
+              <data/>
+            </rpc-reply>""")
+
+    def test_get_url_is_not_an_operation(self):
+        self.netconf.connectionMade()
+        self.say_hello()
+
+        self.netconf.dataReceived(b"""
+            <rpc xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="67890"><get-url/></rpc>]]>]]>""")
+
+        assert_that(self.netconf.transport.write.call_args[0][0].decode(), contains_string("operation-not-supported"))
+
+    def test_compact_replies(self):
+        self.netconf = NetconfProtocol(logger=logging.getLogger(), pretty_print=False)
+        self.netconf.transport = Mock()
+        self.netconf.datastore.set_data(RUNNING, {"configuration": {"stuff": "is cool!"}})
+        self.netconf.connectionMade()
+        self.say_hello()
+
+        self.netconf.dataReceived(b"""
+            <rpc xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="67890">
+              <get-config><source><running/></source></get-config>
+            </rpc>]]>]]>""")
+
+        assert_that(self.netconf.transport.write.call_args[0][0].decode(), equal_to(
+            '<rpc-reply xmlns="urn:ietf:params:xml:ns:netconf:base:1.0" message-id="67890">'
+            '<data><configuration><stuff>is cool!</stuff></configuration></data></rpc-reply>]]>]]>\n'))
+
     def test_filtering(self):
         content = dict_2_etree({
             "data": {
@@ -360,6 +413,51 @@ class NetconfProtocolTest(unittest.TestCase):
 
         assert_that(content.xpath("//data/configuration/interfaces/interface"), has_length(1))
 
+    def test_filter_selection_follows_containment_nodes(self):
+        content_filter = dict_2_etree({
+            "filter": {
+                "configuration": {
+                    "interfaces": [
+                        {"interface": {"name": "ge-0/0/1"}},
+                        {"interface": {"name": "ge-0/0/2", "unit": {}}}
+                    ],
+                    "protocols": {}
+                }
+            }
+        })
+
+        assert_that(filter_selection(content_filter, "configuration", "vlans"), has_length(0))
+        assert_that(filter_selection(content_filter, "configuration", "protocols", "rstp"), equal_to(None))
+        assert_that(selected_keys(filter_selection(content_filter, "configuration", "interfaces", "interface")),
+                    equal_to({"ge-0/0/1", "ge-0/0/2"}))
+        assert_that(filter_selection(None, "configuration"), equal_to(None))
+
+    def test_selected_keys_are_unrestricted_when_a_node_has_no_key(self):
+        content_filter = dict_2_etree({
+            "filter": {
+                "configuration": {
+                    "interfaces": [
+                        {"interface": {"name": "ge-0/0/1"}},
+                        {"interface": {"unit": {"name": "0"}}}
+                    ]
+                }
+            }
+        })
+
+        assert_that(selected_keys(filter_selection(content_filter, "configuration", "interfaces", "interface")),
+                    equal_to(None))
+
+    def test_remove_namespaces_handles_comments_and_deep_documents(self):
+        root = to_ele('<nc:rpc xmlns:nc="urn:ietf:params:xml:ns:netconf:base:1.0"><!-- comment --></nc:rpc>')
+        node = root
+        for _ in range(sys.getrecursionlimit() + 100):
+            node = SubElement(node, "{urn:ietf:params:xml:ns:netconf:base:1.0}a")
+
+        remove_namespaces(root)
+
+        assert_that(root.tag, equal_to("rpc"))
+        assert_that(node.tag, equal_to("a"))
+
     def say_hello(self):
         self.netconf.dataReceived(
             b'<hello xmlns:nc="urn:ietf:params:xml:ns:netconf:base:1.0"><capabilities><capability>urn:ietf:params:xml:ns:netconf:base:1.0</capability></capabilities></hello>]]>]]>')
@@ -0,0 +1,57 @@
+import unittest
+from io import StringIO
+
+from hamcrest import assert_that, equal_to, greater_than
+from twisted.internet import task
+
+from benchmarks.load import ClientOptions
+from benchmarks.replay import replay, DriverFactory
+from benchmarks.run import run
+from benchmarks.workloads import VENDORS
+from fake_switches.recording import SessionRecorder, read_sessions
+from fake_switches.switch_factory import SwitchFactory
+
+
+class BenchmarksTest(unittest.TestCase):
+    def test_every_workload_runs(self):
+        report = run([2], [2], operations=2, repeat=1, log=None)
+
+        assert_that(set(result["vendor"] for result in report["results"]),
+                    equal_to(set(vendor.model for vendor in VENDORS)))
+        for result in report["results"]:
+            if "bytes_per_item" in result:
+                assert_that(result["bytes_per_item"], greater_than(0))
+                assert_that(len(result["sizes"]), equal_to(1))
+            else:
+                assert_that(result["commands"], greater_than(0))
+                assert_that(len(result["timings"]), equal_to(1))
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.recording = StringIO()
+        switch = SwitchFactory().get("cisco_generic", "my_switch", password="root",
+                                     recorder=SessionRecorder(self.recording))
+        switch.open_session().execute(["enable", "root", "configure terminal", "vlan 1000", "name load",
+                                       "exit", "exit", "show vlan brief", "exit"])
+
+    def replay(self, model):
+        clock = task.Clock()
+        sessions = read_sessions(StringIO(self.recording.getvalue()))
+        drivers = DriverFactory({None: model}, "root", {}, ClientOptions(1, None, None))
+
+        d = replay(clock, sessions, drivers, float("inf"), log=None)
+        while not d.called:
+            clock.advance(1)
+        return d.result
+
+    def test_a_recorded_session_replays_without_divergences(self):
+        session, = self.replay("cisco_generic")["sessions"]
+
+        assert_that((session["exchanges"], session["divergences"], session["skipped"]), equal_to((10, 0, False)))
+
+    def test_a_different_behavior_is_reported(self):
+        session, = self.replay("cisco_2960_24TT_L")["sessions"]
+
+        assert_that(session["divergences"], equal_to(1))
+        assert_that(session["details"][0]["input"], equal_to("show vlan brief"))
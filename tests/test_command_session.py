@@ -0,0 +1,90 @@
+import unittest
+
+from hamcrest import assert_that, equal_to, is_, contains_string
+
+from fake_switches.command_processing.command_session import SessionClosed, NotAwaitingKeystroke
+from fake_switches.switch_configuration import Port
+from fake_switches.switch_factory import SwitchFactory
+
+
+class CommandSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.factory = SwitchFactory()
+
+    def test_execute_returns_the_output_of_each_command_without_the_prompt(self):
+        switch = self.factory.get("cisco_generic", "my_switch", password="root",
+                                  ports=[Port("FastEthernet0/1")])
+
+        outputs = switch.execute(["enable", "root", "show vlan brief"])
+
+        assert_that(outputs[0], equal_to("Password: "))
+        assert_that(outputs[1], equal_to(""))
+        assert_that(outputs[2], contains_string("1    default"))
+        assert_that(outputs[2].endswith("my_switch#"), is_(False))
+
+    def test_the_prompt_follows_the_current_mode(self):
+        session = self.factory.get("arista_generic", "my_switch").open_session()
+
+        assert_that(session.prompt, equal_to("my_switch>"))
+
+        session.execute(["enable", "configure terminal", "vlan 10"])
+
+        assert_that(session.prompt, equal_to("my_switch(config-vlan-10)#"))
+        assert_that(session.send("show vlan"), contains_string("VLAN0010"))
+
+    def test_continuation_prompts_are_answered_by_the_next_command(self):
+        switch = self.factory.get("cisco_generic", "my_switch", auto_enabled=True)
+        session = switch.open_session()
+
+        assert_that(session.send("copy running-config tftp://1.2.3.4/my-file"),
+                    equal_to("Destination filename [/1.2.3.4/my-file]? "))
+        assert_that(session.send("my-file"), contains_string("Accessing running-config..."))
+
+    def test_keystroke_handlers_receive_the_characters_of_the_next_command(self):
+        switch = self.factory.get("dell_generic", "my_switch", password="root")
+        session = switch.open_session()
+        session.execute(["enable", "root"])
+
+        assert_that(session.send("copy running-config startup-config"),
+                    contains_string("Are you sure you want to save? (y/n) "))
+        assert_that(session.send("y"), equal_to("\n\nConfiguration Saved!\n"))
+        assert_that(session.send("show vlan").endswith("my_switch#"), is_(False))
+
+    def test_press_sends_a_single_keystroke(self):
+        switch = self.factory.get("dell_generic", "my_switch", password="root")
+        session = switch.open_session()
+        session.execute(["enable", "root"])
+
+        with self.assertRaises(NotAwaitingKeystroke):
+            session.press("y")
+
+        session.send("copy running-config startup-config")
+
+        assert_that(session.press("n"), equal_to("\n\nConfiguration Not Saved!\n"))
+
+    def test_a_closed_session_refuses_commands(self):
+        session = self.factory.get("cisco_generic", "my_switch", auto_enabled=True).open_session()
+
+        assert_that(session.send("exit"), equal_to(""))
+        assert_that(session.is_open, is_(False))
+
+        with self.assertRaises(SessionClosed):
+            session.send("show vlan")
+
+    def test_sessions_share_the_switch_configuration(self):
+        switch = self.factory.get("arista_generic", "my_switch")
+
+        switch.execute(["enable", "configure terminal", "vlan 20"])
+
+        assert_that(switch.open_session().execute(["show vlan 20"])[0], contains_string("VLAN0020"))
+
+    def test_sessions_only_build_the_processors_of_the_modes_they_enter(self):
+        switch = self.factory.get("arista_generic", "my_switch")
+        idle = switch.open_session()
+        configuring = switch.open_session()
+
+        configuring.execute(["enable", "configure terminal", "vlan 20"])
+
+        assert_that(idle.active_processor().enabled_processor, is_(switch.processor_graph.sub_processors["enabled"]))
+        assert_that(configuring.active_processor().display, is_(configuring.shell_session.command_processor.display))
+        assert_that(configuring.prompt, equal_to("my_switch(config-vlan-20)#"))
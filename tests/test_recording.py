@@ -0,0 +1,185 @@
+import json
+import unittest
+from copy import deepcopy
+from io import BytesIO, StringIO
+
+from hamcrest import assert_that, equal_to, contains_string, has_length
+from twisted.internet.defer import Deferred
+from twisted.internet.error import ConnectionDone
+from twisted.internet.task import Cooperator
+from twisted.python.failure import Failure
+
+from fake_switches.recording import SessionRecorder, read_sessions
+from fake_switches.switch_configuration import SwitchConfiguration
+from fake_switches.switch_factory import SwitchFactory
+from fake_switches.terminal.ssh import SwitchSSHShell, SshTerminalController
+from fake_switches.terminal.telnet import SwitchTelnetShell
+
+
+class SessionRecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.output = StringIO()
+        self.now = [1000.0]
+        self.recorder = SessionRecorder(self.output, clock=lambda: self.now[0])
+        self.factory = SwitchFactory()
+
+    def sessions(self):
+        return read_sessions(StringIO(self.output.getvalue()))
+
+    def test_cli_commands_and_their_output_are_recorded(self):
+        switch = self.factory.get("cisco_generic", "my_switch", password="root", recorder=self.recorder)
+        session = switch.open_session()
+        self.now[0] += 1.5
+        session.execute(["enable", "root"])
+        self.now[0] += 1
+        session.send("exit")
+
+        sessions = self.sessions()
+
+        assert_that(sessions, has_length(1))
+        assert_that((sessions[0].switch_name, sessions[0].kind, sessions[0].closed),
+                    equal_to(("my_switch", "cli", True)))
+        assert_that(sessions[0].exchanges(), equal_to([
+            (0, None, None, "my_switch>"),
+            (1.5, "in", "enable", "Password: "),
+            (1.5, "in", "root", "my_switch#"),
+            (2.5, "in", "exit", "")
+        ]))
+
+    def test_keystrokes_are_recorded(self):
+        switch = self.factory.get("dell_generic", "my_switch", password="root", recorder=self.recorder)
+        session = switch.open_session()
+        session.execute(["enable", "root", "copy running-config startup-config"])
+        session.press("n")
+
+        t, event, data, output = self.sessions()[0].exchanges()[-1]
+
+        assert_that((event, data), equal_to(("key", "n")))
+        assert_that(output, contains_string("Configuration Not Saved!"))
+
+    def test_netconf_requests_and_replies_are_recorded(self):
+        switch = self.factory.get("juniper_generic", "my_switch", recorder=self.recorder)
+        transport = _Transport()
+        protocol = switch.get_netconf_protocol()
+        protocol.makeConnection(transport)
+        protocol.dataReceived(b"<hello/>]]>]]>")
+        protocol.dataReceived(b'<rpc message-id="1"><get-config><source><running/></source></get-config></rpc>]]>]]>')
+        protocol.dataReceived(b'<rpc message-id="2"><close-session/></rpc>]]>]]>')
+
+        session, = self.sessions()
+        exchanges = session.exchanges()
+
+        assert_that((session.kind, session.closed), equal_to(("netconf", True)))
+        assert_that(exchanges, has_length(3))
+        assert_that(exchanges[1][2], contains_string("<get-config>"))
+        assert_that(exchanges[1][3], contains_string("<configuration "))
+        assert_that(exchanges[2][3], contains_string("<ok/>"))
+
+    def test_netconf_sessions_are_closed_when_the_client_disconnects(self):
+        switch = self.factory.get("juniper_generic", "my_switch", recorder=self.recorder)
+        protocol = switch.get_netconf_protocol()
+        protocol.makeConnection(_Transport())
+        protocol.dataReceived(b"<hello/>]]>]]>")
+        protocol.dataReceived(b'<rpc message-id="1"><get-config><source><running/></source></get-config></rpc>]]>]]>')
+
+        protocol.connectionLost(Failure(ConnectionDone()))
+
+        session, = self.sessions()
+        assert_that(session.closed, equal_to(True))
+
+    def test_ssh_sessions_are_closed_when_the_client_disconnects(self):
+        switch = self.factory.get("cisco_generic", "my_switch", auto_enabled=True, recorder=self.recorder)
+        shell = SwitchSSHShell("root", switch)
+        shell.terminal = _Transport()
+        shell.session = switch.launch("ssh", SshTerminalController(shell=shell))
+
+        shell.connectionLost(Failure(ConnectionDone()))
+
+        session, = self.sessions()
+        assert_that(session.closed, equal_to(True))
+
+    def test_telnet_sessions_are_closed_when_the_client_disconnects(self):
+        switch = self.factory.get("cisco_generic", "my_switch", auto_enabled=True, recorder=self.recorder)
+        shell = SwitchTelnetShell(switch)
+        shell.makeConnection(_Transport())
+        shell.validate_username("root")
+        shell.validate_password("root")
+
+        shell.connectionLost(Failure(ConnectionDone()))
+
+        session, = self.sessions()
+        assert_that(session.closed, equal_to(True))
+
+    def test_eapi_requests_and_replies_are_recorded(self):
+        switch = self.factory.get("arista_generic", "my_switch", recorder=self.recorder)
+        body = json.dumps({"jsonrpc": "2.0", "method": "runCmds", "id": 1,
+                           "params": {"version": 1, "cmds": ["show vlan"], "format": "json"}})
+        request = _Request(body.encode())
+        eapi = switch.get_http_resource().getStaticEntity(b"command-api")
+        eapi.cooperate = Cooperator(scheduler=lambda work: work()).cooperate
+        eapi.render_POST(request)
+
+        session, = self.sessions()
+        exchanges = session.exchanges()
+
+        assert_that((session.kind, session.closed), equal_to(("eapi", True)))
+        assert_that(exchanges[1][2], equal_to(body))
+        assert_that(exchanges[1][3], equal_to(b"".join(request.written).decode()))
+
+    def test_sessions_are_numbered_and_share_the_recording_start(self):
+        switch = self.factory.get("cisco_generic", "my_switch", auto_enabled=True, recorder=self.recorder)
+        first = switch.open_session()
+        self.now[0] += 2
+        second = switch.open_session()
+        first.send("exit")
+
+        sessions = self.sessions()
+
+        assert_that([(s.session_id, s.started, s.closed) for s in sessions],
+                    equal_to([(1, 0, True), (2, 2, False)]))
+
+    def test_unused_sessions_are_not_recorded(self):
+        switch = self.factory.get("juniper_generic", "my_switch", recorder=self.recorder)
+        switch.get_netconf_protocol()
+
+        assert_that(self.output.getvalue(), equal_to(""))
+
+    def test_copied_configurations_record_in_the_same_place(self):
+        conf = SwitchConfiguration("127.0.0.1", "my_switch", recorder=self.recorder)
+
+        assert_that(deepcopy(conf).recorder is self.recorder, equal_to(True))
+
+    def test_unknown_recording_versions_are_refused(self):
+        with self.assertRaises(ValueError):
+            read_sessions(['{"started":0,"v":42}'])
+
+
+class _Transport(object):
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    def loseConnection(self):
+        pass
+
+
+class _Request(object):
+    def __init__(self, body):
+        self.content = BytesIO(body)
+        self.written = []
+        self.startedWriting = False
+
+    def write(self, data):
+        self.startedWriting = True
+        self.written.append(data)
+
+    def setResponseCode(self, code):
+        pass
+
+    def notifyFinish(self):
+        return Deferred()
+
+    def finish(self):
+        pass
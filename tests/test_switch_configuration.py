@@ -0,0 +1,239 @@
+import unittest
+from copy import deepcopy
+
+from hamcrest import assert_that, equal_to
+
+from netaddr import IPNetwork
+
+from fake_switches.switch_configuration import SwitchConfiguration, Port, VlanPort, AggregatedPort, Route, Vlan, VRRP
+
+
+class SwitchConfigurationVlanMembershipTest(unittest.TestCase):
+    def setUp(self):
+        self.conf = SwitchConfiguration("127.0.0.1", ports=[Port("eth1"), Port("eth2"), Port("eth3")])
+        self.eth1, self.eth2, self.eth3 = self.conf.ports
+
+    def test_access_vlan_members_are_in_port_order(self):
+        self.eth3.access_vlan = 10
+        self.eth1.access_vlan = 10
+        self.eth2.access_vlan = 20
+
+        assert_that(self.conf.get_members(("access_vlan", 10)), equal_to([self.eth1, self.eth3]))
+        assert_that(self.conf.get_members(("access_vlan", 20)), equal_to([self.eth2]))
+
+        self.eth1.access_vlan = None
+
+        assert_that(self.conf.get_members(("access_vlan", 10)), equal_to([self.eth3]))
+        assert_that(self.conf.get_members(("access_vlan", None)), equal_to([self.eth1]))
+
+    def test_trunk_vlans_are_tracked_through_list_mutations(self):
+        self.eth1.trunk_vlans = [10, 11]
+        self.eth1.trunk_vlans += [12]
+        self.eth1.trunk_vlans.append(13)
+        self.eth1.trunk_vlans.remove(10)
+
+        assert_that(self.conf.get_membership_values("trunk_vlans"), equal_to({11, 12, 13}))
+        assert_that(self.conf.get_members(("trunk_vlans", 10)), equal_to([]))
+        assert_that(self.conf.get_members(("trunk_vlans", 13)), equal_to([self.eth1]))
+        assert_that(self.eth1.trunk_vlans, equal_to([11, 12, 13]))
+
+        self.eth1.trunk_vlans = None
+
+        assert_that(self.conf.get_membership_values("trunk_vlans"), equal_to(set()))
+
+    def test_duplicated_trunk_vlans_stay_members_until_fully_removed(self):
+        self.eth1.trunk_vlans = [10, 10]
+        self.eth1.trunk_vlans.remove(10)
+
+        assert_that(self.conf.get_members(("trunk_vlans", 10)), equal_to([self.eth1]))
+
+    def test_memberships_are_merged_in_port_order(self):
+        self.eth3.access_vlan = 10
+        self.eth2.trunk_vlans = [10]
+        self.eth1.trunk_native_vlan = 10
+
+        assert_that(self.conf.get_members(("access_vlan", 10), ("trunk_vlans", 10), ("trunk_native_vlan", 10)),
+                    equal_to([self.eth1, self.eth2, self.eth3]))
+
+    def test_adding_and_removing_ports_updates_the_memberships(self):
+        port = Port("eth4")
+        port.access_vlan = 10
+        port.trunk_vlans = [20]
+        self.conf.add_port(port)
+
+        assert_that(self.conf.get_members(("access_vlan", 10)), equal_to([port]))
+        assert_that(self.conf.get_members(("trunk_vlans", 20)), equal_to([port]))
+
+        self.conf.remove_port(port)
+        port.access_vlan = 30
+
+        assert_that(self.conf.get_members(("access_vlan", 10)), equal_to([]))
+        assert_that(self.conf.get_members(("access_vlan", 30)), equal_to([]))
+        assert_that(self.conf.get_members(("trunk_vlans", 20)), equal_to([]))
+
+    def test_vlan_port_vlan_id_is_tracked(self):
+        vlan_port = VlanPort(1000, "vlan1000")
+        self.conf.add_port(vlan_port)
+
+        assert_that(self.conf.get_members(("vlan_id", 1000)), equal_to([vlan_port]))
+
+        vlan_port.vlan_id = 2000
+
+        assert_that(self.conf.get_members(("vlan_id", 1000)), equal_to([]))
+        assert_that(self.conf.get_members(("vlan_id", 2000)), equal_to([vlan_port]))
+
+    def test_copied_configuration_has_its_own_memberships(self):
+        self.eth1.trunk_vlans = [10]
+        copy = deepcopy(self.conf)
+        copied_eth1 = copy.get_port("eth1")
+
+        copied_eth1.trunk_vlans.append(20)
+        copied_eth1.trunk_vlans.remove(10)
+
+        assert_that(copy.get_members(("trunk_vlans", 20)), equal_to([copied_eth1]))
+        assert_that(copy.get_members(("trunk_vlans", 10)), equal_to([]))
+        assert_that(self.conf.get_members(("trunk_vlans", 10)), equal_to([self.eth1]))
+        assert_that(self.eth1.trunk_vlans, equal_to([10]))
+
+
+class SwitchConfigurationAggregationMembershipTest(unittest.TestCase):
+    def setUp(self):
+        self.conf = SwitchConfiguration("127.0.0.1", ports=[Port("eth1"), Port("eth2"), AggregatedPort("ae1")])
+        self.eth1, self.eth2, self.ae1 = self.conf.ports
+
+    def test_aggregation_members(self):
+        self.eth2.aggregation_membership = "ae1"
+        self.eth1.aggregation_membership = "ae1"
+
+        assert_that(self.conf.get_aggregation_members("ae1"), equal_to([self.eth1, self.eth2]))
+
+        self.eth2.reset()
+
+        assert_that(self.conf.get_aggregation_members("ae1"), equal_to([self.eth1]))
+
+        self.conf.remove_port(self.eth1)
+
+        assert_that(self.conf.get_aggregation_members("ae1"), equal_to([]))
+
+    def test_child_ports_linked_to_a_machine(self):
+        self.eth1.aggregation_membership = "ae1"
+        self.eth1.link_name = "machine"
+        self.eth2.aggregation_membership = "ae1"
+        self.eth2.link_name = None
+
+        assert_that(self.ae1.get_child_ports_linked_to_a_machine(), equal_to([self.eth1]))
+
+
+class SwitchConfigurationIpIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.conf = SwitchConfiguration("127.0.0.1", ports=[VlanPort(10, "vlan10"), VlanPort(20, "vlan20")])
+        self.vlan10, self.vlan20 = self.conf.ports
+
+    def test_port_and_ip_by_ip(self):
+        self.vlan20.add_ip(IPNetwork("10.0.0.1/24"))
+        self.vlan10.add_ip(IPNetwork("10.0.1.1/24"))
+        self.vlan10.add_secondary_ip(IPNetwork("10.0.2.1/24"))
+
+        assert_that(self.conf.get_port_and_ip_by_ip("10.0.0.100"), equal_to((self.vlan20, IPNetwork("10.0.0.1/24"))))
+        assert_that(self.conf.get_port_and_ip_by_ip("10.0.1.100"), equal_to((self.vlan10, IPNetwork("10.0.1.1/24"))))
+        assert_that(self.conf.get_port_and_ip_by_ip("10.0.2.100"), equal_to((None, None)))
+
+        self.vlan20.remove_ip(IPNetwork("10.0.0.1/24"))
+        self.vlan10.ips[0] = IPNetwork("10.0.3.1/24")
+
+        assert_that(self.conf.get_port_and_ip_by_ip("10.0.0.100"), equal_to((None, None)))
+        assert_that(self.conf.get_port_and_ip_by_ip("10.0.1.100"), equal_to((None, None)))
+        assert_that(self.conf.get_port_and_ip_by_ip("10.0.3.100"), equal_to((self.vlan10, IPNetwork("10.0.3.1/24"))))
+
+    def test_addresses_in_the_same_subnet_are_indexed_separately(self):
+        self.vlan10.add_ip(IPNetwork("10.0.0.2/24"))
+        self.vlan10.add_ip(IPNetwork("10.0.0.3/24"))
+        self.vlan10.remove_ip(IPNetwork("10.0.0.3/24"))
+
+        port, ip = self.conf.get_port_and_ip_by_ip("10.0.0.9")
+        assert_that((port, str(ip)), equal_to((self.vlan10, "10.0.0.2/24")))
+
+        self.vlan10.remove_ip(IPNetwork("10.0.0.2/24"))
+
+        assert_that(self.conf.get_port_and_ip_by_ip("10.0.0.9"), equal_to((None, None)))
+
+    def test_connected_networks_use_the_longest_prefix(self):
+        self.vlan10.add_ip(IPNetwork("10.0.0.1/16"))
+        self.vlan20.add_secondary_ip(IPNetwork("10.0.1.1/24"))
+        self.vlan20.add_ip(IPNetwork("2001:db8::1/64"))
+
+        assert_that(self.conf.get_connected_port_and_ip_for("10.0.1.100"), equal_to((self.vlan20, IPNetwork("10.0.1.1/24"))))
+        assert_that(self.conf.get_connected_port_and_ip_for("10.0.2.100"), equal_to((self.vlan10, IPNetwork("10.0.0.1/16"))))
+        assert_that(self.conf.get_connected_port_and_ip_for("2001:db8::42"), equal_to((self.vlan20, IPNetwork("2001:db8::1/64"))))
+
+    def test_static_routes_use_the_longest_prefix(self):
+        default = Route("0.0.0.0", "0.0.0.0", "1.1.1.1")
+        specific = Route("10.0.0.0", "255.255.255.0", "2.2.2.2")
+        self.conf.add_static_route(default)
+        self.conf.add_static_route(specific)
+
+        assert_that(self.conf.get_static_route_for("10.0.0.1"), equal_to(specific))
+        assert_that(self.conf.get_static_route_for("10.0.1.1"), equal_to(default))
+
+        self.conf.remove_static_route("10.0.0.0", "255.255.255.0")
+
+        assert_that(self.conf.static_routes, equal_to([default]))
+        assert_that(self.conf.get_static_route_for("10.0.0.1"), equal_to(default))
+
+
+class SwitchConfigurationModelObjectsTest(unittest.TestCase):
+    def test_model_objects_have_no_instance_dict(self):
+        for model in [Port("eth1"), VlanPort(10, "vlan10"), AggregatedPort("ae1"), Vlan(10), VRRP(1),
+                      Route("10.0.0.0", "255.255.255.0", "1.1.1.1")]:
+            assert_that(hasattr(model, "__dict__"), equal_to(False))
+
+    def test_vendor_specific_and_ip_helpers_are_allocated_on_first_use(self):
+        port = Port("eth1")
+        port.vendor_specific["lldp"] = True
+        port.ip_helpers.append("10.0.0.1")
+
+        assert_that(port.vendor_specific, equal_to({"lldp": True}))
+        assert_that(port.ip_helpers, equal_to(["10.0.0.1"]))
+
+        port.reset()
+
+        assert_that(port.vendor_specific, equal_to({}))
+        assert_that(port.ip_helpers, equal_to([]))
+
+    def test_physical_ports_accept_the_interface_settings_of_vlan_ports(self):
+        port = Port("Ethernet1")
+        port.load_interval = "30"
+        port.mpls_ip = False
+        port.ip_redirect = False
+        port.access_group_in = "SHNITZLE"
+        port.varp_addresses = []
+
+        copy = deepcopy(port)
+
+        assert_that((copy.load_interval, copy.mpls_ip, copy.ip_redirect, copy.access_group_in, copy.varp_addresses),
+                    equal_to(("30", False, False, "SHNITZLE", [])))
+
+    def test_overridden_objects_can_hold_extra_attributes(self):
+        class CustomPort(Port):
+            def reset(self):
+                super(CustomPort, self).reset()
+                self.custom = "value"
+
+        conf = SwitchConfiguration("127.0.0.1", objects_overrides={"Port": CustomPort})
+        port = conf.new("Port", "eth1")
+        conf.add_port(port)
+        port.access_vlan = 10
+
+        assert_that(port.custom, equal_to("value"))
+        assert_that(conf.get_members(("access_vlan", 10)), equal_to([port]))
+
+    def test_copied_objects_keep_their_values(self):
+        vlan = Vlan(10, "ten")
+        vlan.vendor_specific["linked-port-vlan"] = "vlan10"
+
+        copy = deepcopy(vlan)
+        copy.vendor_specific["linked-port-vlan"] = "vlan20"
+
+        assert_that(copy.number, equal_to(10))
+        assert_that(copy.name, equal_to("ten"))
+        assert_that(vlan.vendor_specific, equal_to({"linked-port-vlan": "vlan10"}))
@@ -0,0 +1,33 @@
+import unittest
+
+from hamcrest import assert_that, equal_to
+
+from fake_switches.terminal import BufferingTerminalController
+
+
+class BufferingTerminalControllerTests(unittest.TestCase):
+    def setUp(self):
+        self.terminal_controller = BufferingTerminalController()
+
+    def test_pop_returns_everything_written_and_empties_the_buffer(self):
+        self.terminal_controller.write("hello\n")
+        self.terminal_controller.write("world\n")
+
+        assert_that(self.terminal_controller.pop(), equal_to("hello\nworld\n"))
+        assert_that(self.terminal_controller.pop(), equal_to(""))
+
+    def test_pop_can_drop_a_trailing_prompt(self):
+        self.terminal_controller.write("output\n")
+        self.terminal_controller.write("my_switch#")
+
+        assert_that(self.terminal_controller.pop(trailing="my_switch#"), equal_to("output\n"))
+
+    def test_pop_can_drop_a_trailing_prompt_written_with_the_output(self):
+        self.terminal_controller.write("output\nmy_switch#")
+
+        assert_that(self.terminal_controller.pop(trailing="my_switch#"), equal_to("output\n"))
+
+    def test_pop_keeps_the_output_when_it_does_not_end_with_the_prompt(self):
+        self.terminal_controller.write("output\n")
+
+        assert_that(self.terminal_controller.pop(trailing="my_switch#"), equal_to("output\n"))
@@ -1,7 +1,11 @@
 import unittest
 
-from hamcrest import assert_that, equal_to
+from hamcrest import assert_that, equal_to, is_, none, not_none
+from twisted.internet.address import IPv4Address
+from twisted.web.server import Site
 
+from fake_switches.arista.arista_core import AristaSwitchCore
+from fake_switches.switch_configuration import SwitchConfiguration
 from fake_switches.transports import SwitchSshService, SwitchTelnetService, SwitchHttpService
 
 
@@ -11,6 +15,31 @@ class TransportsTests(unittest.TestCase):
 
         assert_that(http_service.port, equal_to(80))
 
+    def test_http_service_keep_alive_timeout(self):
+        http_service = SwitchHttpService(switch_core=AristaSwitchCore(SwitchConfiguration("127.0.0.1")),
+                                         keep_alive_timeout=30)
+
+        factory = http_service.build_factory()
+
+        assert_that(isinstance(factory, Site), is_(True))
+        assert_that(factory.timeOut, equal_to(30))
+
+    def test_http_service_connection_limit(self):
+        http_service = SwitchHttpService(switch_core=AristaSwitchCore(SwitchConfiguration("127.0.0.1")),
+                                         max_connections=1)
+        factory = http_service.build_factory()
+        address = IPv4Address("TCP", "127.0.0.1", 12345)
+
+        protocol = factory.buildProtocol(address)
+        factory.registerProtocol(protocol)
+
+        assert_that(protocol, is_(not_none()))
+        assert_that(factory.buildProtocol(address), is_(none()))
+
+        factory.unregisterProtocol(protocol)
+
+        assert_that(factory.buildProtocol(address), is_(not_none()))
+
     def test_ssh_service_has_default_port(self):
         ssh_service = SwitchSshService()
 
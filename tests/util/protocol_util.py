@@ -6,9 +6,23 @@ from functools import wraps
 import pexpect
 from flexmock import flexmock_teardown
 from hamcrest import assert_that, equal_to
+from twisted.conch.insults import insults
+from twisted.internet import error
+from twisted.python import failure
 
+from fake_switches.switch_factory import SwitchFactory
+from fake_switches.terminal.ssh import SwitchSSHShell
+from fake_switches.terminal.telnet import SwitchTelnetShell
 from tests.util.global_reactor import TEST_SWITCHES
 
+try:
+    from twisted.internet.testing import StringTransport
+except ImportError:
+    from twisted.test.proto_helpers import StringTransport
+
+TELNET_COMMAND = re.compile(b"\xff[\xfb-\xfe].")
+TELNET_BARE_CR = re.compile(b"\r(?!\n)")
+
 
 def with_protocol(test):
     @wraps(test)
@@ -128,6 +142,112 @@ class TelnetTester(ProtocolTester):
         self.wait_for('[>#]$', regex=True)
 
 
+class LoopbackChild(object):
+    """
+    The subset of a pexpect child used by ProtocolTester, wired to a server
+    protocol through an in-memory transport.  Everything the server writes
+    is available as soon as send() returns so expect() never waits.
+    """
+
+    def __init__(self, protocol, linesep):
+        self.protocol = protocol
+        self.linesep = linesep
+        self.transport = StringTransport()
+        self.buffer = b""
+        self.before = None
+        self.after = None
+        self.timeout = None
+        self.logfile_read = None
+
+    def start(self):
+        self.protocol.makeConnection(self.transport)
+        self._receive()
+
+    def send(self, data):
+        self.protocol.dataReceived(data)
+        self._receive()
+
+    def sendline(self, data):
+        self.send(data + self.linesep)
+
+    def expect(self, pattern):
+        if pattern is pexpect.EOF:
+            if not self.transport.disconnecting:
+                raise pexpect.EOF("Connection still open, pending output: {!r}".format(self.buffer))
+            self.before, self.after, self.buffer = self.buffer, pexpect.EOF, b""
+            return 0
+
+        if not isinstance(pattern, bytes):
+            pattern = pattern.encode()
+        match = re.search(pattern, self.buffer, re.DOTALL)
+        if match is None:
+            raise pexpect.TIMEOUT("{!r} not found in {!r}".format(pattern, self.buffer))
+
+        self.before, self.after = self.buffer[:match.start()], match.group()
+        self.buffer = self.buffer[match.end():]
+        return 0
+
+    def close(self):
+        if not self.transport.disconnecting:
+            self.transport.loseConnection()
+            self.protocol.connectionLost(failure.Failure(error.ConnectionDone()))
+
+    def _receive(self):
+        data = self.clean(self.transport.value())
+        self.transport.clear()
+        if data:
+            if self.logfile_read is not None:
+                self.logfile_read.write(data)
+            self.buffer += data
+
+    def clean(self, data):
+        return data
+
+
+class TelnetLoopbackChild(LoopbackChild):
+    def send(self, data):
+        super(TelnetLoopbackChild, self).send(TELNET_BARE_CR.sub(b"\r\0", data))
+
+    def clean(self, data):
+        return TELNET_COMMAND.sub(b"", data)
+
+
+class LoopbackTester(ProtocolTester):
+    """
+    Drives the switch shell in-process instead of spawning a ssh or telnet
+    client.  Every tester gets its own switch built from the test switch
+    configuration.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(LoopbackTester, self).__init__(*args, **kwargs)
+        self.switch_core = SwitchFactory().get(self.conf["model"], hostname=self.conf["hostname"],
+                                               **self.conf["extra"] or {})
+
+    def connect(self):
+        self.child = self.spawn()
+        self.child.logfile_read = LoggingFileInterface(prefix="[%s] " % self.name)
+        self.child.start()
+        self.login()
+
+    def spawn(self):
+        raise NotImplementedError()
+
+
+class LoopbackSshTester(LoopbackTester, SshTester):
+    def spawn(self):
+        return LoopbackChild(insults.ServerProtocol(SwitchSSHShell, self.username, switch_core=self.switch_core),
+                             linesep=b"\r")
+
+    def login(self):
+        self.wait_for('[>#]$', regex=True)
+
+
+class LoopbackTelnetTester(LoopbackTester, TelnetTester):
+    def spawn(self):
+        return TelnetLoopbackChild(SwitchTelnetShell(self.switch_core), linesep=b"\r\n")
+
+
 class ProtocolTest(unittest.TestCase):
     tester_class = SshTester
     test_switch = None